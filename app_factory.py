@@ -0,0 +1,319 @@
+"""Application factory shared by the MySQL, SQLite and in-memory deployments."""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import importlib
+import logging
+import os
+import threading
+
+from flask import Flask
+from flask_cors import CORS
+
+from config import Config
+from question_model import db, Question, change_feed
+from routes import questions_api
+from services.admission import admission_from_config
+from services.answer_cache import AnswerCache
+from services.answer_stream import StreamedResult, chunk_result
+from services.job_queue import JobQueue
+from services.local_answers import LocalAnswerEngine
+from services.metrics import ApiMetrics
+from services.micro_batch import MicroBatcher, openai_packed_completion
+from services.migrations import migrate
+from services.near_duplicates import NearDuplicateIndex
+from services.profiling import RequestProfiler
+from services.resilience import ResilientGenerator
+from services.serialization import ResponseCompressor
+from services.storage import get_backend
+from services.write_batcher import GroupCommitWriter
+from services.question_cache import QuestionCache, shared_cache_from_url
+
+logger = logging.getLogger(__name__)
+
+
+class LazyAttribute:
+    """Imports module.attribute on first use and reuses it afterwards.
+
+    Keeps the OpenAI-backed generator module (and the client it builds) out of worker start-up.
+    """
+
+    def __init__(self, module, attribute):
+        self.module = module
+        self.attribute = attribute
+        self._target = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """Return the attribute, or None when the module doesn't define it."""
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    self._target = getattr(importlib.import_module(self.module), self.attribute, None)
+                    self._resolved = True
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+
+class ApiState:
+    """Caches, worker pools and indexes owned by a single app instance."""
+
+    def __init__(self, config, backend, generator=None, instance_path=''):
+        self.backend = backend
+        self.generator = generator or LazyAttribute('services.ai_answer_generator', 'generate_answer_and_explanation')
+        # Injected generators can stream through a `stream` method; without one their complete result is replayed
+        self.stream_generator = getattr(generator, 'stream', None) if generator else LazyAttribute(
+            'services.ai_answer_generator', 'stream_answer_and_explanation'
+        )
+        self.micro_batcher = None
+        if config.MICRO_BATCH_ENABLED:
+            # Injected generators can offer a packed call of their own; without one they are never batched
+            complete_packed = getattr(generator, 'complete_packed', None) if generator else partial(
+                openai_packed_completion, model=config.MICRO_BATCH_MODEL,
+                api_key=config.OPENAI_API_KEY, timeout=config.GENERATOR_TIMEOUT
+            )
+            if complete_packed is not None:
+                self.micro_batcher = self.generator = MicroBatcher(
+                    self.generator, complete_packed,
+                    max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+                    max_wait=config.MICRO_BATCH_MAX_WAIT_MS / 1000
+                )
+        self.resilient_generator = None
+        if config.GENERATOR_RESILIENCE_ENABLED:
+            # Deadlines, retries, hedging and a circuit breaker between uploads and the upstream model
+            self.resilient_generator = self.generator = ResilientGenerator(
+                self.generator,
+                timeout=config.GENERATOR_TIMEOUT,
+                max_concurrency=config.GENERATOR_MAX_CONCURRENCY,
+                retries=config.GENERATOR_RETRIES,
+                retry_backoff=config.GENERATOR_RETRY_BACKOFF,
+                failure_threshold=config.GENERATOR_BREAKER_FAILURES,
+                slow_call_threshold=config.GENERATOR_BREAKER_SLOW_CALL,
+                reset_timeout=config.GENERATOR_BREAKER_RESET,
+                hedge=config.GENERATOR_HEDGE_ENABLED,
+                hedge_quantile=config.GENERATOR_HEDGE_QUANTILE,
+                hedge_min_delay=config.GENERATOR_HEDGE_MIN_DELAY
+            )
+        self.near_duplicates_enabled = config.NEAR_DUPLICATE_ENABLED
+        self.local_answers_enabled = config.LOCAL_ANSWER_ENABLED
+
+        # Latency histograms and gauges served at /metrics
+        self.metrics = ApiMetrics(enabled=config.METRICS_ENABLED)
+        if self.resilient_generator is not None:
+            self.metrics.track_generator(self.resilient_generator)
+        if self.micro_batcher is not None:
+            self.metrics.track_micro_batcher(self.micro_batcher)
+
+        # Per-client rate limits and a global in-flight cap for uploads
+        self.admission = admission_from_config(config)
+        if self.admission.enabled:
+            self.metrics.track_admission(self.admission)
+
+        # gzip/brotli for buffered responses above a size threshold
+        self.compressor = ResponseCompressor(
+            enabled=config.COMPRESSION_ENABLED,
+            min_size=config.COMPRESSION_MIN_SIZE,
+            gzip_level=config.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=config.COMPRESSION_BROTLI_QUALITY
+        )
+
+        # Opt-in per-request profiles, stored for /profiles/<id>
+        self.profiler = RequestProfiler(
+            enabled=config.PROFILING_ENABLED,
+            token=config.PROFILING_TOKEN,
+            output_dir=config.PROFILING_OUTPUT_DIR,
+            sample_interval=config.PROFILING_SAMPLE_INTERVAL_MS / 1000,
+            keep=config.PROFILING_KEEP
+        )
+
+        # Database-native full-text index for /questions/search
+        self.search_index = backend.create_search_index(db, Question)
+
+        # MinHash/LSH index of stored questions, followed through the change log
+        self.near_duplicate_index = NearDuplicateIndex(
+            db, Question, change_feed,
+            threshold=config.NEAR_DUPLICATE_THRESHOLD,
+            snapshot_path=os.path.join(instance_path, config.NEAR_DUPLICATE_SNAPSHOT_PATH) if config.NEAR_DUPLICATE_SNAPSHOT_PATH else None,
+            snapshot_every=config.NEAR_DUPLICATE_SNAPSHOT_EVERY
+        )
+
+        # Nearest-neighbour answers learned from user corrections
+        self.local_answers = LocalAnswerEngine(
+            db, Question, change_feed,
+            threshold=config.LOCAL_ANSWER_THRESHOLD,
+            dimensions=config.LOCAL_ANSWER_DIMENSIONS
+        )
+
+        # Cache generated answers by normalized question content
+        self.answer_cache = AnswerCache(
+            self.answer_uncached,
+            max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
+            ttl=config.ANSWER_CACHE_TTL,
+            skip_sources=config.ANSWER_CACHE_SKIP_SOURCES,
+            enabled=config.ANSWER_CACHE_ENABLED,
+            change_feed=change_feed,
+            sync_interval=config.ANSWER_CACHE_SYNC_INTERVAL
+        )
+
+        # Encoded single-question payloads, invalidated by writes and the change log
+        self.question_cache = QuestionCache(
+            change_feed,
+            max_entries=config.QUESTION_CACHE_MAX_ENTRIES,
+            max_bytes=config.QUESTION_CACHE_MAX_BYTES,
+            sync_interval=config.QUESTION_CACHE_SYNC_INTERVAL,
+            shared=shared_cache_from_url(config.QUESTION_CACHE_SHARED_URL),
+            shared_ttl=config.QUESTION_CACHE_SHARED_TTL,
+            enabled=config.QUESTION_CACHE_ENABLED
+        )
+        self.metrics.track_question_cache(self.question_cache)
+
+        # Bounded worker pool for asynchronous uploads
+        self.upload_jobs = JobQueue(
+            max_workers=config.UPLOAD_WORKERS,
+            max_queue_depth=config.UPLOAD_QUEUE_DEPTH,
+            job_timeout=config.UPLOAD_JOB_TIMEOUT,
+            retention=config.UPLOAD_JOB_RETENTION
+        )
+
+        # Optional group commit of single-row writes from concurrent requests
+        self.write_batcher = None
+        if config.WRITE_BATCHING_ENABLED:
+            self.write_batcher = GroupCommitWriter(
+                db,
+                max_rows=config.WRITE_BATCH_MAX_ROWS,
+                max_delay=config.WRITE_BATCH_MAX_DELAY_MS / 1000,
+                timeout=config.WRITE_BATCH_TIMEOUT
+            )
+            self.metrics.track_write_batcher(self.write_batcher)
+
+        # Concurrency-limited pool for batch answer generation
+        self.batch_executor = ThreadPoolExecutor(
+            max_workers=config.BATCH_CONCURRENCY, thread_name_prefix='batch-generate'
+        )
+
+    def shutdown(self, wait=True):
+        """Stop the worker pools; with wait, accepted async uploads and batch items finish first."""
+        self.upload_jobs.shutdown(wait=wait)
+        self.batch_executor.shutdown(wait=wait)
+        if self.near_duplicates_enabled:
+            self.near_duplicate_index.save_snapshot()
+
+    def find_local_answer(self, question_text, choices):
+        """Return the answer of a closely matching corrected question, or None."""
+        if not self.local_answers_enabled:
+            return None
+        with self.metrics.span('local_answer_lookup'):
+            result = self.local_answers.find_answer(question_text, choices)
+        if result is not None:
+            logger.info(f"Answered locally from question {result['local_match']['question_id']}")
+        return result
+
+    def find_local_answers(self, questions):
+        """Batched find_local_answer for a list of (question_text, choices)."""
+        if not self.local_answers_enabled:
+            return [None] * len(questions)
+        with self.metrics.span('local_answer_lookup'):
+            return self.local_answers.find_answers(questions)
+
+    def find_near_duplicate(self, question_text, choices):
+        """Return the answer of a sufficiently similar stored question, or None."""
+        if not self.near_duplicates_enabled:
+            return None
+        with self.metrics.span('near_duplicate_lookup'):
+            result = self.near_duplicate_index.find_answer(question_text, choices)
+        if result is not None:
+            logger.info(f"Near-duplicate of question {result['near_duplicate']['question_id']}")
+        return result
+
+    def answer_uncached(self, question_text, choices, deadline=None):
+        """Answer from user corrections or a near-duplicate when possible, else call the generator.
+
+        Only the resilient generator can stop at a caller's deadline; without it the deadline is ignored.
+        """
+        result = self.find_local_answer(question_text, choices) or self.find_near_duplicate(question_text, choices)
+        if result is not None:
+            return result
+        with self.metrics.generation():
+            if deadline is not None and self.resilient_generator is not None:
+                return self.resilient_generator(question_text, choices, deadline=deadline)
+            return self.generator(question_text, choices)
+
+    def stream_answer(self, question_text, choices, key):
+        """Yield result chunks for a question: cached answers at once, generated ones as they arrive."""
+        result = (self.answer_cache.lookup(question_text, choices, model=Question, key=key)
+                  or self.find_local_answer(question_text, choices)
+                  or self.find_near_duplicate(question_text, choices))
+        if result is not None:
+            yield from chunk_result(result)
+            return
+
+        streamed = StreamedResult()
+        with self.metrics.generation():
+            stream_generator = self.stream_generator
+            if isinstance(stream_generator, LazyAttribute):
+                stream_generator = stream_generator.resolve()
+            if stream_generator is not None and self.resilient_generator is not None:
+                chunks = self.resilient_generator.stream(stream_generator, question_text, choices)
+            elif stream_generator is not None:
+                chunks = stream_generator(question_text, choices)
+            else:
+                # Replay only: every chunk arrives after the whole answer has been generated
+                chunks = chunk_result(self.generator(question_text, choices))
+            for chunk in chunks:
+                streamed.add(chunk)
+                yield chunk
+        self.answer_cache.store(key, streamed.result(), choices)
+
+
+def create_app(config=Config, backend=None, generator=None):
+    """Build the API for a configuration and storage backend ('mysql', 'sqlite' or 'memory').
+
+    generator replaces generate_answer_and_explanation, e.g. with a stub for benchmarks. The real
+    generator is imported on the first upload, and the schema is only touched by init_schema().
+    """
+    backend = get_backend(backend or config.STORAGE_BACKEND, config)
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = backend.database_uri()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = backend.engine_options()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Enable CORS
+    CORS(app, resources={r"/*": {
+        "origins": "*",
+        "expose_headers": ["Link", "X-Next-Before-Id", "ETag", "X-Questions-Version", "X-Profile-Id", "X-Profile-Url"]
+    }})
+
+    # Initialize database
+    db.init_app(app)
+    state = ApiState(config, backend, generator, instance_path=app.instance_path)
+    with app.app_context():
+        backend.configure_engine(db.engine)
+        state.metrics.track_pool(db.engine)
+        state.profiler.install(app, db.engine)
+
+    app.extensions['question_api'] = state
+    if state.write_batcher is not None:
+        state.write_batcher.install(app)
+    state.metrics.install(app)
+    state.admission.install(app)
+    state.compressor.install(app)
+    app.register_blueprint(questions_api)
+
+    if backend.create_schema_on_startup:
+        init_schema(app)
+
+    return app
+
+
+def init_schema(app):
+    """Create missing tables, apply pending schema migrations and create the full-text index."""
+    with app.app_context():
+        db.create_all()
+        applied = migrate(db.engine)
+        if applied:
+            logger.info(f"Applied schema migrations {applied}")
+        app.extensions['question_api'].search_index.ensure_index()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Load-test and benchmark suite for the Question Answer API
+Drives the main endpoints with configurable concurrency and reports latency percentiles as JSON
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+SCENARIOS = ['upload', 'list', 'get', 'report', 'delete']
+
+WORDS = (
+    "atom planet river theorem protein market empire poem enzyme orbit glacier voltage "
+    "verb treaty canyon algebra neuron tariff sonnet fossil comet delta reflex cipher "
+    "magma ledger prism nectar quartz tundra fjord vector sparrow lattice harbor"
+).split()
+
+
+class StubGenerator:
+    """Deterministic stand-in for generate_answer_and_explanation with a fixed latency.
+
+    calls counts generator round trips; questions lists every question text answered, in order.
+    answers pins the letter for given question texts (the test suite uses this too).
+    """
+
+    SOURCE = 'benchmark-stub'
+
+    def __init__(self, latency_ms=50, jitter_ms=0, explanation_words=60, seed=42, answers=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.explanation_words = explanation_words
+        self.answers = answers or {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.questions = []
+
+    def __call__(self, question_text, choices):
+        with self._lock:
+            self.calls += 1
+            self.questions.append(question_text)
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        time.sleep(max(self.latency_ms + jitter, 0) / 1000)
+        return {"answer": self.letter_for(question_text, choices),
+                "explanation": self.explanation_for(question_text), "source": self.SOURCE}
+
+    def complete_packed(self, questions):
+        """Packed counterpart used with MICRO_BATCH_ENABLED=True: one latency for the whole list, JSON reply."""
+        with self._lock:
+            self.calls += 1
+            self.questions.extend(question_text for question_text, _ in questions)
+        time.sleep(max(self.latency_ms, 0) / 1000)
+        answers = [{"id": number, "answer": self.letter_for(question_text, choices),
+                    "explanation": self.explanation_for(question_text)}
+                   for number, (question_text, choices) in enumerate(questions, start=1)]
+        return json.dumps({"answers": answers})
+
+    def letter_for(self, question_text, choices):
+        # Same question, same answer: derive everything from a hash of the input
+        if question_text in self.answers:
+            return self.answers[question_text]
+        return 'ABCDEFGHIJ'[hashlib.sha256(question_text.encode('utf-8')).digest()[0] % len(choices)]
+
+    def explanation_for(self, question_text):
+        digest = hashlib.sha256(question_text.encode('utf-8')).digest()
+        return ' '.join(WORDS[b % len(WORDS)] for b in (digest * 4)[:self.explanation_words])
+
+
+def make_question(rng):
+    """Build a random, mutually dissimilar question so caches and dedup don't short-circuit it."""
+    return {
+        "question": ' '.join(rng.choice(WORDS) for _ in range(12)) + f" #{rng.randrange(10 ** 9)}?",
+        "choices": [' '.join(rng.choice(WORDS) for _ in range(3)) + f" {i}" for i in range(4)]
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class HttpDriver:
+    """Minimal thread-safe HTTP client (one connection per request)."""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            return response.status, data
+        finally:
+            connection.close()
+
+
+def run_scenario(driver, name, requests_fn, total, concurrency):
+    """Fire total requests through concurrency workers and summarize their latencies."""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(index):
+        method, path, payload = requests_fn(index)
+        started = time.perf_counter()
+        try:
+            status, _ = driver.request(method, path, payload)
+        except Exception:
+            status = 'error'
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+    return {
+        "requests": total,
+        "errors": errors,
+        "status_codes": statuses,
+        "duration_seconds": round(wall, 4),
+        "requests_per_second": round(total / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "max": round(latencies[-1], 3)
+        }
+    }
+
+
+def seed_dataset(driver, size, rng, batch_size=200):
+    """Insert size questions through /upload/batch and return their ids."""
+    ids = []
+    for start in range(0, size, batch_size):
+        items = [make_question(rng) for _ in range(min(batch_size, size - start))]
+        status, data = driver.request('POST', '/upload/batch', {"questions": items})
+        if status != 200:
+            raise RuntimeError(f"Seeding failed with HTTP {status}: {data[:200]!r}")
+        ids.extend(r['question_id'] for r in json.loads(data)['results'] if r['status'] == 'saved')
+    return ids
+
+
+def run_benchmark(driver, args):
+    rng = random.Random(args.seed)
+    ids = seed_dataset(driver, args.dataset_size, rng)
+    if not ids:
+        raise RuntimeError("Seeding produced no questions")
+
+    # Deletes consume their own rows so they never race the other scenarios
+    delete_ids = seed_dataset(driver, args.requests, rng) if 'delete' in args.scenarios else []
+    upload_payloads = [make_question(rng) for _ in range(args.requests)]
+    pick = random.Random(args.seed + 1)
+    get_ids = [pick.choice(ids) for _ in range(args.requests)]
+    report_ids = [pick.choice(ids) for _ in range(args.requests)]
+
+    builders = {
+        'upload': lambda i: ('POST', '/upload', upload_payloads[i]),
+        'list': lambda i: ('GET', f'/questions?limit={args.page_size}&fields=id,question,answer', None),
+        'get': lambda i: ('GET', f'/questions/{get_ids[i]}', None),
+        'report': lambda i: ('POST', f'/questions/{report_ids[i]}/report', {"correction": 'ABCD'[i % 4]}),
+        'delete': lambda i: ('DELETE', f'/questions/{delete_ids[i]}', None),
+    }
+
+    results = {}
+    for name in args.scenarios:
+        # A short warm-up keeps connection setup and lazy index builds out of the numbers
+        for i in range(min(args.warmup, args.requests)):
+            if name in ('list', 'get'):
+                driver.request(*builders[name](i))
+        results[name] = run_scenario(driver, name, builders[name], args.requests, args.concurrency)
+        print(f"✅ {name}: p50={results[name]['latency_ms']['p50']}ms "
+              f"p99={results[name]['latency_ms']['p99']}ms "
+              f"{results[name]['requests_per_second']} req/s", file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def start_local_server(backend, stub, sqlite_path):
+    """Serve a fresh app with the stub generator on a random local port."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app_factory import create_app, init_schema
+    from config import Config
+
+    class BenchmarkConfig(Config):
+        SQLITE_PATH = sqlite_path
+        NEAR_DUPLICATE_SNAPSHOT_PATH = ''
+        DEBUG = False
+        # Every benchmark request comes from one client, so per-client limits would only measure the limiter
+        RATE_LIMITS = ''
+
+    app = create_app(BenchmarkConfig, backend=backend, generator=stub)
+    init_schema(app)
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def compare(baseline_path, current):
+    """Print the relative change of every metric against a baseline result file."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"{'scenario':<10}{'metric':<22}{'baseline':>12}{'current':>12}{'change':>10}", file=sys.stderr)
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        metrics = [('requests_per_second', before['requests_per_second'], result['requests_per_second'])]
+        metrics += [(f"latency_ms.{key}", before['latency_ms'][key], result['latency_ms'][key])
+                    for key in ('p50', 'p95', 'p99')]
+        for metric, old, new in metrics:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+            print(f"{name:<10}{metric:<22}{old:>12}{new:>12}{change:>10}", file=sys.stderr)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the Question Answer API")
+    parser.add_argument('--backend', choices=['sqlite', 'memory', 'mysql'], default='sqlite',
+                        help="Backend for the in-process server (sqlite uses a temporary file)")
+    parser.add_argument('--url', help="Benchmark an already running server instead (its own generator is used)")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario")
+    parser.add_argument('--dataset-size', type=int, default=1000, help="Questions seeded before measuring")
+    parser.add_argument('--page-size', type=int, default=50, help="limit used by the list scenario")
+    parser.add_argument('--stub-latency-ms', type=float, default=50)
+    parser.add_argument('--stub-jitter-ms', type=float, default=0)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Baseline JSON report to diff against")
+    args = parser.parse_args()
+
+    stub = StubGenerator(args.stub_latency_ms, args.stub_jitter_ms, seed=args.seed)
+    server = None
+    tmp_dir = None
+    if args.url:
+        base_url = args.url
+        target = args.url
+    else:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='qa-bench-')
+        server, base_url = start_local_server(args.backend, stub, os.path.join(tmp_dir.name, 'bench.db'))
+        target = args.backend
+
+    try:
+        scenarios = run_benchmark(HttpDriver(base_url), args)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "target": target,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "dataset_size": args.dataset_size,
+            "stub_latency_ms": None if args.url else args.stub_latency_ms,
+            "stub_jitter_ms": None if args.url else args.stub_jitter_ms,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        },
+        "scenarios": scenarios
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
-# Load environment variables from .env file
+# Load environment variables from .env file (once per process; the module cache keeps the result)
 load_dotenv()
 
 class Config:
@@ -15,10 +15,162 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'questiondb')
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'Suman@123')
+
+    # Storage Backend Configuration ('mysql', 'sqlite' or 'memory')
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mysql').lower()
+
+    # MySQL Connection Pool Configuration
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+
+    # SQLite Configuration (relative paths live in the Flask instance folder)
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'questions.db')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))
     
     # Flask Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+
+    # Production Server Configuration (python start.py serve; workers 0 = one per CPU core, drain timeout in seconds)
+    SERVE_APP = os.getenv('SERVE_APP', 'app')
+    SERVE_BIND = os.getenv('SERVE_BIND', '0.0.0.0:5000')
+    SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', '0'))
+    SERVE_WORKER_CLASS = os.getenv('SERVE_WORKER_CLASS', 'gthread')
+    SERVE_THREADS = int(os.getenv('SERVE_THREADS', '8'))
+    SERVE_WORKER_TIMEOUT = int(os.getenv('SERVE_WORKER_TIMEOUT', '120'))
+    SERVE_DRAIN_TIMEOUT = int(os.getenv('SERVE_DRAIN_TIMEOUT', '30'))
+    SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', '0'))
+
+    # Startup Configuration
+    # Create missing tables when app.py starts (same as --init-schema); off so workers start without a DB round trip
+    SCHEMA_CHECK_ON_START = os.getenv('SCHEMA_CHECK_ON_START', 'False').lower() == 'true'
+    # Time a new worker may take to import and answer /health (checked by --startup-profile)
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '2'))
+
+    # Generator Resilience Configuration (seconds)
+    GENERATOR_RESILIENCE_ENABLED = os.getenv('GENERATOR_RESILIENCE_ENABLED', 'True').lower() == 'true'
+    GENERATOR_TIMEOUT = float(os.getenv('GENERATOR_TIMEOUT', '30'))
+    GENERATOR_MAX_CONCURRENCY = int(os.getenv('GENERATOR_MAX_CONCURRENCY', '16'))
+    GENERATOR_RETRIES = int(os.getenv('GENERATOR_RETRIES', '1'))
+    GENERATOR_RETRY_BACKOFF = float(os.getenv('GENERATOR_RETRY_BACKOFF', '0.5'))
+    # The circuit opens after this many consecutive failures; calls slower than the slow threshold count as failures
+    GENERATOR_BREAKER_FAILURES = int(os.getenv('GENERATOR_BREAKER_FAILURES', '5'))
+    GENERATOR_BREAKER_SLOW_CALL = float(os.getenv('GENERATOR_BREAKER_SLOW_CALL', '20'))
+    GENERATOR_BREAKER_RESET = float(os.getenv('GENERATOR_BREAKER_RESET', '30'))
+    # Hedging sends a duplicate request once a call is slower than the recent latency quantile
+    GENERATOR_HEDGE_ENABLED = os.getenv('GENERATOR_HEDGE_ENABLED', 'False').lower() == 'true'
+    GENERATOR_HEDGE_QUANTILE = float(os.getenv('GENERATOR_HEDGE_QUANTILE', '0.95'))
+    GENERATOR_HEDGE_MIN_DELAY = float(os.getenv('GENERATOR_HEDGE_MIN_DELAY', '0.5'))
+
+    # Micro-Batching Configuration (questions arriving within the wait window share one packed model request)
+    MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'False').lower() == 'true'
+    MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', '8'))
+    MICRO_BATCH_MAX_WAIT_MS = float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', '10'))
+    MICRO_BATCH_MODEL = os.getenv('MICRO_BATCH_MODEL', 'gpt-3.5-turbo-1106')
+
+    # Answer Cache Configuration
+    ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'True').lower() == 'true'
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '1024'))
+    ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', '3600'))
+    # Seconds between reads of the change log that evict answers corrected by other workers
+    ANSWER_CACHE_SYNC_INTERVAL = float(os.getenv('ANSWER_CACHE_SYNC_INTERVAL', '1'))
+    # Results from these generator sources (e.g. the offline fallback) are never cached
+    ANSWER_CACHE_SKIP_SOURCES = [s.strip() for s in os.getenv('ANSWER_CACHE_SKIP_SOURCES', 'fallback').split(',') if s.strip()]
+
+    # Async Upload Configuration
+    UPLOAD_ASYNC_DEFAULT = os.getenv('UPLOAD_ASYNC_DEFAULT', 'False').lower() == 'true'
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', '4'))
+    UPLOAD_QUEUE_DEPTH = int(os.getenv('UPLOAD_QUEUE_DEPTH', '100'))
+    UPLOAD_JOB_TIMEOUT = int(os.getenv('UPLOAD_JOB_TIMEOUT', '120'))
+    UPLOAD_JOB_RETENTION = int(os.getenv('UPLOAD_JOB_RETENTION', '3600'))
+    UPLOAD_RETRY_AFTER = int(os.getenv('UPLOAD_RETRY_AFTER', '5'))
+
+    # Group Commit Configuration (uploads and corrections share one transaction per batch)
+    WRITE_BATCHING_ENABLED = os.getenv('WRITE_BATCHING_ENABLED', 'False').lower() == 'true'
+    WRITE_BATCH_MAX_ROWS = int(os.getenv('WRITE_BATCH_MAX_ROWS', '200'))
+    WRITE_BATCH_MAX_DELAY_MS = float(os.getenv('WRITE_BATCH_MAX_DELAY_MS', '2'))
+    WRITE_BATCH_TIMEOUT = float(os.getenv('WRITE_BATCH_TIMEOUT', '10'))
+
+    # Admission Control Configuration (off by default: enabling it adds 429/503 answers existing clients may not expect)
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'False').lower() == 'true'
+    # Per-client token buckets: endpoint=requests/seconds[:burst], comma separated
+    RATE_LIMITS = os.getenv('RATE_LIMITS', 'upload_question=60/60,upload_question_stream=60/60,upload_question_batch=10/60')
+    # Endpoints that share the global in-flight cap
+    ADMISSION_EXPENSIVE_ENDPOINTS = os.getenv('ADMISSION_EXPENSIVE_ENDPOINTS', 'upload_question,upload_question_stream,upload_question_batch')
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', '32'))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '64'))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '2'))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', '1'))
+    # Header identifying the client (e.g. X-API-Key or X-Forwarded-For); the remote address otherwise
+    ADMISSION_CLIENT_HEADER = os.getenv('ADMISSION_CLIENT_HEADER', '')
+
+    # Batch Upload Configuration
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '1000'))
+
+    # Question List Configuration (a default limit of 0 returns every row)
+    QUESTIONS_DEFAULT_LIMIT = int(os.getenv('QUESTIONS_DEFAULT_LIMIT', '0'))
+    QUESTIONS_MAX_LIMIT = int(os.getenv('QUESTIONS_MAX_LIMIT', '500'))
+    CHANGES_MAX_LIMIT = int(os.getenv('CHANGES_MAX_LIMIT', '1000'))
+
+    # Accuracy Statistics Configuration (days of daily history returned by /stats)
+    STATS_DEFAULT_DAYS = int(os.getenv('STATS_DEFAULT_DAYS', '30'))
+    STATS_MAX_DAYS = int(os.getenv('STATS_MAX_DAYS', '366'))
+
+    # Export Configuration (rows fetched per server-side cursor batch)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # Bulk Import Configuration
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '1000'))
+
+    # Search Configuration
+    SEARCH_DEFAULT_LIMIT = int(os.getenv('SEARCH_DEFAULT_LIMIT', '20'))
+    SEARCH_MAX_LIMIT = int(os.getenv('SEARCH_MAX_LIMIT', '100'))
+
+    # Near-Duplicate Detection Configuration (answers are only reused when the choices match too;
+    # relative snapshot paths live in the Flask instance folder)
+    NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'False').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.95'))
+    NEAR_DUPLICATE_SNAPSHOT_PATH = os.getenv('NEAR_DUPLICATE_SNAPSHOT_PATH', 'near_duplicates.idx')
+    NEAR_DUPLICATE_SNAPSHOT_EVERY = int(os.getenv('NEAR_DUPLICATE_SNAPSHOT_EVERY', '1000'))
+
+    # Local Answer Engine Configuration (answers from user-corrected questions with the same choices)
+    LOCAL_ANSWER_ENABLED = os.getenv('LOCAL_ANSWER_ENABLED', 'False').lower() == 'true'
+    LOCAL_ANSWER_THRESHOLD = float(os.getenv('LOCAL_ANSWER_THRESHOLD', '0.98'))
+    LOCAL_ANSWER_DIMENSIONS = int(os.getenv('LOCAL_ANSWER_DIMENSIONS', '1024'))
+
+    # Question Read Cache Configuration (encoded GET /questions/<id> payloads; shared tier: '', local:// or redis://...)
+    QUESTION_CACHE_ENABLED = os.getenv('QUESTION_CACHE_ENABLED', 'True').lower() == 'true'
+    QUESTION_CACHE_MAX_ENTRIES = int(os.getenv('QUESTION_CACHE_MAX_ENTRIES', '10000'))
+    QUESTION_CACHE_MAX_BYTES = int(os.getenv('QUESTION_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    QUESTION_CACHE_SYNC_INTERVAL = float(os.getenv('QUESTION_CACHE_SYNC_INTERVAL', '1'))
+    QUESTION_CACHE_SHARED_URL = os.getenv('QUESTION_CACHE_SHARED_URL', '')
+    QUESTION_CACHE_SHARED_TTL = int(os.getenv('QUESTION_CACHE_SHARED_TTL', '300'))
+
+    # Serialization Configuration (orjson when installed; MessagePack for clients sending Accept: application/msgpack)
+    FAST_JSON_ENABLED = os.getenv('FAST_JSON_ENABLED', 'True').lower() == 'true'
+    # Response Compression Configuration (brotli when installed, else gzip; bodies under the minimum stay plain)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+    # Metrics Configuration (Prometheus text format at /metrics)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+    # Request Profiling Configuration (requests opt in with X-Profile or ?profile=)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    # When set, the header/parameter value must equal this token
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+    PROFILING_OUTPUT_DIR = os.getenv('PROFILING_OUTPUT_DIR', 'profiles')
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILING_SAMPLE_INTERVAL_MS', '5'))
+    PROFILING_KEEP = int(os.getenv('PROFILING_KEEP', '50'))
     
     @classmethod
     def get_database_uri(cls):
@@ -26,9 +178,3 @@ class Config:
         # URL encode the password to handle special characters
         encoded_password = quote_plus(cls.DB_PASSWORD)
         return f"mysql+pymysql://{cls.DB_USER}:{encoded_password}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}" 
-
-    def __init__(self):
-        print("Loaded OpenAI key:", self.OPENAI_API_KEY)
-
-print("Loaded OpenAI key:", os.getenv('OPENAI_API_KEY'))
-print("Loaded OpenAI key (from Config):", Config.OPENAI_API_KEY) 
\ No newline at end of file
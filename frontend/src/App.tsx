@@ -43,7 +43,7 @@
 
 // import React, { useState, useEffect, FormEvent } from 'react';
 // import axios, { AxiosError } from 'axios';
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import type { FormEvent } from 'react';
 import axios, { AxiosError } from 'axios';
 import './App.css';
@@ -68,11 +68,54 @@ interface ApiResponse {
   question_id: number;
 }
 
+interface StreamPreview {
+  answer: string | null;
+  explanation: string;
+}
+
 interface ErrorResponse {
   error: string;
   details?: string;
 }
 
+interface ChangesResponse {
+  version: number;
+  has_more: boolean;
+  upserted: Question[];
+  deleted: number[];
+}
+
+// Apply an incremental change set to the list, keeping newest questions first
+const mergeQuestionChanges = (current: Question[], upserted: Question[], deleted: number[]) => {
+  const removed = new Set([...deleted, ...upserted.map((q) => q.id)]);
+  return [...current.filter((q) => !removed.has(q.id)), ...upserted].sort((a, b) => b.id - a.id);
+};
+
+// Read a text/event-stream body and hand every complete event to onEvent
+const readEventStream = async (body: ReadableStream<Uint8Array>, onEvent: (event: string, data: any) => void) => {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')));
+    }
+  }
+};
+
 function App() {
   const [question, setQuestion] = useState('');
   const [choices, setChoices] = useState(['', '', '', '']);
@@ -80,38 +123,84 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
-  const [reportModal, setReportModal] = useState<{ open: boolean; qid: number | null }>({ open: false, qid: null });
+  const [reportModal, setReportModal] = useState<{ open: boolean; qid: number | null; letters: string[] }>({ open: false, qid: null, letters: [] });
   const [correction, setCorrection] = useState<string>('');
+  const [streamPreview, setStreamPreview] = useState<StreamPreview | null>(null);
+  const questionsVersion = useRef<number | null>(null);
 
   const handleSubmit = async (e: FormEvent<HTMLFormElement>) => {
     e.preventDefault();
     setLoading(true);
     setError('');
     setSuccess('');
+    setStreamPreview({ answer: null, explanation: '' });
 
     try {
-      const response = await axios.post<ApiResponse>('http://localhost:5000/upload', {
-        question,
-        choices,
+      // Stream the answer so it shows up before the whole explanation is generated
+      const response = await fetch('http://localhost:5000/upload/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ question, choices }),
       });
-
-      setSuccess(`Question saved successfully! Answer: ${response.data.result.answer}`);
+      if (!response.ok || !response.body) {
+        const data: ErrorResponse = await response.json().catch(() => ({ error: response.statusText }));
+        throw new Error(data.error);
+      }
+
+      let saved: ApiResponse | null = null;
+      let streamError: ErrorResponse | null = null;
+      await readEventStream(response.body, (event, data) => {
+        if (event === 'answer') {
+          setStreamPreview((current) => ({ answer: data.answer, explanation: current?.explanation ?? '' }));
+        } else if (event === 'token') {
+          setStreamPreview((current) => ({ answer: current?.answer ?? null, explanation: (current?.explanation ?? '') + data.text }));
+        } else if (event === 'saved') {
+          saved = data;
+        } else if (event === 'error') {
+          streamError = data;
+        }
+      });
+      if (streamError) {
+        throw new Error((streamError as ErrorResponse).error);
+      }
+      if (!saved) {
+        throw new Error('Connection closed before the question was saved');
+      }
+
+      setSuccess(`Question saved successfully! Answer: ${(saved as ApiResponse).result.answer}`);
       setQuestion('');
       setChoices(['', '', '', '']);
       fetchQuestions();
     } catch (error) {
-      const err = error as AxiosError<ErrorResponse>;
-      const errorMessage = err.response?.data?.error || err.message || 'Unknown error occurred';
+      const errorMessage = (error as Error).message || 'Unknown error occurred';
       setError(`Error saving question: ${errorMessage}`);
     } finally {
+      setStreamPreview(null);
       setLoading(false);
     }
   };
 
   const fetchQuestions = async () => {
     try {
-      const response = await axios.get<Question[]>('http://localhost:5000/questions');
-      setQuestionsList(response.data);
+      if (questionsVersion.current === null) {
+        const response = await axios.get<Question[]>('http://localhost:5000/questions');
+        setQuestionsList(response.data);
+        const version = response.headers['x-questions-version'];
+        questionsVersion.current = version ? Number(version) : null;
+        return;
+      }
+
+      // After the first load, only pull what changed since the last sync
+      let hasMore = true;
+      while (hasMore) {
+        const response = await axios.get<ChangesResponse>('http://localhost:5000/questions/changes', {
+          params: { since: questionsVersion.current },
+        });
+        const { upserted, deleted, version } = response.data;
+        setQuestionsList((current) => mergeQuestionChanges(current, upserted, deleted));
+        questionsVersion.current = version;
+        hasMore = response.data.has_more;
+      }
     } catch (error) {
       const err = error as AxiosError;
       console.error('Error fetching questions:', err);
@@ -134,17 +223,20 @@ function App() {
   };
 
   // Report/Correct Answer Modal Handlers
-  const openReportModal = (qid: number) => {
-    setReportModal({ open: true, qid });
+  // Questions can have any number of choices, lettered A, B, C, ...
+  const choiceLetters = (count: number) => Array.from({ length: count }, (_, index) => String.fromCharCode(65 + index));
+
+  const openReportModal = (qid: number, choiceCount: number) => {
+    setReportModal({ open: true, qid, letters: choiceLetters(choiceCount) });
     setCorrection('');
   };
   const closeReportModal = () => {
-    setReportModal({ open: false, qid: null });
+    setReportModal({ open: false, qid: null, letters: [] });
     setCorrection('');
   };
   const submitCorrection = async () => {
-    if (!reportModal.qid || !['A', 'B', 'C', 'D'].includes(correction)) {
-      setError('Please select a valid correction (A, B, C, or D).');
+    if (!reportModal.qid || !reportModal.letters.includes(correction)) {
+      setError(`Please select a valid correction (${reportModal.letters.join(', ')}).`);
       return;
     }
     try {
@@ -217,6 +309,16 @@ function App() {
               {loading ? '🔄 Processing...' : '🚀 Generate Answer'}
             </button>
           </form>
+
+          {streamPreview && (
+            <div className="answer-section">
+              <h4>AI Answer: {streamPreview.answer ?? '…'}</h4>
+              <div className="explanation">
+                <strong>Explanation:</strong>
+                <p>{streamPreview.explanation}</p>
+              </div>
+            </div>
+          )}
         </section>
 
         {/* Messages */}
@@ -245,7 +347,7 @@ function App() {
           ) : (
             <div className="questions-grid">
               {questionsList.map((q) => {
-                const userCorrectionIndex = q.user_correction ? ['A', 'B', 'C', 'D'].indexOf(q.user_correction) : -1;
+                const userCorrectionIndex = q.user_correction ? choiceLetters(q.choices.length).indexOf(q.user_correction) : -1;
                 return (
                   <div key={q.id} className="question-card">
                     <div className="question-header">
@@ -291,7 +393,7 @@ function App() {
                         )}
                         <button
                           className="report-btn"
-                          onClick={() => openReportModal(q.id)}
+                          onClick={() => openReportModal(q.id, q.choices.length)}
                         >
                           Report/Correct Answer
                         </button>
@@ -310,9 +412,9 @@ function App() {
         <div className="modal-overlay">
           <div className="modal">
             <h3>Report/Correct Answer</h3>
-            <p>Select the correct answer (A, B, C, or D):</p>
+            <p>Select the correct answer ({reportModal.letters.join(', ')}):</p>
             <div className="modal-choices">
-              {['A', 'B', 'C', 'D'].map((letter) => (
+              {reportModal.letters.map((letter) => (
                 <button
                   key={letter}
                   className={`modal-choice-btn${correction === letter ? ' selected' : ''}`}
@@ -0,0 +1,42 @@
+"""Gunicorn settings for `python start.py serve`, read from the SERVE_* variables in config.py."""
+import logging
+import os
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+bind = Config.SERVE_BIND
+workers = Config.SERVE_WORKERS or os.cpu_count() or 1
+worker_class = Config.SERVE_WORKER_CLASS
+# Generator calls are I/O bound, so each worker overlaps several of them on threads (or greenlets)
+threads = Config.SERVE_THREADS
+worker_connections = Config.SERVE_THREADS * 100
+timeout = Config.SERVE_WORKER_TIMEOUT
+# SIGTERM/SIGINT and restarts let in-flight requests finish for this long before workers are killed
+graceful_timeout = Config.SERVE_DRAIN_TIMEOUT
+max_requests = Config.SERVE_MAX_REQUESTS
+max_requests_jitter = Config.SERVE_MAX_REQUESTS // 10
+# Import the app once in the master so workers fork with it loaded. Gevent and eventlet
+# have to patch the standard library before the app is imported, so they load it per worker.
+preload_app = worker_class not in ('gevent', 'eventlet')
+accesslog = '-'
+
+
+def _state(worker):
+    return worker.app.wsgi().extensions['question_api']
+
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master must not be shared with children; drop them without closing
+    if server.cfg.preload_app:
+        from question_model import db
+        with worker.app.wsgi().app_context():
+            db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    try:
+        _state(worker).shutdown(wait=True)
+    except Exception as e:
+        logger.warning(f"Worker {worker.pid} did not shut down cleanly: {str(e)}")
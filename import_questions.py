@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Bulk importer for large JSONL/CSV question files
+Streams the file, inserts questions in batches and can resume from a checkpoint
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import inspect, insert, select, update
+
+from config import Config
+from question_model import db, Question, change_feed, pack_choices, question_stats, unpack_choices
+from services.answer_cache import MAX_CHOICES, MIN_CHOICES, AnswerCache, choice_for_letter, content_hash
+from services.export import CSV_CHOICE_COLUMNS
+from services.migrations import import_checkpoint, migrate
+from services.storage import BACKENDS, get_backend
+
+
+def create_import_app(backend_name, database_uri=None):
+    """Create a minimal Flask app bound to the target database, tuned like the API."""
+    backend = get_backend(backend_name, Config)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri or backend.database_uri()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = backend.engine_options()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        backend.configure_engine(db.engine)
+    return app
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_records(path, fmt):
+    """Yield question records from a JSONL or CSV file one at a time."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def record_to_mapping(record):
+    """Convert a file record into a question row, or None if it is invalid."""
+    question_text = record.get('question') or record.get('question_text')
+    choices = record.get('choices')
+    if isinstance(choices, str):
+        try:
+            choices = json.loads(choices)
+        except ValueError:
+            return None
+    if choices is None:
+        # CSV files have one choice_<letter> column per choice; questions with fewer choices leave the rest empty
+        choices = [record.get(column) for column in CSV_CHOICE_COLUMNS]
+        while choices and not choices[-1]:
+            choices.pop()
+    if not question_text or not isinstance(choices, list) or not MIN_CHOICES <= len(choices) <= MAX_CHOICES:
+        return None
+    if any(not isinstance(choice, str) or not choice.strip() for choice in choices):
+        return None
+
+    answer = record.get('answer') or record.get('predicted_answer') or None
+    if choice_for_letter(answer, choices) is None:
+        answer = None
+    return {
+        "question_text": question_text,
+        "choices": pack_choices(choices),
+        "predicted_answer": answer,
+        "explanation": (record.get('explanation') or None) if answer else None,
+        "content_hash": content_hash(question_text, choices)
+    }
+
+
+def default_checkpoint_name(path):
+    """Name a file's checkpoint by a hash of its absolute path, which always fits the name column."""
+    return 'sha256:' + hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()
+
+
+def load_checkpoint(name):
+    row = db.session.execute(
+        select(import_checkpoint).where(import_checkpoint.c.name == name)
+    ).mappings().first()
+    if row is None:
+        return {"records": 0, "inserted": 0, "invalid": 0}
+    return {"records": row['records'], "inserted": row['inserted'], "invalid": row['invalid'],
+            "completed": row['completed']}
+
+
+def save_checkpoint(name, checkpoint):
+    """Stage the checkpoint in the current transaction; it commits with the rows it accounts for."""
+    values = {
+        "records": checkpoint['records'],
+        "inserted": checkpoint['inserted'],
+        "invalid": checkpoint['invalid'],
+        "completed": bool(checkpoint.get('completed')),
+        "updated_at": datetime.utcnow()
+    }
+    updated = db.session.execute(
+        update(import_checkpoint).where(import_checkpoint.c.name == name).values(**values)
+    ).rowcount
+    if not updated:
+        db.session.execute(insert(import_checkpoint).values(name=name, **values))
+
+
+def returns_ids_from_executemany():
+    return db.engine.dialect.insert_executemany_returning
+
+
+def insert_batch(mappings, checkpoint_name, checkpoint):
+    """Insert a batch, log the new ids in the change feed and commit both with the checkpoint.
+
+    Dialects that return ids from an executemany (SQLite, PostgreSQL, MariaDB) get one
+    statement per batch. Elsewhere (MySQL) rows go through the ORM, whose insert events
+    write the change log and the /stats counters.
+    """
+    if mappings and returns_ids_from_executemany():
+        new_ids = db.session.execute(
+            insert(Question.__table__).returning(Question.__table__.c.id), mappings
+        ).scalars().all()
+        # Core inserts bypass the ORM events, so record the change-log entries explicitly
+        db.session.execute(
+            insert(change_feed.table),
+            [{"question_id": question_id, "op": "insert"} for question_id in new_ids]
+        )
+        question_stats.record_bulk_insert(mappings)
+    elif mappings:
+        db.session.add_all(
+            Question(**dict(mapping, choices=unpack_choices(mapping['choices']))) for mapping in mappings
+        )
+        db.session.flush()
+    save_checkpoint(checkpoint_name, checkpoint)
+    db.session.commit()
+
+
+def print_progress(checkpoint, started_at, imported):
+    elapsed = max(time.monotonic() - started_at, 1e-9)
+    print(f"\r📥 {checkpoint['inserted']} rows imported, {checkpoint['invalid']} skipped "
+          f"({imported / elapsed:.0f} rows/sec)", end='', flush=True)
+
+
+def import_file(path, fmt, batch_size, checkpoint_name, restart=False):
+    """Stream a question file into the database, resuming from the checkpoint."""
+    if not inspect(db.engine).has_table(import_checkpoint.name):
+        print("❌ The import_checkpoint table is missing. Run `python import_questions.py migrate` first.")
+        sys.exit(1)
+    if len(checkpoint_name) > import_checkpoint.c.name.type.length:
+        print(f"❌ Checkpoint names are limited to {import_checkpoint.c.name.type.length} characters.")
+        sys.exit(1)
+    checkpoint = {"records": 0, "inserted": 0, "invalid": 0} if restart else load_checkpoint(checkpoint_name)
+    if checkpoint.get('completed'):
+        print(f"✅ {path} was already imported (use --restart to import it again)")
+        return checkpoint
+    if checkpoint['records']:
+        print(f"↪️  Resuming after {checkpoint['records']} records")
+
+    started_at = time.monotonic()
+    imported = 0
+    batch = []
+    records_seen = 0
+    for record in read_records(path, fmt):
+        records_seen += 1
+        if records_seen <= checkpoint['records']:
+            continue
+        mapping = record_to_mapping(record)
+        if mapping is None:
+            checkpoint['invalid'] += 1
+        else:
+            batch.append(mapping)
+        if len(batch) >= batch_size:
+            checkpoint['inserted'] += len(batch)
+            checkpoint['records'] = records_seen
+            insert_batch(batch, checkpoint_name, checkpoint)
+            imported += len(batch)
+            print_progress(checkpoint, started_at, imported)
+            batch = []
+
+    checkpoint['inserted'] += len(batch)
+    checkpoint['records'] = records_seen
+    checkpoint['completed'] = True
+    insert_batch(batch, checkpoint_name, checkpoint)
+    imported += len(batch)
+    print_progress(checkpoint, started_at, imported)
+    print(f"\n✅ Import finished: {imported} rows in {time.monotonic() - started_at:.1f}s")
+    return checkpoint
+
+
+def backfill_answers(app, batch_size, workers):
+    """Generate answers for rows imported without one."""
+    from services.ai_answer_generator import generate_answer_and_explanation
+
+    answer_cache = AnswerCache(
+        generate_answer_and_explanation,
+        max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+        ttl=Config.ANSWER_CACHE_TTL,
+        skip_sources=Config.ANSWER_CACHE_SKIP_SOURCES,
+        enabled=Config.ANSWER_CACHE_ENABLED
+    )
+
+    def generate(row_values):
+        question_text, choices, key = row_values
+        with app.app_context():
+            return answer_cache.get_or_generate(question_text, choices, model=Question, key=key)
+
+    started_at = time.monotonic()
+    answered = 0
+    failed = 0
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            rows = (Question.query
+                    .filter(Question.predicted_answer.is_(None), Question.id > last_id)
+                    .order_by(Question.id)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                break
+            futures = [
+                executor.submit(generate, (
+                    row.question_text,
+                    row.choices,
+                    row.content_hash
+                ))
+                for row in rows
+            ]
+            for row, future in zip(rows, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Leave the row unanswered so a later backfill can retry it
+                    failed += 1
+                    print(f"\n⚠️  Failed to answer question {row.id}: {e}")
+                    continue
+                row.predicted_answer = result['answer']
+                row.explanation = result['explanation']
+                answered += 1
+            db.session.commit()
+            last_id = rows[-1].id
+            elapsed = max(time.monotonic() - started_at, 1e-9)
+            print(f"\r🤖 {answered} answers generated, {failed} failed ({answered / elapsed:.1f} rows/sec)", end='', flush=True)
+    print(f"\n✅ Backfill finished: {answered} answered, {failed} failed")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Bulk import questions from JSONL or CSV files")
+    parser.add_argument('--backend', choices=[name for name in BACKENDS if name != 'memory'],
+                        default=Config.STORAGE_BACKEND, help="Storage backend to import into")
+    parser.add_argument('--database-uri', default=None,
+                        help="SQLAlchemy database URI (defaults to the backend settings in .env)")
+    parser.add_argument('--create-tables', action='store_true',
+                        help="Create missing tables and apply schema migrations before running the command")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help="Import a JSONL or CSV file")
+    load_parser.add_argument('path', help="Input file (.jsonl or .csv)")
+    load_parser.add_argument('--format', choices=['jsonl', 'csv'], help="Input format (detected from the extension by default)")
+    load_parser.add_argument('--batch-size', type=int, default=Config.IMPORT_BATCH_SIZE, help="Rows per insert batch")
+    load_parser.add_argument('--checkpoint', help="Checkpoint name in the database, up to 255 characters (defaults to a hash of the absolute input path)")
+    load_parser.add_argument('--restart', action='store_true', help="Ignore any existing checkpoint")
+    load_parser.add_argument('--backfill', action='store_true',
+                             help="Generate answers for rows without one after the import finishes")
+
+    backfill_parser = subparsers.add_parser('backfill', help="Generate answers for rows imported without one")
+    backfill_parser.add_argument('--batch-size', type=int, default=Config.BATCH_CONCURRENCY * 8, help="Rows fetched per pass")
+    backfill_parser.add_argument('--workers', type=int, default=Config.BATCH_CONCURRENCY, help="Concurrent generator calls")
+
+    subparsers.add_parser('rebuild-stats', help="Recompute the /stats totals from the question table")
+    subparsers.add_parser('migrate', help="Apply pending schema migrations")
+
+    args = parser.parse_args()
+    app = create_import_app(args.backend, args.database_uri)
+
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+        if args.create_tables or args.command == 'migrate':
+            applied = migrate(db.engine)
+            print(f"✅ Applied schema migrations {applied}" if applied else "✅ Schema is up to date")
+
+        if args.command == 'load':
+            if not os.path.exists(args.path):
+                print(f"❌ File not found: {args.path}")
+                sys.exit(1)
+            fmt = detect_format(args.path, args.format)
+            checkpoint_name = args.checkpoint or default_checkpoint_name(args.path)
+            import_file(args.path, fmt, args.batch_size, checkpoint_name, restart=args.restart)
+            if args.backfill:
+                backfill_answers(app, Config.BATCH_CONCURRENCY * 8, Config.BATCH_CONCURRENCY)
+        elif args.command == 'rebuild-stats':
+            counted = question_stats.rebuild()
+            print(f"✅ Stats rebuilt from {counted} questions")
+        elif args.command == 'backfill':
+            backfill_answers(app, args.batch_size, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,37 @@ USE questiondb;
 CREATE TABLE IF NOT EXISTS question (
     id INT AUTO_INCREMENT PRIMARY KEY,
     question_text TEXT NOT NULL,
-    choice_a VARCHAR(255),
-    choice_b VARCHAR(255),
-    choice_c VARCHAR(255),
-    choice_d VARCHAR(255),
+    choices TEXT NOT NULL,
     predicted_answer VARCHAR(1),
     explanation TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+    content_hash CHAR(64),
+    user_correction VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_question_content_hash (content_hash),
+    INDEX ix_question_created_at_id (created_at, id),
+    INDEX ix_question_user_correction_id (user_correction, id),
+    FULLTEXT INDEX ft_question_text_explanation (question_text, explanation)
+);
+
+CREATE TABLE IF NOT EXISTS question_change (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    question_id INT NOT NULL,
+    op VARCHAR(10) NOT NULL,
+    changed_at DATETIME NOT NULL,
+    INDEX ix_question_change_question_id_id (question_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS question_stat (
+    period VARCHAR(10) NOT NULL,
+    predicted_answer VARCHAR(1) NOT NULL,
+    questions INT NOT NULL DEFAULT 0,
+    confirmed INT NOT NULL DEFAULT 0,
+    corrected INT NOT NULL DEFAULT 0,
+    deleted INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, predicted_answer)
+);
+
+-- Upgrading an existing database: every column and index above is added by the versioned
+-- migrations (content_hash is backfilled), the full-text index by the search backend:
+-- python app.py --init-schema  (or python import_questions.py migrate)
+-- Then fill the question_stat totals: python import_questions.py rebuild-stats
\ No newline at end of file
@@ -1,35 +1,95 @@
+import json
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from services.change_feed import ChangeFeed
+from services.question_stats import QuestionStats
 
 db = SQLAlchemy()
 
+
+def pack_choices(choices):
+    return json.dumps(list(choices), ensure_ascii=False)
+
+
+def unpack_choices(packed):
+    return json.loads(packed) if packed else []
+
+
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     question_text = db.Column(db.Text, nullable=False)
-    choice_a = db.Column(db.String(255))
-    choice_b = db.Column(db.String(255))
-    choice_c = db.Column(db.String(255))
-    choice_d = db.Column(db.String(255))
+    # JSON array of any number of choices; replaces the fixed choice_a..choice_d columns (see services/migrations.py)
+    packed_choices = db.Column('choices', db.Text, nullable=False)
     predicted_answer = db.Column(db.String(1))
     explanation = db.Column(db.Text)
+    content_hash = db.Column(db.String(64), index=True)
+    user_correction = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=db.func.current_timestamp())
+
+    # Keyset pages filtered by creation time or review state walk these instead of the whole table
+    __table_args__ = (
+        db.Index('ix_question_created_at_id', 'created_at', 'id'),
+        db.Index('ix_question_user_correction_id', 'user_correction', 'id'),
+    )
 
-    def __init__(self, question_text, choice_a, choice_b, choice_c, choice_d, predicted_answer, explanation):
+    def __init__(self, question_text, choices, predicted_answer, explanation, user_correction=None, content_hash=None):
         self.question_text = question_text
-        self.choice_a = choice_a
-        self.choice_b = choice_b
-        self.choice_c = choice_c
-        self.choice_d = choice_d
+        self.choices = choices
         self.predicted_answer = predicted_answer
         self.explanation = explanation
+        self.user_correction = user_correction
+        self.content_hash = content_hash
 
-    def to_dict(self):
+    @property
+    def choices(self):
+        return unpack_choices(self.packed_choices)
+
+    @choices.setter
+    def choices(self, choices):
+        self.packed_choices = pack_choices(choices)
+
+    # API field name -> backing columns, used for ?fields= projections
+    FIELD_COLUMNS = {
+        "id": ["id"],
+        "question": ["question_text"],
+        "choices": ["packed_choices"],
+        "answer": ["predicted_answer"],
+        "explanation": ["explanation"],
+        "user_correction": ["user_correction"],
+        "created_at": ["created_at"]
+    }
+
+    # Fields whose stored value needs decoding before it is returned
+    FIELD_DECODERS = {
+        "choices": unpack_choices
+    }
+
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {field: self.field_value(field) for field in fields}
         return {
             "id": self.id,
             "question": self.question_text,
-            "choices": [self.choice_a, self.choice_b, self.choice_c, self.choice_d],
+            "choices": self.choices,
             "answer": self.predicted_answer,
-            "explanation": self.explanation
+            "explanation": self.explanation,
+            "user_correction": self.user_correction,
+            "created_at": self.created_at
         }
 
+    def field_value(self, field):
+        """Return a single API field without touching columns it doesn't need."""
+        if field == 'choices':
+            return self.choices
+        return getattr(self, self.FIELD_COLUMNS[field][0])
+
+# Log question changes for ETags and incremental sync
+change_feed = ChangeFeed(db, Question)
+
+# Accuracy counters served by /stats
+question_stats = QuestionStats(db, Question)
+
 
 
 
@@ -0,0 +1,663 @@
+"""HTTP routes of the Question Answer API, registered on every app built by create_app."""
+from flask import Blueprint, current_app, request, jsonify, url_for, stream_with_context, send_file
+from question_model import db, Question, change_feed, question_stats
+from services.answer_cache import ANSWER_LETTERS, MAX_CHOICES, MIN_CHOICES, choice_for_letter, content_hash
+from services.answer_stream import StreamedResult, sse_event
+from services.job_queue import QueueFullError
+from services.write_batcher import WriteTimeoutError
+from services.question_queries import (
+    parse_list_params, parse_positive_int, parse_non_negative_int, parse_fields, parse_bool, parse_datetime,
+    select_fields, fetch_question_page
+)
+from services.export import EXPORT_FORMATS, build_export_query, export_stream
+from services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.serialization import dumps_json, render, render_encoded, representation_key
+from concurrent.futures import Future
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+questions_api = Blueprint('questions', __name__)
+
+DEGRADED_MESSAGE = "Question saved without an answer. It will be answered once the answer service recovers."
+
+def api_state():
+    """Return the per-app services (caches, pools, indexes) set up by create_app."""
+    return current_app.extensions['question_api']
+
+@questions_api.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint."""
+    return jsonify({
+        "status": "ok",
+        "message": f"Question Answer API is running ({api_state().backend.label})",
+        "version": "1.0.0"
+    }), 200
+
+def validate_question_payload(data):
+    """Validate an upload payload, returning (question_text, choices, error)."""
+    question_text = data.get('question')
+    choices = data.get('choices')
+
+    # Validate input
+    if not question_text or not isinstance(choices, list) or not MIN_CHOICES <= len(choices) <= MAX_CHOICES:
+        return None, None, f"Invalid input. 'question' and {MIN_CHOICES} to {MAX_CHOICES} 'choices' are required."
+
+    # Check for empty choices
+    if any(not isinstance(choice, str) or not choice.strip() for choice in choices):
+        return None, None, "All choices must be non-empty."
+
+    return question_text, choices, None
+
+def generate_and_save_question(question_text, choices, job=None):
+    """Generate an answer for a validated question and persist it."""
+    logger.info(f"Processing question: {question_text[:50]}...")
+
+    # Generate answer and explanation (served from cache for repeat questions)
+    question_hash = content_hash(question_text, choices)
+    deadline = None
+    if job is not None:
+        job.check_deadline()
+        deadline = job.deadline
+    result = api_state().answer_cache.get_or_generate(
+        question_text, choices, model=Question, key=question_hash, deadline=deadline
+    )
+
+    # Don't write rows for jobs whose caller has already been told they timed out
+    if job is not None:
+        job.check_deadline()
+
+    return save_question(question_text, choices, result, question_hash), result
+
+def is_degraded(result):
+    """A result without an answer comes from the fallback; its row waits for `import_questions.py backfill`."""
+    return result.get('answer') is None
+
+def stored_explanation(result):
+    # The fallback's placeholder is not an explanation, so unanswered rows are saved without one
+    return None if is_degraded(result) else result['explanation']
+
+def saved_body(result, question_id):
+    """Response body for a saved upload, flagging questions saved without an answer."""
+    degraded = is_degraded(result)
+    return {
+        "message": DEGRADED_MESSAGE if degraded else "Question saved successfully",
+        "result": result,
+        "question_id": question_id,
+        "degraded": degraded
+    }
+
+def save_question(question_text, choices, result, question_hash):
+    """Persist a question together with its generated answer and return its id."""
+    def insert(session):
+        new_question = Question(
+            question_text=question_text,
+            choices=choices,
+            predicted_answer=result['answer'],
+            explanation=stored_explanation(result),
+            content_hash=question_hash
+        )
+        session.add(new_question)
+        session.flush()
+        return new_question.id
+
+    with api_state().metrics.span('db_commit'):
+        question_id = commit_write(insert)
+
+    logger.info(f"Question saved with ID: {question_id}")
+    return question_id
+
+def commit_write(operation):
+    """Run operation(session) and commit it, through the group commit writer when it is enabled."""
+    batcher = api_state().write_batcher
+    if batcher is not None:
+        # Return this request's pooled connection first, or waiting requests could starve the writer of one
+        db.session.commit()
+        return batcher.submit(operation)
+    result = operation(db.session)
+    db.session.commit()
+    return result
+
+def write_timeout_response(error):
+    """503 for a write the group commit writer did not commit in time."""
+    db.session.rollback()
+    response = jsonify({
+        "error": "The database is busy. Please retry later.",
+        "details": str(error)
+    })
+    response.headers['Retry-After'] = str(current_app.config['UPLOAD_RETRY_AFTER'])
+    return response, 503
+
+def run_upload_job(job, app, question_text, choices):
+    """Background worker entry point for an asynchronous upload."""
+    with app.app_context():
+        try:
+            question_id, result = generate_and_save_question(question_text, choices, job)
+        except Exception:
+            db.session.rollback()
+            raise
+        return {"result": result, "question_id": question_id, "degraded": is_degraded(result)}
+
+def wants_async_upload():
+    """Check the request (?async= or Prefer: respond-async) for async mode."""
+    value = request.args.get('async')
+    if value is not None:
+        return value.lower() in ('1', 'true', 'yes')
+    if 'respond-async' in request.headers.get('Prefer', ''):
+        return True
+    return current_app.config['UPLOAD_ASYNC_DEFAULT']
+
+@questions_api.route('/upload', methods=['POST'])
+def upload_question():
+    """Upload a new question with choices and get AI-generated answer."""
+    try:
+        data = request.get_json(silent=True) or {}
+        question_text, choices, error = validate_question_payload(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        if wants_async_upload():
+            try:
+                job = api_state().upload_jobs.submit(
+                    run_upload_job, current_app._get_current_object(), question_text, choices
+                )
+            except QueueFullError as e:
+                response = jsonify({
+                    "error": "Upload queue is full. Please retry later.",
+                    "details": str(e)
+                })
+                response.headers['Retry-After'] = str(current_app.config['UPLOAD_RETRY_AFTER'])
+                return response, 503
+
+            status_url = url_for('questions.get_job', job_id=job.id)
+            response = jsonify({
+                "message": "Question accepted for processing",
+                "job_id": job.id,
+                "status_url": status_url
+            })
+            response.headers['Location'] = status_url
+            return response, 202
+
+        question_id, result = generate_and_save_question(question_text, choices)
+
+        with api_state().metrics.span('serialize'):
+            response = jsonify(saved_body(result, question_id))
+        return response, 201
+
+    except WriteTimeoutError as e:
+        logger.error(f"Timed out saving question: {str(e)}")
+        return write_timeout_response(e)
+    except Exception as e:
+        logger.error(f"Error saving question: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            "error": "Internal server error",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/upload/stream', methods=['POST'])
+def upload_question_stream():
+    """Upload a question and stream the answer and explanation back as Server-Sent Events."""
+    data = request.get_json(silent=True) or {}
+    question_text, choices, error = validate_question_payload(data)
+    if error:
+        return jsonify({"error": error}), 400
+    question_hash = content_hash(question_text, choices)
+    logger.info(f"Streaming question: {question_text[:50]}...")
+
+    def events():
+        # Flush headers right away instead of waiting for the first token
+        yield ": stream opened\n\n"
+        streamed = StreamedResult()
+        answer_sent = False
+        try:
+            for chunk in api_state().stream_answer(question_text, choices, question_hash):
+                streamed.add(chunk)
+                # Sent even when the answer is null (fallback), so clients can rely on it
+                if not answer_sent and 'answer' in chunk:
+                    answer_sent = True
+                    yield sse_event('answer', streamed.metadata())
+                if chunk.get('explanation'):
+                    yield sse_event('token', {"text": chunk['explanation']})
+
+            if not answer_sent:
+                yield sse_event('answer', dict({"answer": None}, **streamed.metadata()))
+            result = streamed.result()
+            question_id = save_question(question_text, choices, result, question_hash)
+            yield sse_event('saved', saved_body(result, question_id))
+        except Exception as e:
+            logger.error(f"Error streaming question: {str(e)}")
+            db.session.rollback()
+            yield sse_event('error', {"error": "Internal server error", "details": str(e)})
+
+    response = current_app.response_class(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies such as nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def generate_answer_in_context(app, question_text, choices, question_hash):
+    """Run a cached generator call from a batch worker thread."""
+    with app.app_context():
+        return api_state().answer_cache.get_or_generate(question_text, choices, model=Question, key=question_hash)
+
+@questions_api.route('/upload/batch', methods=['POST'])
+def upload_question_batch():
+    """Upload many questions at once, generating answers concurrently."""
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('questions') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                "error": "Invalid input. Provide a non-empty list of {question, choices} items."
+            }), 400
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(items) > max_items:
+            return jsonify({
+                "error": f"Too many questions. At most {max_items} items are allowed per batch."
+            }), 400
+
+        app = current_app._get_current_object()
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            question_text, choices, error = validate_question_payload(item if isinstance(item, dict) else {})
+            if error:
+                results[index] = {"index": index, "status": "error", "error": error}
+                continue
+            valid[index] = (question_text, choices)
+
+        # Answer what we can from user corrections in one matrix product, generate the rest
+        local_results = api_state().find_local_answers(list(valid.values()))
+        futures = {}
+        for (index, (question_text, choices)), local_result in zip(valid.items(), local_results):
+            question_hash = content_hash(question_text, choices)
+            if local_result is not None:
+                future = Future()
+                future.set_result(local_result)
+            else:
+                future = api_state().batch_executor.submit(
+                    generate_answer_in_context, app, question_text, choices, question_hash
+                )
+            futures[index] = (future, question_text, choices, question_hash)
+
+        logger.info(f"Processing batch of {len(items)} questions ({len(futures)} valid)")
+
+        new_questions = {}
+        for index, (future, question_text, choices, question_hash) in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error generating answer for batch item {index}: {str(e)}")
+                results[index] = {"index": index, "status": "error", "error": str(e)}
+                continue
+            new_questions[index] = Question(
+                question_text=question_text,
+                choices=choices,
+                predicted_answer=result['answer'],
+                explanation=stored_explanation(result),
+                content_hash=question_hash
+            )
+            results[index] = {"index": index, "status": "saved", "result": result, "degraded": is_degraded(result)}
+
+        # Insert every generated row in a single transaction
+        db.session.add_all(new_questions.values())
+        with api_state().metrics.span('db_commit'):
+            db.session.commit()
+
+        for index, new_question in new_questions.items():
+            results[index]["question_id"] = new_question.id
+
+        logger.info(f"Batch saved {len(new_questions)} of {len(items)} questions")
+
+        return jsonify({
+            "message": f"Saved {len(new_questions)} of {len(items)} questions",
+            "saved": len(new_questions),
+            "failed": len(items) - len(new_questions),
+            "results": results
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error saving question batch: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            "error": "Internal server error",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status of an asynchronous upload job."""
+    job = api_state().upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@questions_api.route('/stats', methods=['GET'])
+def get_stats():
+    """Report how often predicted answers agree with user corrections, overall, per letter and per day."""
+    try:
+        try:
+            days = parse_positive_int(request.args.get('days'), 'days') or current_app.config['STATS_DEFAULT_DAYS']
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        stats = question_stats.summary(min(days, current_app.config['STATS_MAX_DAYS']))
+        return jsonify(stats), 200
+    except Exception as e:
+        logger.error(f"Error fetching stats: {str(e)}")
+        return jsonify({
+            "error": "Failed to retrieve stats",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/generator/stats', methods=['GET'])
+def generator_stats():
+    """Report circuit breaker state, retries, hedges and fallbacks of the answer generator."""
+    generator = api_state().resilient_generator
+    if generator is None:
+        return jsonify({"error": "Generator resilience is disabled"}), 404
+    return jsonify(generator.stats()), 200
+
+@questions_api.route('/generator/batches/stats', methods=['GET'])
+def micro_batch_stats():
+    """Report packed generator calls: batch sizes, parse failures and individual fallbacks."""
+    batcher = api_state().micro_batcher
+    if batcher is None:
+        return jsonify({"error": "Micro-batching is disabled"}), 404
+    return jsonify(batcher.stats()), 200
+
+@questions_api.route('/writes/stats', methods=['GET'])
+def write_batcher_stats():
+    """Report group commits: transactions, rows per commit and writes waiting."""
+    batcher = api_state().write_batcher
+    if batcher is None:
+        return jsonify({"error": "Write batching is disabled"}), 404
+    return jsonify(batcher.stats()), 200
+
+@questions_api.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """Report in-flight, queued and rejected expensive requests."""
+    return jsonify(api_state().admission.stats()), 200
+
+@questions_api.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report answer cache hit/miss counters."""
+    return jsonify(api_state().answer_cache.stats()), 200
+
+@questions_api.route('/question-cache/stats', methods=['GET'])
+def question_cache_stats():
+    """Report single-question cache hit ratio, entries and memory use."""
+    return jsonify(api_state().question_cache.stats()), 200
+
+@questions_api.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose request, stage and pool metrics in the Prometheus text format."""
+    state = api_state()
+    if not state.metrics.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return current_app.response_class(state.metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+@questions_api.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Return the stored report (timings, SQL log, top functions) of a profiled request."""
+    profiler = api_state().profiler
+    report = profiler.report(profile_id) if profiler.enabled else None
+    if report is None:
+        return jsonify({"error": "Profile not found"}), 404
+    report['download_url'] = url_for('questions.download_profile', profile_id=profile_id)
+    return jsonify(report), 200
+
+@questions_api.route('/profiles/<profile_id>/download', methods=['GET'])
+def download_profile(profile_id):
+    """Download the raw cProfile stats or collapsed stacks of a profiled request."""
+    profiler = api_state().profiler
+    path, mimetype = profiler.artifact_path(profile_id) if profiler.enabled else (None, None)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
+
+@questions_api.route('/local-answers/stats', methods=['GET'])
+def local_answer_stats():
+    """Report local answer engine size and hit counters."""
+    return jsonify(api_state().local_answers.stats()), 200
+
+@questions_api.route('/near-duplicates/stats', methods=['GET'])
+def near_duplicate_stats():
+    """Report near-duplicate index size and hit counters."""
+    return jsonify(api_state().near_duplicate_index.stats()), 200
+
+@questions_api.route('/questions', methods=['GET'])
+def get_questions():
+    """Retrieve questions newest first, with keyset pagination, field projection and created_at/corrected filters."""
+    try:
+        try:
+            params = parse_list_params(
+                request.args, Question,
+                default_limit=current_app.config['QUESTIONS_DEFAULT_LIMIT'],
+                max_limit=current_app.config['QUESTIONS_MAX_LIMIT']
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Answer conditional requests from the change log before touching the question table;
+        # JSON, MessagePack and each content coding are different representations with their own ETag
+        version = change_feed.current_version()
+        representation = representation_key(api_state().compressor).encode('utf-8')
+        etag = change_feed.etag(version, request.query_string + b'|' + representation)
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            response.vary.update(('Accept', 'Accept-Encoding'))
+            return response
+
+        items, next_before_id = fetch_question_page(Question, **params)
+        with api_state().metrics.span('serialize'):
+            response = render(items)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Questions-Version'] = str(version)
+
+        # Point clients at the next page; the body stays a plain list for compatibility
+        if next_before_id is not None:
+            next_url = url_for(
+                'questions.get_questions',
+                before_id=next_before_id,
+                limit=params['limit'],
+                fields=request.args.get('fields'),
+                created_from=request.args.get('created_from'),
+                created_to=request.args.get('created_to'),
+                corrected=request.args.get('corrected')
+            )
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+            response.headers['X-Next-Before-Id'] = str(next_before_id)
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching questions: {str(e)}")
+        return jsonify({
+            "error": "Failed to retrieve questions",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/changes', methods=['GET'])
+def get_question_changes():
+    """Return questions inserted, updated or deleted since a change-log version."""
+    try:
+        try:
+            since = parse_non_negative_int(request.args.get('since'), 'since')
+            limit = parse_positive_int(request.args.get('limit'), 'limit') or current_app.config['CHANGES_MAX_LIMIT']
+            fields = parse_fields(request.args.get('fields'), Question.FIELD_COLUMNS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        changes = change_feed.changes_since(since, min(limit, current_app.config['CHANGES_MAX_LIMIT']), fields)
+        response = render(changes)
+        response.headers['X-Questions-Version'] = str(changes['version'])
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching question changes: {str(e)}")
+        return jsonify({
+            "error": "Failed to retrieve question changes",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/export', methods=['GET'])
+def export_questions():
+    """Stream the question bank as NDJSON or CSV without building it in memory."""
+    try:
+        fmt = request.args.get('format', 'ndjson').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({
+                "error": f"Unsupported format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}."
+            }), 400
+        try:
+            fields = parse_fields(request.args.get('fields'), Question.FIELD_COLUMNS) or list(Question.FIELD_COLUMNS)
+            query = build_export_query(
+                Question,
+                created_from=parse_datetime(request.args.get('created_from'), 'created_from'),
+                created_to=parse_datetime(request.args.get('created_to'), 'created_to'),
+                corrected=parse_bool(request.args.get('corrected'))
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        query, row_to_dict = select_fields(query, Question, fields)
+
+        # ?gzip= forces gzip on or off, otherwise use the best coding the client accepts (brotli when installed)
+        encoding = None
+        force_gzip = parse_bool(request.args.get('gzip'))
+        if force_gzip is None:
+            encoding = api_state().compressor.encoding_for(request.accept_encodings)
+        elif force_gzip:
+            encoding = 'gzip'
+
+        mimetype, extension = EXPORT_FORMATS[fmt]
+        body = export_stream(query, fmt, fields, row_to_dict,
+                             batch_size=current_app.config['EXPORT_BATCH_SIZE'], encoding=encoding)
+        response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=questions.{extension}'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+    except Exception as e:
+        logger.error(f"Error exporting questions: {str(e)}")
+        return jsonify({
+            "error": "Failed to export questions",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/search', methods=['GET'])
+def search_questions():
+    """Full-text search over question text and explanations, best match first."""
+    try:
+        query_text = (request.args.get('q') or '').strip()
+        if not query_text:
+            return jsonify({"error": "A search query 'q' is required."}), 400
+        try:
+            limit = parse_positive_int(request.args.get('limit'), 'limit') or current_app.config['SEARCH_DEFAULT_LIMIT']
+            limit = min(limit, current_app.config['SEARCH_MAX_LIMIT'])
+            offset = parse_non_negative_int(request.args.get('offset'), 'offset')
+            fields = parse_fields(request.args.get('fields'), Question.FIELD_COLUMNS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        matches = api_state().search_index.search_questions(query_text, limit=limit, offset=offset)
+        results = []
+        for question, score in matches:
+            item = question.to_dict(fields)
+            item['score'] = score
+            results.append(item)
+
+        return render({
+            "query": query_text,
+            "results": results,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + limit if len(matches) == limit else None
+        })
+    except Exception as e:
+        logger.error(f"Error searching questions: {str(e)}")
+        return jsonify({
+            "error": "Failed to search questions",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/<int:question_id>', methods=['GET'])
+def get_question(question_id):
+    """Retrieve a specific question by ID."""
+    try:
+        cache = api_state().question_cache
+        body = cache.get(question_id)
+        if body is None:
+            stamp = cache.stamp()
+            question = db.session.get(Question, question_id)
+            if question is None:
+                return jsonify({"error": "Question not found"}), 404
+            with api_state().metrics.span('serialize'):
+                body = dumps_json(question.to_dict(), fast=current_app.config.get('FAST_JSON_ENABLED', True))
+            cache.put(question_id, body, stamp)
+        return render_encoded(body)
+    except Exception as e:
+        logger.error(f"Error fetching question {question_id}: {str(e)}")
+        return jsonify({
+            "error": "Failed to retrieve question",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/<int:question_id>', methods=['DELETE'])
+def delete_question(question_id):
+    """Delete a specific question by ID."""
+    try:
+        question = db.session.get(Question, question_id)
+        if question is None:
+            return jsonify({"error": "Question not found"}), 404
+        db.session.delete(question)
+        with api_state().metrics.span('db_commit'):
+            db.session.commit()
+        api_state().question_cache.invalidate(question_id)
+        return jsonify({"message": "Question deleted successfully"}), 200
+    except Exception as e:
+        logger.error(f"Error deleting question {question_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to delete question",
+            "details": str(e)
+        }), 500
+
+@questions_api.route('/questions/<int:question_id>/report', methods=['POST'])
+def report_wrong_answer(question_id):
+    """Allow user to report/correct the answer for a question."""
+    try:
+        data = request.get_json(silent=True) or {}
+        correction = data.get('correction')
+        question = db.session.get(Question, question_id)
+        if question is None:
+            return jsonify({"error": "Question not found"}), 404
+        if not correction or choice_for_letter(correction, question.choices) is None:
+            letters = ANSWER_LETTERS[:len(question.choices)]
+            return jsonify({"error": f"Correction must be one of {', '.join(repr(letter) for letter in letters)}."}), 400
+        question_hash = question.content_hash
+
+        def update(session):
+            row = session.get(Question, question_id)
+            if row is None:
+                return False
+            row.user_correction = correction
+            return True
+
+        with api_state().metrics.span('db_commit'):
+            found = commit_write(update)
+        if not found:
+            return jsonify({"error": "Question not found"}), 404
+        api_state().question_cache.invalidate(question_id)
+        # The cached answer for this hash may be the prediction just corrected (or confirmed), and the
+        # database tier now prefers this reviewed row, so drop the entry and let the next lookup reload it
+        api_state().answer_cache.invalidate(question_hash)
+        return jsonify({"message": "Correction saved.", "user_correction": correction}), 200
+    except WriteTimeoutError as e:
+        logger.error(f"Timed out saving correction: {str(e)}")
+        return write_timeout_response(e)
+    except Exception as e:
+        logger.error(f"Error saving correction: {str(e)}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to save correction.", "details": str(e)}), 500
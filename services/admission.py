@@ -0,0 +1,198 @@
+"""Admission control for expensive endpoints: per-client token buckets plus a global in-flight cap."""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rate_limits(spec):
+    """Parse 'endpoint=requests/seconds[:burst],...' into {endpoint: (rate_per_second, burst)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        try:
+            endpoint, rule = item.split('=', 1)
+            rule, _, burst = rule.partition(':')
+            requests, seconds = rule.split('/', 1)
+            limits[endpoint.strip()] = (int(requests) / float(seconds), int(burst or requests))
+        except ValueError:
+            raise ValueError(f"Invalid rate limit '{item}'. Use endpoint=requests/seconds[:burst].")
+    return limits
+
+
+class TokenBucket:
+    """Classic token bucket; not thread-safe on its own."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, cost=1):
+        """Spend cost tokens, returning 0 on success or the seconds until enough have refilled."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Token buckets per (endpoint, client), keeping only the most recently seen clients."""
+
+    def __init__(self, limits, max_clients=10000):
+        self.limits = limits
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, endpoint, client):
+        """Return 0 if the request may proceed, else the seconds to wait."""
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return 0
+        key = (endpoint, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*limit)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take()
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight work; a bounded number of callers may wait briefly for a slot."""
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, returning False when the queue is full or the wait timed out."""
+        with self._condition:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return True
+            if self.waiting >= self.max_queue:
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        if self.in_flight >= self.max_in_flight:
+                            return False
+                self.in_flight += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+
+class AdmissionController:
+    """Rejects expensive requests early (429 per client, 503 when saturated) so cheap reads stay fast."""
+
+    def __init__(self, rate_limits, expensive_endpoints, max_in_flight=32, max_queue=64,
+                 queue_timeout=2, retry_after=1, client_header='', enabled=True):
+        self.enabled = enabled
+        self.expensive_endpoints = set(expensive_endpoints)
+        self.retry_after = retry_after
+        self.client_header = client_header
+        self.rate_limiter = ClientRateLimiter(rate_limits)
+        self.concurrency = ConcurrencyLimiter(max_in_flight, max_queue, queue_timeout)
+        self.rate_limited = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def install(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._admit)
+        app.after_request(self._release_on_close)
+        app.teardown_request(self._release_unanswered)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.concurrency.in_flight,
+            "waiting": self.concurrency.waiting,
+            "max_in_flight": self.concurrency.max_in_flight,
+            "max_queue": self.concurrency.max_queue,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed
+        }
+
+    def client_id(self):
+        if self.client_header:
+            value = request.headers.get(self.client_header)
+            if value:
+                # X-Forwarded-For style headers list the original client first
+                return value.split(',')[0].strip()
+        return request.remote_addr or 'unknown'
+
+    def _admit(self):
+        endpoint = (request.endpoint or '').rpartition('.')[2]
+        if request.method == 'OPTIONS':
+            return None
+        wait = self.rate_limiter.check(endpoint, self.client_id())
+        if wait:
+            with self._lock:
+                self.rate_limited += 1
+            return self._reject(429, "Rate limit exceeded. Please slow down.", math.ceil(wait))
+        if endpoint in self.expensive_endpoints:
+            if not self.concurrency.acquire():
+                with self._lock:
+                    self.shed += 1
+                logger.warning(f"Shedding {request.method} {request.path}: {self.concurrency.in_flight} requests in flight")
+                return self._reject(503, "Server is busy. Please retry later.", self.retry_after)
+            g.admission_slot = True
+        return None
+
+    def _reject(self, status, message, retry_after):
+        response = jsonify({"error": message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(int(retry_after), 1))
+        return response
+
+    def _release_on_close(self, response):
+        # Streamed bodies keep generating after the view returns, so hold the slot until the body is closed
+        if g.pop('admission_slot', False):
+            response.call_on_close(self.concurrency.release)
+        return response
+
+    def _release_unanswered(self, exc):
+        if g.pop('admission_slot', False):
+            self.concurrency.release()
+
+
+def admission_from_config(config):
+    """Build an AdmissionController from Config attributes."""
+    return AdmissionController(
+        parse_rate_limits(config.RATE_LIMITS),
+        [name.strip() for name in config.ADMISSION_EXPENSIVE_ENDPOINTS.split(',') if name.strip()],
+        max_in_flight=config.ADMISSION_MAX_IN_FLIGHT,
+        max_queue=config.ADMISSION_MAX_QUEUE,
+        queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+        retry_after=config.ADMISSION_RETRY_AFTER,
+        client_header=config.ADMISSION_CLIENT_HEADER,
+        enabled=config.ADMISSION_ENABLED
+    )
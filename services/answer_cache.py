@@ -0,0 +1,250 @@
+"""Content-addressed cache in front of the AI answer generator."""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+# Questions have between MIN_CHOICES and MAX_CHOICES choices, lettered A, B, C, ...
+MIN_CHOICES = 2
+MAX_CHOICES = 10
+ANSWER_LETTERS = [chr(ord('A') + index) for index in range(MAX_CHOICES)]
+
+
+def normalize_text(text):
+    """Collapse whitespace and case so trivially different inputs compare equal."""
+    return ' '.join(str(text or '').split()).casefold()
+
+
+def content_hash(question_text, choices):
+    """Hash a question and its choices independently of whitespace, case and choice order."""
+    parts = [normalize_text(question_text)] + sorted(normalize_text(c) for c in choices)
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def choice_for_letter(letter, choices):
+    """Return the choice a letter refers to, or None when the letter is not one of the choices."""
+    if letter not in ANSWER_LETTERS:
+        return None
+    index = ANSWER_LETTERS.index(letter)
+    return choices[index] if index < len(choices) else None
+
+
+def answer_letter_for(answer_text, choices):
+    """Map a normalized choice text back to its letter in the given choice order."""
+    normalized = [normalize_text(c) for c in choices]
+    if answer_text in normalized:
+        return ANSWER_LETTERS[normalized.index(answer_text)]
+    return None
+
+
+class AnswerCache:
+    """Two-tier (in-process LRU + Question table) cache of generated answers.
+
+    With a change_feed, questions corrected or re-imported by other workers evict their
+    content hash from the in-process tier; the log is read at most every sync_interval seconds.
+    """
+
+    def __init__(self, generator, max_entries=1024, ttl=3600, skip_sources=(), enabled=True,
+                 change_feed=None, sync_interval=1.0):
+        self.generator = generator
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.skip_sources = set(skip_sources)
+        self.change_feed = change_feed
+        self.sync_interval = sync_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._version = None
+        self._synced_at = 0.0
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+
+    def get_or_generate(self, question_text, choices, model=None, key=None, deadline=None):
+        """Return a cached answer for the question, calling the generator on a miss.
+
+        A deadline (a time.monotonic() value) is passed on to the generator as a keyword.
+        """
+        generate = partial(self.generator, deadline=deadline) if deadline is not None else self.generator
+        if not self.enabled:
+            return generate(question_text, choices)
+        key = key or content_hash(question_text, choices)
+
+        result = self.lookup(question_text, choices, model=model, key=key)
+        if result is not None:
+            return result
+        result = generate(question_text, choices)
+        self.store(key, result, choices)
+        return result
+
+    def lookup(self, question_text, choices, model=None, key=None):
+        """Return a cached answer for the question, or None (counted as a miss)."""
+        if not self.enabled:
+            return None
+        key = key or content_hash(question_text, choices)
+        if model is not None:
+            self._maybe_sync(model)
+
+        entry = self._get_memory(key)
+        if entry is not None:
+            result = self._result_from_entry(entry, choices)
+            if result is not None:
+                with self._lock:
+                    self.memory_hits += 1
+                return result
+
+        if model is not None:
+            entry = self._get_database(model, key)
+            if entry is not None:
+                result = self._result_from_entry(entry, choices)
+                if result is not None:
+                    self._put_memory(key, entry)
+                    with self._lock:
+                        self.database_hits += 1
+                    return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, key, result, choices):
+        """Remember a generator result for the given content hash."""
+        if not self.enabled or result.get('source') in self.skip_sources:
+            return
+        answer_choice = choice_for_letter(result.get('answer'), choices)
+        if answer_choice is None:
+            return
+        answer_text = normalize_text(answer_choice)
+        self._put_memory(key, {
+            'answer_text': answer_text,
+            'explanation': result.get('explanation'),
+            'source': result.get('source'),
+        })
+
+    def invalidate(self, key):
+        """Drop a content hash from the in-process tier."""
+        if not key:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every in-process entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the in-process tier."""
+        with self._lock:
+            lookups = self.memory_hits + self.database_hits + self.misses
+            hits = self.memory_hits + self.database_hits
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "memory_hits": self.memory_hits,
+                "database_hits": self.database_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _get_memory(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if self.ttl and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_database(self, model, key):
+        try:
+            # A duplicate that users reviewed beats newer unreviewed ones
+            row = (model.query
+                   .filter_by(content_hash=key)
+                   .order_by(model.user_correction.is_(None), model.id.desc())
+                   .first())
+        except Exception as e:
+            logger.warning(f"Answer cache database lookup failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        correction = row.user_correction
+        if correction and correction != row.predicted_answer:
+            # The stored explanation argues for the rejected prediction
+            corrected_choice = choice_for_letter(correction, row.choices)
+            if corrected_choice is None:
+                return None
+            return {
+                'answer_text': normalize_text(corrected_choice),
+                'explanation': f"Users corrected the generated answer for this question to \"{corrected_choice}\".",
+                'source': 'database',
+            }
+        answer_choice = choice_for_letter(row.predicted_answer, row.choices)
+        if answer_choice is None:
+            return None
+        return {
+            'answer_text': normalize_text(answer_choice),
+            'explanation': row.explanation,
+            'source': 'database',
+        }
+
+    def _maybe_sync(self, model):
+        """Evict content hashes of questions changed since the last sync, by any worker."""
+        if (self.change_feed is None or time.monotonic() - self._synced_at < self.sync_interval
+                or not self._sync_lock.acquire(blocking=False)):
+            return
+        try:
+            if self._version is None:
+                self._version = self.change_feed.current_version()
+            else:
+                while True:
+                    latest, self._version, has_more = self.change_feed.changed_ids_since(self._version, limit=1000)
+                    # Deleted rows are gone with their hash; they never made a cached answer wrong
+                    changed = [question_id for question_id, op in latest.items() if op != 'delete']
+                    if changed:
+                        rows = (model.query
+                                .with_entities(model.id, model.content_hash, model.user_correction)
+                                .filter(model.id.in_(changed))
+                                .all())
+                        for question_id, key, correction in rows:
+                            # Plain duplicates inserted by uploads agree with the entry they were answered from
+                            if latest[question_id] == 'update' or correction is not None:
+                                self.invalidate(key)
+                    if not has_more:
+                        break
+            self._synced_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Answer cache sync failed: {str(e)}")
+        finally:
+            self._sync_lock.release()
+
+    def _result_from_entry(self, entry, choices):
+        letter = answer_letter_for(entry['answer_text'], choices)
+        if letter is None:
+            return None
+        return {
+            "answer": letter,
+            "explanation": entry['explanation'],
+            "source": entry['source'],
+            "cached": True,
+        }
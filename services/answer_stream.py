@@ -0,0 +1,43 @@
+"""Helpers for streaming generated answers to clients as Server-Sent Events."""
+import json
+import re
+
+_CHUNK_RE = re.compile(r'\S+\s*|\s+')
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def chunk_result(result):
+    """Replay a complete generator result as stream chunks: metadata first, then the explanation word by word."""
+    yield {key: value for key, value in result.items() if key != 'explanation'}
+    for piece in _CHUNK_RE.findall(result.get('explanation') or ''):
+        yield {"explanation": piece}
+
+
+class StreamedResult:
+    """Assembles streamed chunks back into a generator-style result dict."""
+
+    def __init__(self):
+        self.fields = {}
+        self.explanation = []
+
+    def add(self, chunk):
+        for key, value in chunk.items():
+            if key == 'explanation':
+                self.explanation.append(value)
+            else:
+                self.fields[key] = value
+
+    @property
+    def answer(self):
+        return self.fields.get('answer')
+
+    def metadata(self):
+        """Everything known so far except the explanation."""
+        return dict(self.fields)
+
+    def result(self):
+        return dict(self.fields, explanation=''.join(self.explanation))
@@ -0,0 +1,85 @@
+"""Append-only change log for the question table, used for ETags and incremental sync."""
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, event, func, select
+
+
+class ChangeFeed:
+    """Records inserts, updates and deletes of a model into a question_change log table."""
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+        self.table = db.Table(
+            'question_change',
+            Column('id', Integer, primary_key=True),
+            Column('question_id', Integer, nullable=False),
+            Column('op', String(10), nullable=False),
+            Column('changed_at', DateTime, nullable=False, default=datetime.utcnow),
+            Index('ix_question_change_question_id_id', 'question_id', 'id')
+        )
+        event.listen(model, 'after_insert', self._recorder('insert'))
+        event.listen(model, 'after_update', self._recorder('update'))
+        event.listen(model, 'after_delete', self._recorder('delete'))
+
+    def _recorder(self, op):
+        table = self.table
+
+        def record(mapper, connection, target):
+            # Runs inside the flush, so the log entry commits atomically with the row change
+            connection.execute(table.insert().values(question_id=target.id, op=op))
+
+        return record
+
+    def current_version(self):
+        """Return the id of the latest change (0 when nothing has been logged)."""
+        return self.db.session.execute(select(func.max(self.table.c.id))).scalar() or 0
+
+    def last_change(self, question_id):
+        """Return the id of the latest change to one question (0 when it has none)."""
+        return self.db.session.execute(
+            select(func.max(self.table.c.id)).where(self.table.c.question_id == question_id)
+        ).scalar() or 0
+
+    def etag(self, version, query_string=b''):
+        """Build a validator that changes whenever the table or the request args change."""
+        args_digest = hashlib.sha1(query_string).hexdigest()[:12]
+        return f"questions-{version}-{args_digest}"
+
+    def changed_ids_since(self, since, limit=1000):
+        """Return ({question_id: latest op}, version, has_more) from the log alone, without loading rows."""
+        rows = self.db.session.execute(
+            select(self.table.c.id, self.table.c.question_id, self.table.c.op)
+            .where(self.table.c.id > since)
+            .order_by(self.table.c.id)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Only the latest operation per question matters to a syncing client
+        latest = {}
+        for change_id, question_id, op in rows:
+            latest[question_id] = op
+        version = rows[-1][0] if rows else max(since, self.current_version())
+        return latest, version, has_more
+
+    def changes_since(self, since, limit=1000, fields=None):
+        """Return rows upserted and ids deleted after the given version."""
+        latest, version, has_more = self.changed_ids_since(since, limit)
+
+        upsert_ids = [qid for qid, op in latest.items() if op != 'delete']
+        deleted = [qid for qid, op in latest.items() if op == 'delete']
+        upserted = []
+        if upsert_ids:
+            upserted = (self.model.query
+                        .filter(self.model.id.in_(upsert_ids))
+                        .order_by(self.model.id.desc())
+                        .all())
+        return {
+            "version": version,
+            "has_more": has_more,
+            "upserted": [q.to_dict(fields) for q in upserted],
+            "deleted": deleted
+        }
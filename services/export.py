@@ -0,0 +1,109 @@
+"""Streaming NDJSON/CSV export of the question bank in constant memory."""
+import csv
+import io
+import zlib
+
+from services.answer_cache import ANSWER_LETTERS
+from services.question_queries import apply_filters
+from services.serialization import brotli, dumps_json
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+# Flush a chunk to the client once this many bytes have been buffered
+CHUNK_SIZE = 64 * 1024
+
+
+# CSV keeps one column per choice letter so spreadsheets and the importer can read it back
+CSV_CHOICE_COLUMNS = [f"choice_{letter.lower()}" for letter in ANSWER_LETTERS]
+
+
+def build_export_query(model, created_from=None, created_to=None, corrected=None):
+    """Build an id-ordered query with the optional export filters applied."""
+    return apply_filters(model.query, model, created_from, created_to, corrected).order_by(model.id)
+
+
+def iter_rows(query, row_to_dict, batch_size=1000):
+    """Yield serialized rows, streaming them from the database batch_size at a time."""
+    # yield_per turns on server-side cursors (stream_results), so rows are never all in memory
+    for row in query.yield_per(batch_size):
+        yield row_to_dict(row)
+
+
+def ndjson_chunks(rows):
+    buffer = []
+    size = 0
+    for row in rows:
+        line = dumps_json(row) + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def csv_header(fields):
+    header = []
+    for field in fields:
+        if field == 'choices':
+            header.extend(CSV_CHOICE_COLUMNS)
+        else:
+            header.append(field)
+    return header
+
+
+def csv_chunks(rows, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(csv_header(fields))
+    for row in rows:
+        values = []
+        for field in fields:
+            if field == 'choices':
+                values.extend(row[field])
+                values.extend([''] * (len(CSV_CHOICE_COLUMNS) - len(row[field])))
+            else:
+                values.append(row[field])
+        writer.writerow(values)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    """Gzip a byte stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def brotli_chunks(chunks, quality=4):
+    """Brotli-compress a byte stream on the fly (needs the optional brotli package)."""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def export_stream(query, fmt, fields, row_to_dict, batch_size=1000, encoding=None):
+    """Return a generator of response body chunks for the requested format and content coding."""
+    rows = iter_rows(query, row_to_dict, batch_size)
+    chunks = csv_chunks(rows, fields) if fmt == 'csv' else ndjson_chunks(rows)
+    if encoding == 'br':
+        chunks = brotli_chunks(chunks)
+    elif encoding == 'gzip':
+        chunks = gzip_chunks(chunks)
+    return chunks
@@ -0,0 +1,140 @@
+"""Bounded background job queue for slow upload work."""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds its maximum number of pending jobs."""
+
+
+class JobTimeoutError(Exception):
+    """Raised by a job that has run past its deadline."""
+
+
+class Job:
+    """State of a single queued unit of work."""
+
+    def __init__(self, timeout):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.timeout = timeout
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.deadline = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.status = 'running'
+            self.started_at = time.time()
+            # time.monotonic() value the job must finish by, or None without a timeout
+            self.deadline = time.monotonic() + self.timeout if self.timeout else None
+
+    def finish(self, status, result=None, error=None):
+        """Record the terminal state; only the worker running the job calls this."""
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def check_deadline(self):
+        """Abort the job if it has exceeded its time budget."""
+        if self.expired():
+            raise JobTimeoutError(f"Job exceeded its {self.timeout}s timeout")
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "result": self.result,
+                "error": self.error
+            }
+
+
+class JobQueue:
+    """Runs jobs on a fixed-size thread pool and tracks their status by id."""
+
+    def __init__(self, max_workers=4, max_queue_depth=100, job_timeout=120, retention=3600):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.job_timeout = job_timeout
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload-job')
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        """Queue fn(job, *args) and return the new Job, or raise QueueFullError."""
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_queue_depth:
+                raise QueueFullError(f"Job queue is full ({self.max_queue_depth} pending jobs)")
+            job = Job(self.job_timeout)
+            self._jobs[job.id] = job
+            self._pending += 1
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        """Return the job with the given id, or None if unknown or expired.
+
+        A job past its deadline stays 'running' until its worker gives up on it, so a
+        reported timeout always means nothing was saved.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """Return queue depth and configured limits."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "tracked_jobs": len(self._jobs),
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "job_timeout_seconds": self.job_timeout
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, fn, args):
+        job.start()
+        try:
+            job.finish('succeeded', result=fn(job, *args))
+        except JobTimeoutError as e:
+            job.finish('timeout', error=str(e))
+            logger.warning(f"Job {job.id} timed out")
+        except Exception as e:
+            job.finish('failed', error=str(e))
+            logger.error(f"Job {job.id} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _prune(self):
+        # Caller holds the lock; forget finished jobs once their retention window passes
+        if not self.retention:
+            return
+        cutoff = time.time() - self.retention
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
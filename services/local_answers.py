@@ -0,0 +1,181 @@
+"""Local answer engine: nearest-neighbour lookup over questions whose answers users have confirmed or corrected."""
+import logging
+import re
+import threading
+import zlib
+
+from services.answer_cache import ANSWER_LETTERS, choice_for_letter, normalize_text
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class LocalAnswerEngine:
+    """Cosine similarity over hashed bag-of-words embeddings of corrected questions.
+
+    Every question with a user_correction becomes one L2-normalized row of a dense
+    float32 matrix, so a lookup is a single matrix-vector product. The matrix follows
+    the question_change log, so new corrections are picked up incrementally. A correction
+    is only reused when the cosine similarity reaches threshold and the sorted normalized
+    choices are equal.
+    """
+
+    def __init__(self, db, model, change_feed, threshold=0.98, dimensions=1024):
+        self.db = db
+        self.model = model
+        self.change_feed = change_feed
+        self.threshold = threshold
+        self.dimensions = dimensions
+        # Allocated on first use, so numpy isn't imported while a worker starts
+        self._matrix = None
+        self._ids = []
+        self._rows = {}
+        self._answers = {}
+        self._version = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.lookups = 0
+
+    def embed(self, question_text, choices):
+        """Return the normalized hashed embedding of a question and its choices."""
+        import numpy as np
+        words = _WORD_RE.findall(normalize_text(question_text))
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for choice in choices:
+            features += [f"choice:{word}" for word in _WORD_RE.findall(normalize_text(choice))]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if not features:
+            return vector
+        hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features), dtype=np.uint32, count=len(features))
+        # The top bit picks a sign so colliding features tend to cancel instead of pile up
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dimensions, signs)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def find_answer(self, question_text, choices):
+        """Return a generator-style result from the most similar corrected question, or None."""
+        return self.find_answers([(question_text, choices)])[0]
+
+    def find_answers(self, questions):
+        """Answer a list of (question_text, choices) with one matrix product; misses are None."""
+        if not questions:
+            return []
+        import numpy as np
+        queries = np.stack([self.embed(text, choices) for text, choices in questions])
+        with self._lock:
+            self.sync()
+            self.lookups += len(questions)
+            if not self._ids:
+                return [None] * len(questions)
+            scores = queries @ self._matrix[:len(self._ids)].T
+            best_rows = scores.argmax(axis=1)
+            matches = [(self._ids[row], float(scores[i, row])) for i, row in enumerate(best_rows)]
+            answers = [self._answers[question_id] for question_id, _ in matches]
+
+        results = []
+        for (_, choices), (question_id, similarity), answer in zip(questions, matches, answers):
+            result = None
+            if similarity >= self.threshold:
+                result = self._remapped_answer(question_id, answer, choices, similarity)
+            results.append(result)
+        hits = sum(1 for result in results if result is not None)
+        if hits:
+            with self._lock:
+                self.hits += hits
+        return results
+
+    def sync(self):
+        """Bring the matrix up to date with the change log."""
+        with self._lock:
+            if self._version is None:
+                self._build()
+                return
+            while True:
+                changes = self.change_feed.changes_since(
+                    self._version, limit=1000,
+                    fields=['id', 'question', 'choices', 'user_correction']
+                )
+                for row in changes['upserted']:
+                    self._upsert(row['id'], row['question'], row['choices'], row['user_correction'])
+                for question_id in changes['deleted']:
+                    self._remove(question_id)
+                self._version = changes['version']
+                if not changes['has_more']:
+                    break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "indexed_questions": len(self._ids),
+                "dimensions": self.dimensions,
+                "version": self._version,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits
+            }
+
+    def _build(self):
+        logger.info("Building local answer index from corrected questions")
+        self._version = self.change_feed.current_version()
+        query = (self.model.query
+                 .filter(self.model.user_correction.isnot(None))
+                 .order_by(self.model.id))
+        for question in query.yield_per(1000):
+            self._upsert(question.id, question.question_text, question.choices, question.user_correction)
+        logger.info(f"Local answer index holds {len(self._ids)} corrected questions")
+
+    def _upsert(self, question_id, question_text, choices, correction):
+        corrected_choice = choice_for_letter(correction, choices)
+        if corrected_choice is None:
+            self._remove(question_id)
+            return
+        row = self._rows.get(question_id)
+        if row is None:
+            row = len(self._ids)
+            if self._matrix is None or row == len(self._matrix):
+                # Grow geometrically so inserts stay amortized O(1)
+                import numpy as np
+                grown = np.zeros((max(2 * row, 64), self.dimensions), dtype=np.float32)
+                if row:
+                    grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._ids.append(question_id)
+            self._rows[question_id] = row
+        self._matrix[row] = self.embed(question_text, choices)
+        self._answers[question_id] = {
+            "answer_text": normalize_text(corrected_choice),
+            "choices": sorted(normalize_text(c) for c in choices),
+            "letter": correction
+        }
+
+    def _remove(self, question_id):
+        row = self._rows.pop(question_id, None)
+        if row is None:
+            return
+        self._answers.pop(question_id, None)
+        # Move the last row into the gap to keep the matrix dense
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+
+    def _remapped_answer(self, question_id, answer, choices, similarity):
+        normalized = [normalize_text(c) for c in choices]
+        if sorted(normalized) != answer["choices"] or normalized.count(answer["answer_text"]) != 1:
+            return None
+        letter = ANSWER_LETTERS[normalized.index(answer["answer_text"])]
+        # The stored explanation argues about the other question's wording, so it is never copied
+        return {
+            "answer": letter,
+            "explanation": f"Matched question {question_id}, whose answer users have confirmed as \"{choices[ANSWER_LETTERS.index(letter)]}\".",
+            "source": "local",
+            "local_match": {
+                "question_id": question_id,
+                "similarity": round(similarity, 4)
+            }
+        }
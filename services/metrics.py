@@ -0,0 +1,282 @@
+"""In-process metrics exposed in the Prometheus text format at GET /metrics."""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Prometheus' default buckets, stretched to cover slow generator calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative latency histogram keyed by label values."""
+
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        # Only the matching bucket is bumped here; render() accumulates them
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        lines = []
+        bucket_names = self.labelnames + ('le',)
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """Value that goes up and down, either tracked directly or read from a callback at scrape time."""
+
+    type = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, amount=1, *labelvalues):
+        self.inc(-amount, *labelvalues)
+
+    def samples(self):
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(values)]
+
+
+class Counter(Gauge):
+    """Monotonic total, usually read from a callback at scrape time."""
+
+    type = 'counter'
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+class ApiMetrics:
+    """Request, stage and connection pool metrics for one app instance."""
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.registry = MetricsRegistry()
+        self.request_latency = self.registry.register(Histogram(
+            'qa_http_request_duration_seconds', 'Time spent handling HTTP requests.',
+            ('method', 'route', 'status'), buckets
+        ))
+        self.stage_latency = self.registry.register(Histogram(
+            'qa_stage_duration_seconds', 'Time spent in individual request stages.',
+            ('stage',), buckets
+        ))
+        self.in_flight_generations = self.registry.register(Gauge(
+            'qa_generations_in_flight', 'Answer generator calls currently running.'
+        ))
+        self.in_flight_generations.inc(0)
+        self._pool_gauges = []
+
+    def install(self, app):
+        """Time every request handled by app."""
+        if not self.enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def track_pool(self, engine):
+        """Report connection pool usage of engine at scrape time."""
+        pool = engine.pool
+        # StaticPool and friends don't keep checkout statistics
+        if not hasattr(pool, 'checkedout'):
+            return
+        for name, help_text, read in (
+            ('qa_db_pool_size', 'Configured size of the database connection pool.', pool.size),
+            ('qa_db_pool_checked_out', 'Database connections currently in use.', pool.checkedout),
+            ('qa_db_pool_checked_in', 'Idle database connections held by the pool.', pool.checkedin),
+            ('qa_db_pool_overflow', 'Connections open beyond the pool size (negative while below it).', pool.overflow),
+        ):
+            self.registry.register(Gauge(name, help_text, callback=lambda read=read: [((), read())]))
+
+    def track_generator(self, generator):
+        """Report circuit breaker state and hedge/fallback totals of a ResilientGenerator."""
+        states = {'closed': 0, 'half_open': 1, 'open': 2}
+        self.registry.register(Gauge(
+            'qa_generator_circuit_state', 'Generator circuit breaker state (0 closed, 1 half-open, 2 open).',
+            callback=lambda: [((), states[generator.breaker.state])]
+        ))
+        for name, help_text, attribute in (
+            ('qa_generator_failures_total', 'Failed or timed out generator calls.', 'failures'),
+            ('qa_generator_retries_total', 'Generator calls retried after a failure.', 'retried'),
+            ('qa_generator_hedged_total', 'Duplicate generator requests sent for slow calls.', 'hedged'),
+            ('qa_generator_hedge_wins_total', 'Hedged requests that finished before the original.', 'hedge_wins'),
+            ('qa_generator_fallbacks_total', 'Uploads answered by the fallback path.', 'fallbacks'),
+        ):
+            self.registry.register(Counter(
+                name, help_text, callback=lambda attribute=attribute: [((), getattr(generator, attribute))]
+            ))
+
+    def track_admission(self, admission):
+        """Report admitted, queued and rejected expensive requests."""
+        concurrency = admission.concurrency
+        self.registry.register(Gauge(
+            'qa_admission_in_flight', 'Expensive requests currently admitted.',
+            callback=lambda: [((), concurrency.in_flight)]
+        ))
+        self.registry.register(Gauge(
+            'qa_admission_waiting', 'Expensive requests waiting for a slot.',
+            callback=lambda: [((), concurrency.waiting)]
+        ))
+        self.registry.register(Counter(
+            'qa_admission_rejected_total', 'Requests rejected by admission control.', ('reason',),
+            callback=lambda: [(('rate_limited',), admission.rate_limited), (('shed',), admission.shed)]
+        ))
+
+    def track_micro_batcher(self, batcher):
+        """Report packed generator calls and the questions they carried."""
+        self.registry.register(Counter(
+            'qa_micro_batches_total', 'Packed generator calls made by the micro-batcher.',
+            callback=lambda: [((), batcher.batches)]
+        ))
+        self.registry.register(Counter(
+            'qa_micro_batch_questions_total', 'Questions sent in packed generator calls.',
+            callback=lambda: [((), batcher.packed_questions)]
+        ))
+        self.registry.register(Counter(
+            'qa_micro_batch_fallbacks_total', 'Packed questions without a valid answer, asked again individually.',
+            callback=lambda: [((), batcher.fallbacks)]
+        ))
+
+    def track_write_batcher(self, batcher):
+        """Report group commits and the writes they carried."""
+        self.registry.register(Counter(
+            'qa_group_commits_total', 'Transactions committed by the group commit writer.',
+            callback=lambda: [((), batcher.batches)]
+        ))
+        self.registry.register(Counter(
+            'qa_group_commit_rows_total', 'Writes committed by the group commit writer.',
+            callback=lambda: [((), batcher.rows)]
+        ))
+        self.registry.register(Counter(
+            'qa_group_commit_timeouts_total', 'Writes that did not commit within the writer timeout.',
+            callback=lambda: [((), batcher.timeouts)]
+        ))
+        self.registry.register(Gauge(
+            'qa_group_commit_queued', 'Writes waiting for the next group commit.',
+            callback=lambda: [((), batcher.queued)]
+        ))
+
+    def track_question_cache(self, cache):
+        """Report question read cache lookups and size."""
+        self.registry.register(Counter(
+            'qa_question_cache_lookups_total', 'Single-question cache lookups by result.', ('result',),
+            callback=lambda: [(('hit',), cache.hits), (('shared_hit',), cache.shared_hits), (('miss',), cache.misses)]
+        ))
+        self.registry.register(Gauge(
+            'qa_question_cache_bytes', 'Encoded payload bytes held by the question cache.',
+            callback=lambda: [((), cache.stats()['payload_bytes'])]
+        ))
+
+    @contextmanager
+    def span(self, stage):
+        """Time a block of work as one stage of the current request."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_latency.observe(time.perf_counter() - started, stage)
+
+    @contextmanager
+    def generation(self):
+        """Time a generator call and count it as in flight while it runs."""
+        self.in_flight_generations.inc()
+        try:
+            with self.span('generate'):
+                yield
+        finally:
+            self.in_flight_generations.dec()
+
+    def render(self):
+        return self.registry.render()
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            # Label by URL rule, not path, so ids don't explode the number of series
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            self.request_latency.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+        return response
@@ -0,0 +1,191 @@
+"""Micro-batching: packs questions that arrive together into one model request and splits the answers back out."""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from services.answer_cache import ANSWER_LETTERS
+
+logger = logging.getLogger(__name__)
+
+PACKED_SOURCE = 'packed'
+
+PACKED_INSTRUCTIONS = (
+    "Answer each of the multiple-choice questions below. Reply with JSON only, in the form "
+    '{"answers": [{"id": <question id>, "answer": "<letter>", "explanation": "<why that choice is correct>"}]} '
+    "with exactly one entry per question id. Each answer must be one of that question's choice letters."
+)
+
+
+def build_packed_prompt(questions):
+    """Number a list of (question_text, choices) into one prompt asking for per-question JSON answers."""
+    blocks = []
+    for number, (question_text, choices) in enumerate(questions, start=1):
+        lines = [f"Question {number}: {question_text}"]
+        lines += [f"{letter}) {choice}" for letter, choice in zip(ANSWER_LETTERS, choices)]
+        blocks.append('\n'.join(lines))
+    return PACKED_INSTRUCTIONS + '\n\n' + '\n\n'.join(blocks)
+
+
+def parse_packed_answers(text, questions):
+    """Split a packed reply into one result per question; questions without a valid answer get None."""
+    results = [None] * len(questions)
+    try:
+        payload = json.loads(text)
+    except (TypeError, ValueError):
+        return results
+    answers = payload.get('answers') if isinstance(payload, dict) else payload
+    if not isinstance(answers, list):
+        return results
+
+    seen = set()
+    for entry in answers:
+        if not isinstance(entry, dict):
+            continue
+        number = entry.get('id')
+        if not isinstance(number, int) or isinstance(number, bool) or not 1 <= number <= len(questions):
+            continue
+        if number in seen:
+            # Two answers for one question: trust neither
+            results[number - 1] = None
+            continue
+        seen.add(number)
+        answer = entry.get('answer')
+        explanation = entry.get('explanation')
+        choices = questions[number - 1][1]
+        if (isinstance(answer, str) and answer.strip().upper() in ANSWER_LETTERS[:len(choices)]
+                and isinstance(explanation, str) and explanation.strip()):
+            results[number - 1] = {
+                "answer": answer.strip().upper(),
+                "explanation": explanation.strip(),
+                "source": PACKED_SOURCE
+            }
+    return results
+
+
+_openai_clients = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _openai_client(api_key, timeout):
+    """Return a shared OpenAI client per key and timeout, so packed calls reuse its connection pool."""
+    client = _openai_clients.get((api_key, timeout))
+    if client is None:
+        with _openai_clients_lock:
+            client = _openai_clients.get((api_key, timeout))
+            if client is None:
+                from openai import OpenAI
+                client = _openai_clients[(api_key, timeout)] = OpenAI(api_key=api_key, timeout=timeout)
+    return client
+
+
+def openai_packed_completion(questions, model, api_key, timeout=60):
+    """Answer a list of (question_text, choices) with one chat completion in JSON mode; returns the raw reply."""
+    client = _openai_client(api_key, timeout)
+    response = client.chat.completions.create(
+        model=model,
+        temperature=0,
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": "You are an expert at answering multiple-choice questions."},
+            {"role": "user", "content": build_packed_prompt(questions)}
+        ]
+    )
+    return response.choices[0].message.content
+
+
+class _PendingQuestion:
+    __slots__ = ('question_text', 'choices', 'future')
+
+    def __init__(self, question_text, choices):
+        self.question_text = question_text
+        self.choices = choices
+        self.future = Future()
+
+
+class MicroBatcher:
+    """Generator wrapper that answers questions arriving within max_wait of each other with one packed call.
+
+    There is no background thread: the first caller of a window waits up to max_wait for
+    company, then makes the packed call for everyone (a caller that fills the batch to
+    max_batch_size sends it at once). Questions the packed reply leaves unanswered or
+    answers invalidly go back to their own callers, which ask the single-question generator.
+    """
+
+    def __init__(self, generator, complete_packed, max_batch_size=8, max_wait=0.01):
+        self.generator = generator
+        self.complete_packed = complete_packed
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._condition = threading.Condition()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.packed_questions = 0
+        self.single_calls = 0
+        self.failed_batches = 0
+        self.fallbacks = 0
+
+    def __call__(self, question_text, choices):
+        item = _PendingQuestion(question_text, choices)
+        batch = None
+        with self._condition:
+            self._pending.append(item)
+            if len(self._pending) >= self.max_batch_size:
+                batch, self._pending = self._pending, []
+                self._condition.notify_all()
+            elif len(self._pending) == 1:
+                deadline = time.monotonic() + self.max_wait
+                # Batches are only ever taken whole, so ours is still open while we head the list
+                while self._pending and self._pending[0] is item:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        batch, self._pending = self._pending, []
+                        break
+                    self._condition.wait(remaining)
+        if batch is not None:
+            self._dispatch(batch)
+
+        result = item.future.result()
+        if result is None:
+            with self._lock:
+                self.single_calls += 1
+            return self.generator(question_text, choices)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "batches": self.batches,
+                "packed_questions": self.packed_questions,
+                "mean_batch_size": round(self.packed_questions / self.batches, 2) if self.batches else 0.0,
+                "failed_batches": self.failed_batches,
+                "fallbacks": self.fallbacks,
+                "single_calls": self.single_calls
+            }
+
+    def _dispatch(self, batch):
+        if len(batch) == 1:
+            # Nobody else arrived in the window: a plain call is cheaper than a packed prompt
+            batch[0].future.set_result(None)
+            return
+        questions = [(item.question_text, item.choices) for item in batch]
+        try:
+            results = parse_packed_answers(self.complete_packed(questions), questions)
+        except Exception as e:
+            logger.warning(f"Packed generator call for {len(batch)} questions failed: {str(e)}")
+            results = [None] * len(batch)
+            with self._lock:
+                self.failed_batches += 1
+        answered = sum(1 for result in results if result is not None)
+        with self._lock:
+            self.batches += 1
+            self.packed_questions += len(batch)
+            self.fallbacks += len(batch) - answered
+        if answered < len(batch):
+            logger.warning(f"Packed reply answered {answered} of {len(batch)} questions; the rest are asked individually")
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
@@ -0,0 +1,182 @@
+"""Versioned schema migrations for databases created before the current model, recorded in schema_version."""
+import json
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+
+from services.answer_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Rows copied per transaction when backfilling, so large tables are never locked in one statement
+BACKFILL_BATCH_SIZE = 10000
+
+LEGACY_CHOICE_COLUMNS = ['choice_a', 'choice_b', 'choice_c', 'choice_d']
+
+database_info = Table(
+    'database_info', MetaData(),
+    Column('name', String(64), primary_key=True),
+    Column('value', String(255), nullable=False)
+)
+
+# Progress of `import_questions.py load`, committed in the same transaction as each batch of rows
+import_checkpoint = Table(
+    'import_checkpoint', MetaData(),
+    Column('name', String(255), primary_key=True),
+    Column('records', Integer, nullable=False),
+    Column('inserted', Integer, nullable=False),
+    Column('invalid', Integer, nullable=False),
+    Column('completed', Boolean, nullable=False),
+    Column('updated_at', DateTime, nullable=False)
+)
+
+schema_version = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('description', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register function(connection, columns) as a migration; it must be safe on an up-to-date schema."""
+    def register(function):
+        MIGRATIONS.append((version, description, function))
+        return function
+    return register
+
+
+@migration(1, "Map question.created_at")
+def add_created_at(connection, columns):
+    # init.sql has always declared created_at; databases made by create_all lack it
+    if 'created_at' not in columns:
+        connection.execute(text("ALTER TABLE question ADD COLUMN created_at DATETIME NULL"))
+
+
+@migration(2, "Pack choices into one column so questions can have any number of choices")
+def pack_choices(connection, columns):
+    if 'choices' not in columns:
+        connection.execute(text("ALTER TABLE question ADD COLUMN choices TEXT NULL"))
+    legacy = [name for name in LEGACY_CHOICE_COLUMNS if name in columns]
+    if not legacy:
+        return
+    # The choice_a..choice_d columns are left in place so the previous release can still be rolled back to
+    max_id = connection.execute(text("SELECT MAX(id) FROM question")).scalar() or 0
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            text(f"UPDATE question SET choices = JSON_ARRAY({', '.join(legacy)}) "
+                 "WHERE choices IS NULL AND id > :start AND id <= :end"),
+            {"start": start, "end": start + BACKFILL_BATCH_SIZE}
+        )
+        connection.commit()
+
+
+def existing_indexes(connection):
+    return {index['name'] for index in inspect(connection).get_indexes('question')}
+
+
+@migration(3, "Index created_at and user_correction for filtered keyset pagination")
+def add_filter_indexes(connection, columns):
+    existing = existing_indexes(connection)
+    if 'ix_question_created_at_id' not in existing:
+        connection.execute(text("CREATE INDEX ix_question_created_at_id ON question (created_at, id)"))
+    # Databases from before corrections get the column and this index from migration 4
+    if 'user_correction' in columns and 'ix_question_user_correction_id' not in existing:
+        connection.execute(text("CREATE INDEX ix_question_user_correction_id ON question (user_correction, id)"))
+
+
+@migration(4, "Add question.user_correction for reported answers")
+def add_user_correction(connection, columns):
+    if 'user_correction' not in columns:
+        connection.execute(text("ALTER TABLE question ADD COLUMN user_correction VARCHAR(255) NULL"))
+    if 'ix_question_user_correction_id' not in existing_indexes(connection):
+        connection.execute(text("CREATE INDEX ix_question_user_correction_id ON question (user_correction, id)"))
+
+
+@migration(5, "Add question.content_hash for the answer cache and backfill it")
+def add_content_hash(connection, columns):
+    if 'content_hash' not in columns:
+        connection.execute(text("ALTER TABLE question ADD COLUMN content_hash CHAR(64) NULL"))
+    if 'ix_question_content_hash' not in existing_indexes(connection):
+        connection.execute(text("CREATE INDEX ix_question_content_hash ON question (content_hash)"))
+    connection.commit()
+    # Hashes are computed in Python, so rows are read and updated one batch per transaction
+    update = text("UPDATE question SET content_hash = :hash WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text("SELECT id, question_text, choices FROM question "
+                 "WHERE content_hash IS NULL AND id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {"hash": content_hash(question_text, json.loads(choices) if choices else []), "id": question_id}
+            for question_id, question_text, choices in rows
+        ])
+        connection.commit()
+        last_id = rows[-1][0]
+
+
+@migration(6, "Give the database a random id so on-disk caches can tell databases apart")
+def add_database_id(connection, columns):
+    database_info.create(connection, checkfirst=True)
+    if database_id(connection) is None:
+        connection.execute(database_info.insert().values(name='database_id', value=uuid.uuid4().hex))
+
+
+@migration(7, "Index question_change by question so shared cache entries can be checked for changes")
+def add_change_question_index(connection, columns):
+    if not inspect(connection).has_table('question_change'):
+        return
+    existing = {index['name'] for index in inspect(connection).get_indexes('question_change')}
+    if 'ix_question_change_question_id_id' not in existing:
+        connection.execute(text(
+            "CREATE INDEX ix_question_change_question_id_id ON question_change (question_id, id)"
+        ))
+
+
+@migration(8, "Keep bulk import checkpoints in the database so they commit with their rows")
+def add_import_checkpoint(connection, columns):
+    import_checkpoint.create(connection, checkfirst=True)
+
+
+def database_id(connection):
+    """Return the random id migration 6 stored in this database, or None before it has run."""
+    if not inspect(connection).has_table('database_info'):
+        return None
+    return connection.execute(
+        select(database_info.c.value).where(database_info.c.name == 'database_id')
+    ).scalar()
+
+
+def current_version(connection):
+    if not inspect(connection).has_table('schema_version'):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def migrate(engine):
+    """Apply pending migrations in order and return the versions applied."""
+    applied = []
+    with engine.connect() as connection:
+        schema_version.create(connection, checkfirst=True)
+        connection.commit()
+        done = set(connection.execute(select(schema_version.c.version)).scalars())
+        for version, description, function in sorted(MIGRATIONS, key=lambda item: item[0]):
+            if version in done:
+                continue
+            logger.info(f"Applying schema migration {version}: {description}")
+            columns = {column['name'] for column in inspect(connection).get_columns('question')}
+            function(connection, columns)
+            connection.execute(schema_version.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+            connection.commit()
+            applied.append(version)
+    return applied
@@ -0,0 +1,272 @@
+"""MinHash/LSH index for spotting near-duplicate questions before calling the generator."""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import struct
+import threading
+from array import array
+
+from services.answer_cache import ANSWER_LETTERS, choice_for_letter
+from services.migrations import database_id
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_for_shingles(text):
+    """Lowercase and drop punctuation so rewording noise doesn't change the shingles."""
+    return ' '.join(_WORD_RE.findall(str(text or '').casefold()))
+
+
+def question_document(question_text, choices):
+    # Sort the choices so their order never affects the signature
+    return ' | '.join([normalize_for_shingles(question_text)] +
+                      sorted(normalize_for_shingles(c) for c in choices))
+
+
+def shingles(document, size=5):
+    if len(document) <= size:
+        return {document}
+    return {document[i:i + size] for i in range(len(document) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """Locality-sensitive hashing over MinHash signatures of question text plus choices.
+
+    The index follows the question_change log, so every worker picks up inserts and
+    deletes incrementally, and it snapshots itself to disk to avoid rebuilding on start.
+    An answer is only reused when the sorted normalized choices are equal and the
+    signatures are at least threshold similar (identical documents always score 1.0).
+    """
+
+    def __init__(self, db, model, change_feed, threshold=0.95, num_perm=64, bands=16,
+                 snapshot_path=None, snapshot_every=1000, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.db = db
+        self.model = model
+        self.change_feed = change_feed
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.seed = seed
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+        self._signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._version = None
+        # Identity of the database the signatures came from, recorded in and checked against snapshots
+        self._database = None
+        self._changes_since_snapshot = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.lookups = 0
+
+    def signature(self, question_text, choices):
+        """Return the MinHash signature of a question as an array of 32-bit ints."""
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+                  for s in shingles(question_document(question_text, choices))]
+        return array('I', [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        ])
+
+    def find_answer(self, question_text, choices):
+        """Return a generator-style result copied from a near-duplicate, or None."""
+        with self._lock:
+            self.sync()
+            self.lookups += 1
+            signature = self.signature(question_text, choices)
+            candidates = sorted(self._candidates(signature),
+                                key=lambda qid: self._similarity(signature, self._signatures[qid]),
+                                reverse=True)
+
+        # Identical normalized text and choices give identical documents, so they always score 1.0
+        for question_id in candidates:
+            similarity = self._similarity(signature, self._signatures.get(question_id, signature))
+            if similarity < self.threshold:
+                break
+            result = self._remapped_answer(question_id, question_text, choices, similarity)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return result
+        return None
+
+    def sync(self):
+        """Bring the index up to date with the change log."""
+        with self._lock:
+            if self._version is None:
+                self._load_or_build()
+                return
+            while True:
+                changes = self.change_feed.changes_since(self._version, limit=1000, fields=['id', 'question', 'choices'])
+                for row in changes['upserted']:
+                    self._add(row['id'], row['question'], row['choices'])
+                for question_id in changes['deleted']:
+                    self._remove(question_id)
+                self._changes_since_snapshot += len(changes['upserted']) + len(changes['deleted'])
+                self._version = changes['version']
+                if not changes['has_more']:
+                    break
+            if self.snapshot_path and self._changes_since_snapshot >= self.snapshot_every:
+                self.save_snapshot()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "indexed_questions": len(self._signatures),
+                "version": self._version,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits
+            }
+
+    def save_snapshot(self):
+        """Write signatures and the change-log version they reflect to snapshot_path."""
+        if not self.snapshot_path or self._version is None or self._database is None:
+            return
+        with self._lock:
+            header = json.dumps({
+                "database": self._database,
+                "version": self._version,
+                "num_perm": self.num_perm,
+                "bands": self.bands,
+                "seed": self.seed,
+                "count": len(self._signatures)
+            }).encode('utf-8')
+            # Per-process temp file: several server workers may save the same snapshot at once
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(struct.pack('<I', len(header)))
+                f.write(header)
+                for question_id, signature in self._signatures.items():
+                    f.write(struct.pack('<I', question_id))
+                    f.write(signature.tobytes())
+            os.replace(tmp_path, self.snapshot_path)
+            self._changes_since_snapshot = 0
+            logger.info(f"Near-duplicate index snapshot saved ({len(self._signatures)} questions)")
+
+    def _database_identity(self):
+        # Fall back to the URL for databases that have not been migrated yet
+        connection = self.db.session.connection()
+        return database_id(connection) or 'url:' + hashlib.sha1(str(connection.engine.url).encode('utf-8')).hexdigest()
+
+    def _load_or_build(self):
+        self._database = self._database_identity()
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                if self._load_snapshot():
+                    self.sync()
+                    return
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable near-duplicate snapshot: {str(e)}")
+            self._signatures = {}
+            self._buckets = [{} for _ in range(self.bands)]
+        self._build()
+
+    def _load_snapshot(self):
+        with open(self.snapshot_path, 'rb') as f:
+            header_size = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_size).decode('utf-8'))
+            if (header['num_perm'], header['bands'], header['seed']) != (self.num_perm, self.bands, self.seed):
+                logger.info("Near-duplicate snapshot uses different parameters, rebuilding")
+                return False
+            if header.get('database') != self._database:
+                logger.info("Near-duplicate snapshot belongs to another database, rebuilding")
+                return False
+            # A snapshot newer than the change log means the database was reset
+            if header['version'] > self.change_feed.current_version():
+                return False
+            record_size = 4 + 4 * self.num_perm
+            for _ in range(header['count']):
+                record = f.read(record_size)
+                signature = array('I')
+                signature.frombytes(record[4:])
+                self._insert(struct.unpack('<I', record[:4])[0], signature)
+        self._version = header['version']
+        logger.info(f"Near-duplicate index loaded {len(self._signatures)} questions from snapshot")
+        return True
+
+    def _build(self):
+        logger.info("Building near-duplicate index from the question table")
+        self._version = self.change_feed.current_version()
+        query = self.model.query.order_by(self.model.id)
+        for question in query.yield_per(1000):
+            self._add(question.id, question.question_text, question.choices)
+        self.save_snapshot()
+
+    def _add(self, question_id, question_text, choices):
+        self._remove(question_id)
+        self._insert(question_id, self.signature(question_text, choices))
+
+    def _insert(self, question_id, signature):
+        self._signatures[question_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(question_id)
+
+    def _remove(self, question_id):
+        signature = self._signatures.pop(question_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(question_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _band_keys(self, signature):
+        data = signature.tobytes()
+        width = 4 * self.rows_per_band
+        return [data[i * width:(i + 1) * width] for i in range(self.bands)]
+
+    def _candidates(self, signature):
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        return candidates
+
+    def _similarity(self, left, right):
+        return sum(1 for a, b in zip(left, right) if a == b) / self.num_perm
+
+    def _remapped_answer(self, question_id, question_text, choices, similarity):
+        question = self.db.session.get(self.model, question_id)
+        answer_choice = choice_for_letter(question.predicted_answer, question.choices) if question is not None else None
+        if answer_choice is None:
+            return None
+        # Don't propagate answers that a user has reported as wrong
+        correction = getattr(question, 'user_correction', None)
+        if correction and correction != question.predicted_answer:
+            return None
+        normalized = [normalize_for_shingles(c) for c in choices]
+        if sorted(normalized) != sorted(normalize_for_shingles(c) for c in question.choices):
+            return None
+        answer_text = normalize_for_shingles(answer_choice)
+        if normalized.count(answer_text) != 1:
+            return None
+        letter = ANSWER_LETTERS[normalized.index(answer_text)]
+        identical = normalize_for_shingles(question_text) == normalize_for_shingles(question.question_text)
+        # The stored explanation argues about the other question's wording, so it is never copied
+        match = "the same question" if identical else f"{similarity:.0%} similar with the same choices"
+        return {
+            "answer": letter,
+            "explanation": f"Answered like question {question.id} ({match}), whose answer was \"{choices[ANSWER_LETTERS.index(letter)]}\".",
+            "source": "near_duplicate",
+            "near_duplicate": {
+                "question_id": question.id,
+                "similarity": round(similarity, 4),
+                "identical": identical
+            }
+        }
@@ -0,0 +1,240 @@
+"""Opt-in per-request profiling: cProfile or sampled stacks plus a SQL query log."""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request, url_for
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = {
+    # mode: (artifact extension, mimetype)
+    'cprofile': ('prof', 'application/octet-stream'),
+    'sample': ('folded', 'text/plain'),
+}
+
+PROFILE_HEADER = 'X-Profile'
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Render the samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+
+class QueryLog:
+    """SQL statements executed while one request was being profiled."""
+
+    def __init__(self):
+        self.queries = []
+
+    def record(self, statement, duration):
+        self.queries.append((statement, duration))
+
+    def summary(self, limit=50):
+        grouped = {}
+        for statement, duration in self.queries:
+            entry = grouped.setdefault(statement, {"statement": statement, "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+        statements = sorted(grouped.values(), key=lambda e: e["total_ms"], reverse=True)
+        for entry in statements:
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return {
+            "count": len(self.queries),
+            "total_ms": round(sum(d for _, d in self.queries) * 1000, 3),
+            # The same statement run again and again in one request usually means an N+1 pattern
+            "repeated": [e["statement"] for e in statements if e["count"] > 1],
+            "statements": statements[:limit]
+        }
+
+
+class RequestProfiler:
+    """Profiles single requests that ask for it with the X-Profile header or ?profile= parameter."""
+
+    def __init__(self, enabled=False, token='', output_dir='profiles', sample_interval=0.005, keep=50):
+        self.enabled = enabled
+        self.token = token
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.keep = keep
+        self._active = threading.local()
+
+    def install(self, app, engine):
+        """Hook the profiler into app's request cycle and engine's cursor events."""
+        if not self.enabled:
+            return
+        if not os.path.isabs(self.output_dir):
+            self.output_dir = os.path.join(app.instance_path, self.output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        # after_request is skipped when a view raises, so teardown is what always stops profiling
+        app.teardown_request(self._teardown)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def requested_mode(self):
+        """Return the profiling mode the current request asks for, or None."""
+        value = request.headers.get(PROFILE_HEADER) or request.args.get('profile')
+        if not value:
+            return None
+        if self.token and value != self.token:
+            return None
+        mode = request.args.get('profile_mode', 'cprofile')
+        return mode if mode in PROFILE_MODES else None
+
+    def report(self, profile_id):
+        """Load a stored profile report, or None."""
+        path = self._path(profile_id, 'json')
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def artifact_path(self, profile_id):
+        """Return (path, mimetype) of the raw profile for a report, or (None, None)."""
+        report = self.report(profile_id)
+        if report is None:
+            return None, None
+        extension, mimetype = PROFILE_MODES[report['mode']]
+        return self._path(profile_id, extension), mimetype
+
+    def _path(self, profile_id, extension):
+        # Ids are generated hex strings; anything else must not reach the filesystem
+        if not profile_id.isalnum():
+            return None
+        return os.path.join(self.output_dir, f"{profile_id}.{extension}")
+
+    def _start(self):
+        mode = self.requested_mode()
+        if mode is None:
+            return
+        state = {"mode": mode, "queries": QueryLog(), "started": time.perf_counter()}
+        if mode == 'sample':
+            state["sampler"] = StackSampler(threading.get_ident(), self.sample_interval)
+            state["sampler"].start()
+        else:
+            state["profile"] = cProfile.Profile()
+            state["profile"].enable()
+        self._active.state = state
+        g.profile_state = state
+
+    def _finish(self, response):
+        state = g.get('profile_state')
+        if state is None:
+            return response
+        self._active.state = None
+        duration = time.perf_counter() - state["started"]
+        try:
+            profile_id = self._store(state, response, duration)
+        except Exception as e:
+            logger.error(f"Failed to store request profile: {str(e)}")
+            return response
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = url_for('questions.get_profile', profile_id=profile_id)
+        return response
+
+    def _teardown(self, exc):
+        state = g.pop('profile_state', None)
+        self._active.state = None
+        if state is None:
+            return
+        if state["mode"] == 'sample':
+            state["sampler"].stop()
+        else:
+            state["profile"].disable()
+
+    def _store(self, state, response, duration):
+        profile_id = uuid.uuid4().hex
+        extension, _ = PROFILE_MODES[state["mode"]]
+        report = {
+            "id": profile_id,
+            "mode": state["mode"],
+            "method": request.method,
+            "path": request.full_path.rstrip('?'),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "created_at": time.time(),
+            "sql": state["queries"].summary()
+        }
+        if state["mode"] == 'sample':
+            state["sampler"].stop()
+            report["samples"] = sum(state["sampler"].stacks.values())
+            with open(self._path(profile_id, extension), 'w', encoding='utf-8') as f:
+                f.write(state["sampler"].collapsed())
+        else:
+            profile = state["profile"]
+            profile.disable()
+            profile.dump_stats(self._path(profile_id, extension))
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(30)
+            report["top_functions"] = text.getvalue()
+
+        with open(self._path(profile_id, 'json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Profiled {report['method']} {report['path']} in {report['duration_ms']}ms "
+                    f"({report['sql']['count']} queries) as {profile_id}")
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        reports = sorted(
+            (entry for entry in os.scandir(self.output_dir) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in reports[:max(len(reports) - self.keep, 0)]:
+            profile_id = entry.name[:-len('.json')]
+            for extension in ['json'] + [ext for ext, _ in PROFILE_MODES.values()]:
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._active, 'state', None) is not None:
+            conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        state = getattr(self._active, 'state', None)
+        starts = conn.info.get('profile_query_start')
+        if state is not None and starts:
+            state["queries"].record(statement, time.perf_counter() - starts.pop())
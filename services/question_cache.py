@@ -0,0 +1,229 @@
+"""Read cache for GET /questions/<id>: encoded payloads in a bounded LRU, optionally backed by a shared cache."""
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """Adapter for a cache shared between workers; values are bytes."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class LocalSharedCache(SharedCache):
+    """In-process stand-in for a shared cache, for tests and single-process deployments."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisSharedCache(SharedCache):
+    """Redis-backed shared cache (needs the optional redis package)."""
+
+    def __init__(self, url, prefix='qa:question:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + str(key))
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + str(key), value, ex=max(int(ttl), 1))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + str(key))
+
+
+def shared_cache_from_url(url):
+    """Build the shared tier from QUESTION_CACHE_SHARED_URL: '' (none), 'local://' or 'redis://...'."""
+    if not url:
+        return None
+    if url.startswith('local:'):
+        return LocalSharedCache()
+    if url.startswith(('redis:', 'rediss:')):
+        return RedisSharedCache(url)
+    raise ValueError(f"Unsupported QUESTION_CACHE_SHARED_URL '{url}'. Use local:// or redis://.")
+
+
+class QuestionCache:
+    """Bounded LRU of encoded question payloads keyed by id.
+
+    Routes that change a question invalidate it directly. Writes made by other workers
+    or the importer are picked up from the change log, read at most once every
+    sync_interval seconds, so local hits otherwise never touch the database. Shared
+    entries carry the change-log version they were read at and are only served while
+    the question has no later change, since another worker may set a payload it read
+    before an invalidation it never saw.
+    """
+
+    def __init__(self, change_feed, max_entries=10000, max_bytes=64 * 1024 * 1024,
+                 sync_interval=1.0, shared=None, shared_ttl=300, enabled=True):
+        self.change_feed = change_feed
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sync_interval = sync_interval
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._version = None
+        self._synced_at = 0.0
+        # Bumped by every invalidation, so a payload read before one is never cached after it
+        self._invalidations = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, question_id):
+        """Return the cached payload bytes, or None on a miss."""
+        if not self.enabled:
+            return None
+        self._maybe_sync()
+        with self._lock:
+            payload = self._entries.get(question_id)
+            if payload is not None:
+                self._entries.move_to_end(question_id)
+                self.hits += 1
+                return payload
+        if self.shared is not None:
+            payload = self._fresh_shared(question_id, self._shared_call('get', question_id))
+            if payload is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                self._put_local(question_id, payload)
+                return payload
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def stamp(self):
+        """Take before reading a question from the database; pass to put()."""
+        version = self.change_feed.current_version() if self.shared is not None and self.enabled else None
+        return self._invalidations, version
+
+    def put(self, question_id, payload, stamp):
+        """Cache payload unless the question was invalidated since stamp was taken."""
+        invalidations, version = stamp
+        if not self.enabled or invalidations != self._invalidations:
+            return
+        self._put_local(question_id, payload)
+        if self.shared is not None:
+            self._shared_call('set', question_id, b'v%d\n' % version + payload, self.shared_ttl)
+
+    def invalidate(self, question_id):
+        with self._lock:
+            self._invalidations += 1
+            payload = self._entries.pop(question_id, None)
+            if payload is not None:
+                self._bytes -= len(payload)
+        if self.shared is not None:
+            self._shared_call('delete', question_id)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "payload_bytes": self._bytes,
+                # Payloads plus per-entry dict overhead, as seen by the interpreter
+                "memory_bytes": self._bytes + sys.getsizeof(self._entries)
+                                + len(self._entries) * sys.getsizeof(b''),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                "shared": type(self.shared).__name__ if self.shared is not None else None,
+                "version": self._version
+            }
+
+    def _put_local(self, question_id, payload):
+        if self.max_entries <= 0 or len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(question_id, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[question_id] = payload
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _maybe_sync(self):
+        """Evict questions changed elsewhere; one request per interval pays for the change-log read."""
+        if time.monotonic() - self._synced_at < self.sync_interval or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if self._version is None:
+                self._version = self.change_feed.current_version()
+            else:
+                while True:
+                    latest, self._version, has_more = self.change_feed.changed_ids_since(self._version, limit=1000)
+                    for question_id in latest:
+                        self.invalidate(question_id)
+                    if not has_more:
+                        break
+            self._synced_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Question cache sync failed: {str(e)}")
+        finally:
+            self._sync_lock.release()
+
+    def _fresh_shared(self, question_id, entry):
+        """Strip the version header from a shared entry, or return None when the question changed after it."""
+        if not entry or not entry.startswith(b'v'):
+            return None
+        header, _, payload = entry.partition(b'\n')
+        try:
+            version = int(header[1:])
+        except ValueError:
+            return None
+        if self.change_feed.last_change(question_id) > version:
+            return None
+        return payload
+
+    def _shared_call(self, method, *args):
+        # The shared tier is an optimization; when it is down, fall back to the local tier and the database
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception as e:
+            logger.warning(f"Shared question cache {method} failed: {str(e)}")
+            return None
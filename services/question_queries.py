@@ -0,0 +1,142 @@
+"""Query helpers for listing questions without loading the whole table."""
+from datetime import datetime
+from operator import itemgetter
+
+
+def parse_fields(raw, field_columns):
+    """Parse a comma separated ?fields= value into a list of known API fields."""
+    if not raw:
+        return None
+    fields = []
+    for field in raw.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in field_columns:
+            allowed = ', '.join(field_columns)
+            raise ValueError(f"Unknown field '{field}'. Allowed fields: {allowed}.")
+        if field not in fields:
+            fields.append(field)
+    return fields or None
+
+
+def parse_positive_int(raw, name):
+    if raw is None or raw == '':
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.")
+    if value <= 0:
+        raise ValueError(f"'{name}' must be a positive integer.")
+    return value
+
+
+def parse_non_negative_int(raw, name, default=0):
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a non-negative integer.")
+    if value < 0:
+        raise ValueError(f"'{name}' must be a non-negative integer.")
+    return value
+
+
+def parse_datetime(raw, name):
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime.")
+
+
+def parse_bool(raw):
+    if raw is None or raw == '':
+        return None
+    return raw.lower() in ('1', 'true', 'yes')
+
+
+def parse_list_params(args, model, default_limit=0, max_limit=500):
+    """Read pagination, projection and filter args, raising ValueError when invalid."""
+    before_id = parse_positive_int(args.get('before_id'), 'before_id')
+    limit = parse_positive_int(args.get('limit'), 'limit') or default_limit or None
+    if limit is not None and max_limit:
+        limit = min(limit, max_limit)
+    fields = parse_fields(args.get('fields'), model.FIELD_COLUMNS)
+    return {
+        "before_id": before_id,
+        "limit": limit,
+        "fields": fields,
+        "created_from": parse_datetime(args.get('created_from'), 'created_from'),
+        "created_to": parse_datetime(args.get('created_to'), 'created_to'),
+        "corrected": parse_bool(args.get('corrected'))
+    }
+
+
+def apply_filters(query, model, created_from=None, created_to=None, corrected=None):
+    """Filter by creation time range [created_from, created_to) and review state.
+
+    Both filters are served by (column, id) indexes, so they combine with id keyset pagination.
+    """
+    if created_from is not None:
+        query = query.filter(model.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(model.created_at < created_to)
+    if corrected is not None:
+        if corrected:
+            query = query.filter(model.user_correction.isnot(None))
+        else:
+            query = query.filter(model.user_correction.is_(None))
+    return query
+
+
+def select_fields(query, model, fields):
+    """Select only the columns behind fields as plain rows; returns (query, row_to_dict).
+
+    List responses skip ORM instances entirely (no identity map or attribute state),
+    and row_to_dict builds the API dict straight from the row tuple.
+    """
+    fields = fields or list(model.FIELD_COLUMNS)
+    columns = ['id']
+    for field in fields:
+        columns.extend(name for name in model.FIELD_COLUMNS[field] if name not in columns)
+    position = {name: index for index, name in enumerate(columns)}
+
+    getters = []
+    for field in fields:
+        backing = model.FIELD_COLUMNS[field]
+        decode = model.FIELD_DECODERS.get(field)
+        if decode is not None:
+            getters.append((field, lambda row, index=position[backing[0]], decode=decode: decode(row[index])))
+        elif len(backing) == 1:
+            getters.append((field, itemgetter(position[backing[0]])))
+        else:
+            # Multi-column fields (choices) are lists
+            getters.append((field, lambda row, indexes=[position[name] for name in backing]: [row[i] for i in indexes]))
+
+    def row_to_dict(row):
+        return {field: getter(row) for field, getter in getters}
+
+    return query.with_entities(*[getattr(model, name) for name in columns]), row_to_dict
+
+
+def fetch_question_page(model, before_id=None, limit=None, fields=None, **filters):
+    """Return (items, next_before_id) newest first as API dicts, using id keyset pagination."""
+    query = apply_filters(model.query, model, **filters)
+    if before_id is not None:
+        query = query.filter(model.id < before_id)
+    query, row_to_dict = select_fields(query.order_by(model.id.desc()), model, fields)
+
+    if limit is None:
+        return [row_to_dict(row) for row in query.all()], None
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_before_id = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_before_id = rows[-1][0]
+    return [row_to_dict(row) for row in rows], next_before_id
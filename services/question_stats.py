@@ -0,0 +1,204 @@
+"""Incrementally maintained accuracy counters: predicted answers vs. user corrections."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, Integer, String, case, event, func, inspect, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+TOTAL_PERIOD = 'all'
+COUNTERS = ('questions', 'confirmed', 'corrected', 'deleted')
+
+
+def review_state(predicted_answer, user_correction):
+    """Classify a question as unreviewed (None), 'confirmed' or 'corrected'."""
+    if not user_correction:
+        return None
+    return 'confirmed' if user_correction == predicted_answer else 'corrected'
+
+
+class QuestionStats:
+    """Keeps a question_stat summary table in step with the question table.
+
+    The 'all' rows hold the current totals per predicted letter; one row per day and
+    letter counts that day's uploads, reviews and deletes. Counters are bumped inside
+    the flush, so they commit atomically with the change that caused them.
+    """
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+        self.table = db.Table(
+            'question_stat',
+            Column('period', String(10), primary_key=True),
+            Column('predicted_answer', String(1), primary_key=True),
+            *[Column(name, Integer, nullable=False, default=0) for name in COUNTERS]
+        )
+        event.listen(model, 'after_insert', self._after_insert)
+        event.listen(model, 'after_update', self._after_update)
+        event.listen(model, 'after_delete', self._after_delete)
+
+    def summary(self, days=30):
+        """Return overall, per-letter and daily counters; reads a bounded number of rows."""
+        today = datetime.utcnow().date()
+        start = (today - timedelta(days=days - 1)).isoformat()
+        rows = self.db.session.execute(
+            select(self.table).where(
+                (self.table.c.period == TOTAL_PERIOD) | self.table.c.period.between(start, today.isoformat())
+            )
+        ).mappings().all()
+
+        by_answer = {}
+        daily = {}
+        for row in rows:
+            counters = {name: row[name] for name in COUNTERS}
+            if row['period'] == TOTAL_PERIOD:
+                by_answer[row['predicted_answer'] or 'none'] = counters
+            else:
+                day = daily.setdefault(row['period'], dict.fromkeys(COUNTERS, 0))
+                for name in COUNTERS:
+                    day[name] += counters[name]
+
+        overall = dict.fromkeys(COUNTERS, 0)
+        for counters in by_answer.values():
+            for name in COUNTERS:
+                overall[name] += counters[name]
+        return {
+            "overall": self._with_rates(overall),
+            "by_answer": {letter: self._with_rates(c) for letter, c in sorted(by_answer.items())},
+            "daily": [dict(self._with_rates(daily[day]), date=day) for day in sorted(daily)]
+        }
+
+    def record_bulk_insert(self, mappings):
+        """Count rows written with Core inserts, which bypass the ORM events."""
+        connection = self.db.session.connection()
+        for (letter, state), count in self._group(mappings).items():
+            deltas = {"questions": count}
+            if state:
+                deltas[state] = count
+            self._bump(connection, TOTAL_PERIOD, letter, deltas)
+            self._bump(connection, self._today(), letter, deltas)
+
+    def rebuild(self):
+        """Recompute the 'all' totals from the question table (daily history is kept)."""
+        session = self.db.session
+        model = self.model
+        reviewed = model.user_correction.isnot(None)
+        groups = session.execute(
+            select(
+                model.predicted_answer,
+                func.count(),
+                func.sum(case((reviewed & (model.user_correction == model.predicted_answer), 1), else_=0)),
+                func.sum(case((reviewed & ((model.user_correction != model.predicted_answer)
+                                           | model.predicted_answer.is_(None)), 1), else_=0))
+            ).group_by(model.predicted_answer)
+        ).all()
+        session.execute(
+            update(self.table)
+            .where(self.table.c.period == TOTAL_PERIOD)
+            .values(questions=0, confirmed=0, corrected=0)
+        )
+        connection = session.connection()
+        for letter, questions, confirmed, corrected in groups:
+            self._bump(connection, TOTAL_PERIOD, letter or '', {
+                "questions": questions,
+                "confirmed": int(confirmed or 0),
+                "corrected": int(corrected or 0)
+            })
+        session.commit()
+        return sum(group[1] for group in groups)
+
+    def _after_insert(self, mapper, connection, target):
+        deltas = {"questions": 1}
+        state = review_state(target.predicted_answer, target.user_correction)
+        if state:
+            deltas[state] = 1
+        letter = target.predicted_answer or ''
+        self._bump(connection, TOTAL_PERIOD, letter, deltas)
+        self._bump(connection, self._today(), letter, deltas)
+
+    def _after_update(self, mapper, connection, target):
+        attrs = inspect(target).attrs
+        old_letter = self._previous(attrs.predicted_answer)
+        old_correction = self._previous(attrs.user_correction)
+        old_state = review_state(old_letter, old_correction)
+        new_state = review_state(target.predicted_answer, target.user_correction)
+        new_letter = target.predicted_answer or ''
+        if (old_letter or '', old_state) != (new_letter, new_state):
+            self._bump(connection, TOTAL_PERIOD, old_letter or '', self._contribution(old_state, -1))
+            self._bump(connection, TOTAL_PERIOD, new_letter, self._contribution(new_state, 1))
+        # A new report counts as review activity on the day it was made
+        if new_state and target.user_correction != old_correction:
+            self._bump(connection, self._today(), new_letter, {new_state: 1})
+
+    def _after_delete(self, mapper, connection, target):
+        letter = target.predicted_answer or ''
+        deltas = self._contribution(review_state(target.predicted_answer, target.user_correction), -1)
+        deltas['deleted'] = 1
+        self._bump(connection, TOTAL_PERIOD, letter, deltas)
+        self._bump(connection, self._today(), letter, {"deleted": 1})
+
+    @staticmethod
+    def _previous(attribute):
+        history = attribute.history
+        if history.deleted:
+            return history.deleted[0]
+        if history.added:
+            return None
+        return attribute.value
+
+    @staticmethod
+    def _contribution(state, sign):
+        deltas = {"questions": sign}
+        if state:
+            deltas[state] = sign
+        return deltas
+
+    @staticmethod
+    def _group(mappings):
+        groups = {}
+        for mapping in mappings:
+            letter = mapping.get('predicted_answer')
+            key = (letter or '', review_state(letter, mapping.get('user_correction')))
+            groups[key] = groups.get(key, 0) + 1
+        return groups
+
+    @staticmethod
+    def _today():
+        return datetime.utcnow().date().isoformat()
+
+    @staticmethod
+    def _with_rates(counters):
+        reviewed = counters['confirmed'] + counters['corrected']
+        return dict(
+            counters,
+            reviewed=reviewed,
+            review_rate=round(reviewed / counters['questions'], 4) if counters['questions'] > 0 else 0.0,
+            disagreement_rate=round(counters['corrected'] / reviewed, 4) if reviewed > 0 else 0.0
+        )
+
+    def _bump(self, connection, period, letter, deltas):
+        """Atomically add deltas to one counter row, creating it when missing."""
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        values = dict({name: 0 for name in COUNTERS}, period=period, predicted_answer=letter, **deltas)
+        dialect = connection.dialect.name
+        if dialect == 'mysql':
+            stmt = mysql_insert(self.table).values(**values)
+            stmt = stmt.on_duplicate_key_update({name: self.table.c[name] + stmt.inserted[name] for name in deltas})
+        elif dialect == 'sqlite':
+            stmt = sqlite_insert(self.table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['period', 'predicted_answer'],
+                set_={name: self.table.c[name] + stmt.excluded[name] for name in deltas}
+            )
+        else:
+            result = connection.execute(
+                update(self.table)
+                .where((self.table.c.period == period) & (self.table.c.predicted_answer == letter))
+                .values({name: self.table.c[name] + value for name, value in deltas.items()})
+            )
+            if result.rowcount:
+                return
+            stmt = self.table.insert().values(**values)
+        connection.execute(stmt)
@@ -0,0 +1,309 @@
+"""Deadlines, retries, hedged requests and a circuit breaker around the answer generator."""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import partial
+
+from services.answer_stream import chunk_result
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_SOURCE = 'fallback'
+
+
+class GeneratorTimeoutError(Exception):
+    """Raised when a generator call runs past its deadline budget."""
+
+
+def fallback_answer(question_text, choices):
+    """Answer-less result saved while the generator is unavailable; `import_questions.py backfill` fills it in later."""
+    return {
+        "answer": None,
+        "explanation": "The answer service is temporarily unavailable. This question will be answered once it recovers.",
+        "source": FALLBACK_SOURCE
+    }
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through once reset_timeout has passed."""
+
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                logger.info("Generator circuit closed")
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    self.times_opened += 1
+                logger.warning(f"Generator circuit open after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about the upstream, freeing the half-open probe if it held it."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ResilientGenerator:
+    """Drop-in replacement for generate_answer_and_explanation that never blocks past its deadline.
+
+    Calls run on a bounded pool so a stalled upstream can't pin request threads. Slow
+    calls are hedged with a duplicate after the recent p95 latency, failures are retried
+    with jittered backoff, and an open circuit short-circuits straight to the fallback.
+    """
+
+    def __init__(self, generator, fallback=fallback_answer, timeout=30, max_concurrency=16,
+                 retries=1, retry_backoff=0.5, failure_threshold=5, slow_call_threshold=20,
+                 reset_timeout=30, hedge=False, hedge_quantile=0.95, hedge_min_delay=0.5):
+        self.generator = generator
+        self.fallback = fallback
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.slow_call_threshold = slow_call_threshold
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='generator')
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    @property
+    def is_open(self):
+        return self.breaker.state == CircuitBreaker.OPEN
+
+    def __call__(self, question_text, choices, deadline=None):
+        """Answer within timeout seconds, or by deadline (a time.monotonic() value) when that comes first."""
+        with self._lock:
+            self.calls += 1
+        if not self.breaker.allow():
+            return self._fall_back(question_text, choices)
+
+        own_deadline = time.monotonic() + self.timeout
+        # A caller's deadline that comes first is its own budget running out, not the upstream failing
+        caller_bound = deadline is not None and deadline < own_deadline
+        deadline = deadline if caller_bound else own_deadline
+        budget = max(deadline - time.monotonic(), 0)
+        timed_out = False
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                result = self._call_hedged(question_text, choices, deadline)
+            except GeneratorTimeoutError:
+                logger.warning(f"Generator call timed out after {budget:.2f}s"
+                               f"{' (caller deadline)' if caller_bound else ''}")
+                timed_out = True
+                break
+            except Exception as e:
+                logger.warning(f"Generator call failed (attempt {attempt + 1}): {str(e)}")
+                # Full jitter keeps retries from many threads from arriving in lockstep
+                backoff = self._rng.uniform(0, self.retry_backoff * 2 ** attempt)
+                if attempt == self.retries or time.monotonic() + backoff >= deadline or not self.breaker.allow():
+                    break
+                with self._lock:
+                    self.retried += 1
+                time.sleep(backoff)
+                continue
+
+            latency = time.monotonic() - started
+            # The generator's own fallback and very slow answers both count against the upstream
+            if result.get('source') == FALLBACK_SOURCE or (
+                    self.slow_call_threshold and latency > self.slow_call_threshold):
+                self._record_failure()
+            else:
+                self.breaker.record_success()
+                with self._lock:
+                    self._latencies.append(latency)
+            return result
+        if timed_out and caller_bound:
+            self.breaker.release()
+        else:
+            # Retries are part of one logical call, so they count against the breaker once
+            self._record_failure(timeout=timed_out)
+        return self._fall_back(question_text, choices)
+
+    def stream(self, stream_generator, question_text, choices):
+        """Yield the chunks of stream_generator under the same deadline, retries and breaker as a call.
+
+        Failures before the first chunk are retried and then answered by the fallback; a stream
+        that breaks off later raises, since part of the answer has already been sent. Streams
+        are not hedged.
+        """
+        with self._lock:
+            self.calls += 1
+        if not self.breaker.allow():
+            yield from chunk_result(self._fall_back(question_text, choices))
+            return
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        try:
+            chunks, chunk = self._open_stream(stream_generator, question_text, choices, deadline)
+        except Exception as e:
+            self._record_failure(timeout=isinstance(e, GeneratorTimeoutError))
+            yield from chunk_result(self._fall_back(question_text, choices))
+            return
+
+        fallback = chunk is not None and chunk.get('source') == FALLBACK_SOURCE
+        try:
+            while chunk is not None:
+                yield chunk
+                chunk = self._pull(partial(next, chunks, None), deadline)
+        except GeneratorExit:
+            # The client went away before the stream finished, so its outcome is unknown
+            self.breaker.release()
+            raise
+        except Exception as e:
+            logger.warning(f"Generator stream broke off: {str(e)}")
+            self._record_failure(timeout=isinstance(e, GeneratorTimeoutError))
+            raise
+        if fallback or (self.slow_call_threshold and time.monotonic() - started > self.slow_call_threshold):
+            self._record_failure()
+        else:
+            self.breaker.record_success()
+
+    def hedge_delay(self):
+        """Delay before a duplicate request is sent: the recent latency quantile, at least hedge_min_delay."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            return None
+        quantile = latencies[min(int(len(latencies) * self.hedge_quantile), len(latencies) - 1)]
+        return max(quantile, self.hedge_min_delay)
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "retries": self.retried,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "fallbacks": self.fallbacks
+            }
+        delay = self.hedge_delay() if self.hedge else None
+        return dict(counters, circuit={
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened
+        }, hedge_delay_seconds=round(delay, 4) if delay is not None else None)
+
+    def _call_hedged(self, question_text, choices, deadline):
+        pending = {self._executor.submit(self.generator, question_text, choices)}
+        primary = next(iter(pending))
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is not None and time.monotonic() + delay < deadline:
+            done, _ = wait(pending, timeout=delay)
+            if not done:
+                pending.add(self._executor.submit(self.generator, question_text, choices))
+                with self._lock:
+                    self.hedged += 1
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is not primary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        for future in pending:
+            future.cancel()
+        if error is not None and not pending:
+            raise error
+        raise GeneratorTimeoutError("Generator call exceeded its deadline")
+
+    def _open_stream(self, stream_generator, question_text, choices, deadline):
+        """Start a stream and wait for its first chunk, retrying failures with jittered backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                return self._pull(partial(_first_chunk, stream_generator, question_text, choices), deadline)
+            except GeneratorTimeoutError:
+                logger.warning(f"Generator stream timed out after {self.timeout}s")
+                raise
+            except Exception as e:
+                logger.warning(f"Generator stream failed (attempt {attempt + 1}): {str(e)}")
+                backoff = self._rng.uniform(0, self.retry_backoff * 2 ** attempt)
+                if attempt == self.retries or time.monotonic() + backoff >= deadline or not self.breaker.allow():
+                    raise
+                with self._lock:
+                    self.retried += 1
+                time.sleep(backoff)
+
+    def _pull(self, step, deadline):
+        """Run one step of a stream on the pool, giving up at the deadline."""
+        future = self._executor.submit(step)
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            future.cancel()
+            raise GeneratorTimeoutError(f"Generator stream exceeded its {self.timeout}s deadline") from None
+
+    def _record_failure(self, timeout=False):
+        with self._lock:
+            self.failures += 1
+            if timeout:
+                self.timeouts += 1
+        self.breaker.record_failure()
+
+    def _fall_back(self, question_text, choices):
+        with self._lock:
+            self.fallbacks += 1
+        return self.fallback(question_text, choices)
+
+
+def _first_chunk(stream_generator, question_text, choices):
+    chunks = iter(stream_generator(question_text, choices))
+    return chunks, next(chunks, None)
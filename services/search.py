@@ -0,0 +1,125 @@
+"""Full-text search over question text and explanations."""
+import logging
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def significant(score, digits=6):
+    """Round to significant digits: bm25 scores on small tables are around 1e-6, so fixed decimals erase them."""
+    return float(f"{score:.{digits}g}")
+
+
+class FullTextIndex:
+    """Base class for database-native inverted indexes over the question table."""
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def ensure_index(self):
+        """Create the index if it is missing (safe to call repeatedly)."""
+        with self._lock:
+            if not self._ready:
+                self._create_index()
+                self.db.session.commit()
+                self._ready = True
+
+    def search(self, query_text, limit=20, offset=0):
+        """Return [(question_id, score)] best match first."""
+        self.ensure_index()
+        return self._search(query_text, limit, offset)
+
+    def search_questions(self, query_text, limit=20, offset=0):
+        """Return [(question, score)] best match first."""
+        matches = self.search(query_text, limit, offset)
+        if not matches:
+            return []
+        rows = self.model.query.filter(self.model.id.in_([qid for qid, _ in matches])).all()
+        by_id = {row.id: row for row in rows}
+        return [(by_id[qid], score) for qid, score in matches if qid in by_id]
+
+    def _create_index(self):
+        raise NotImplementedError
+
+    def _search(self, query_text, limit, offset):
+        raise NotImplementedError
+
+
+class SQLiteFullTextIndex(FullTextIndex):
+    """FTS5 external-content table kept in sync with the question table by triggers."""
+
+    def _create_index(self):
+        session = self.db.session
+        exists = session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_fts'"
+        )).first()
+        session.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5("
+            "question_text, explanation, content='question', content_rowid='id')"
+        ))
+        session.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS question_fts_ai AFTER INSERT ON question BEGIN "
+            "INSERT INTO question_fts(rowid, question_text, explanation) "
+            "VALUES (new.id, new.question_text, new.explanation); END"
+        ))
+        session.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS question_fts_ad AFTER DELETE ON question BEGIN "
+            "INSERT INTO question_fts(question_fts, rowid, question_text, explanation) "
+            "VALUES ('delete', old.id, old.question_text, old.explanation); END"
+        ))
+        session.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS question_fts_au AFTER UPDATE OF question_text, explanation ON question BEGIN "
+            "INSERT INTO question_fts(question_fts, rowid, question_text, explanation) "
+            "VALUES ('delete', old.id, old.question_text, old.explanation); "
+            "INSERT INTO question_fts(rowid, question_text, explanation) "
+            "VALUES (new.id, new.question_text, new.explanation); END"
+        ))
+        if not exists:
+            # Index rows that were written before the index existed
+            logger.info("Building question full-text index")
+            session.execute(text("INSERT INTO question_fts(question_fts) VALUES ('rebuild')"))
+
+    def _search(self, query_text, limit, offset):
+        # Quote every term so user input can't inject FTS5 query syntax
+        terms = ['"' + term.replace('"', '""') + '"' for term in query_text.split()]
+        if not terms:
+            return []
+        rows = self.db.session.execute(text(
+            "SELECT rowid, bm25(question_fts) AS score FROM question_fts "
+            "WHERE question_fts MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"
+        ), {"match": ' '.join(terms), "limit": limit, "offset": offset}).all()
+        # bm25() is lower-is-better; flip it so higher scores rank first for clients
+        return [(row[0], significant(-row[1])) for row in rows]
+
+
+class MySQLFullTextIndex(FullTextIndex):
+    """InnoDB FULLTEXT index, maintained by MySQL on every insert and delete."""
+
+    INDEX_NAME = 'ft_question_text_explanation'
+
+    def _create_index(self):
+        session = self.db.session
+        exists = session.execute(
+            text("SHOW INDEX FROM question WHERE Key_name = :name"),
+            {"name": self.INDEX_NAME}
+        ).first()
+        if not exists:
+            logger.info("Building question full-text index")
+            session.execute(text(
+                f"ALTER TABLE question ADD FULLTEXT INDEX {self.INDEX_NAME} (question_text, explanation)"
+            ))
+
+    def _search(self, query_text, limit, offset):
+        if not query_text.strip():
+            return []
+        rows = self.db.session.execute(text(
+            "SELECT id, MATCH(question_text, explanation) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score "
+            "FROM question WHERE MATCH(question_text, explanation) AGAINST (:q IN NATURAL LANGUAGE MODE) "
+            "ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset"
+        ), {"q": query_text, "limit": limit, "offset": offset}).all()
+        return [(row[0], significant(float(row[1]))) for row in rows]
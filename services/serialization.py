@@ -0,0 +1,121 @@
+"""Content negotiation for API payloads: fast JSON, optional MessagePack and response compression."""
+import gzip
+import json
+
+from flask import current_app, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+COMPRESSIBLE_MIMETYPES = {
+    JSON_MIMETYPE, *MSGPACK_MIMETYPES, 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'
+}
+
+
+def _default(value):
+    # Decimals and other rare column types; orjson already handles datetimes
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_json(data, fast=True):
+    """Encode data as compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if fast and orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def negotiate_mimetype(accept_mimetypes):
+    """Return the response media type: MessagePack when the client prefers it and msgpack is installed."""
+    if msgpack is None:
+        return JSON_MIMETYPE
+    return accept_mimetypes.best_match([JSON_MIMETYPE, *MSGPACK_MIMETYPES], default=JSON_MIMETYPE)
+
+
+def render(data, status=200):
+    """Serialize data in the negotiated format; a faster drop-in for jsonify on list endpoints."""
+    mimetype = negotiate_mimetype(request.accept_mimetypes)
+    if mimetype == JSON_MIMETYPE:
+        body = dumps_json(data, fast=current_app.config.get('FAST_JSON_ENABLED', True))
+    else:
+        body = msgpack.packb(data, use_bin_type=True, default=_default)
+    response = current_app.response_class(body, status=status, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def render_encoded(json_body, status=200):
+    """Like render, for a payload already encoded by dumps_json; JSON clients get the bytes as they are."""
+    mimetype = negotiate_mimetype(request.accept_mimetypes)
+    if mimetype != JSON_MIMETYPE:
+        return render(json.loads(json_body), status)
+    response = current_app.response_class(json_body, status=status, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def representation_key(compressor):
+    """Identify the representation negotiated for this request, so ETags differ per format and coding."""
+    encoding = compressor.encoding_for(request.accept_encodings)
+    return f"{negotiate_mimetype(request.accept_mimetypes)};{encoding or 'identity'}"
+
+
+class ResponseCompressor:
+    """Compresses buffered responses above min_size with brotli (when installed) or gzip.
+
+    Streamed bodies (exports, SSE) are left alone; they compress themselves or must not be buffered.
+    """
+
+    def __init__(self, enabled=True, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def install(self, app):
+        if self.enabled:
+            app.after_request(self._compress)
+
+    def encoding_for(self, accept_encodings):
+        """Return the content coding a large response would get, or None."""
+        if not self.enabled:
+            return None
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return accept_encodings.best_match(offered)
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level)
+
+    def _compress(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.encoding_for(request.accept_encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
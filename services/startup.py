@@ -0,0 +1,69 @@
+"""Cold-start profiling: import-time breakdown and time until a fresh worker answers /health."""
+import json
+import os
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so nothing is already imported
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+response = module.app.test_client().get('/health')
+served = time.perf_counter()
+print(json.dumps({"import_seconds": imported - started, "health_seconds": served - imported,
+                  "total_seconds": served - started, "status": response.status_code}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def profile_startup(module_name, top=15):
+    """Import module_name in a fresh interpreter, serve /health once and report where the time went."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE, module_name],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    timings = None
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith('{'):
+            timings = json.loads(line)
+            break
+    if timings is None:
+        raise RuntimeError(f"Startup probe failed:\n{process.stderr[-2000:]}")
+
+    modules = parse_importtime(process.stderr)
+    # Group by top-level package so the breakdown names dependencies, not submodules
+    packages = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return dict(timings, packages=sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top])
+
+
+def print_startup_report(module_name, budget_seconds):
+    """Print the startup profile of module_name and return whether it met the budget."""
+    report = profile_startup(module_name)
+    print(f"⏱️  Startup profile for {module_name}.py")
+    print(f"   imports: {report['import_seconds'] * 1000:.0f}ms, "
+          f"first /health: {report['health_seconds'] * 1000:.0f}ms, "
+          f"total: {report['total_seconds'] * 1000:.0f}ms (HTTP {report['status']})")
+    print("   slowest imports (self time, grouped by package):")
+    for package, micros in report['packages']:
+        print(f"     {micros / 1000:8.1f}ms  {package}")
+    within_budget = report['total_seconds'] <= budget_seconds and report['status'] == 200
+    if within_budget:
+        print(f"✅ Ready within the {budget_seconds}s startup budget")
+    else:
+        print(f"❌ Startup exceeded the {budget_seconds}s budget")
+    return within_budget
@@ -0,0 +1,120 @@
+"""Storage backends: database URI, engine tuning and search index for each deployment type."""
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+from services.search import MySQLFullTextIndex, SQLiteFullTextIndex
+
+
+class StorageBackend:
+    """Interface implemented by every storage backend."""
+
+    name = None
+    label = None
+    # Ephemeral databases have no migration step, so their schema is created with the app
+    create_schema_on_startup = False
+
+    def __init__(self, config):
+        self.config = config
+
+    def database_uri(self):
+        raise NotImplementedError
+
+    def engine_options(self):
+        """Keyword arguments for create_engine (SQLALCHEMY_ENGINE_OPTIONS)."""
+        return {}
+
+    def configure_engine(self, engine):
+        """Hook for per-connection tuning once the engine exists."""
+
+    def create_search_index(self, db, model):
+        raise NotImplementedError
+
+
+class MySQLBackend(StorageBackend):
+    """MySQL through PyMySQL with an explicitly sized connection pool."""
+
+    name = 'mysql'
+    label = 'MySQL'
+
+    def database_uri(self):
+        return self.config.get_database_uri()
+
+    def engine_options(self):
+        return {
+            "pool_size": self.config.DB_POOL_SIZE,
+            "max_overflow": self.config.DB_MAX_OVERFLOW,
+            "pool_timeout": self.config.DB_POOL_TIMEOUT,
+            "pool_recycle": self.config.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.config.DB_POOL_PRE_PING
+        }
+
+    def create_search_index(self, db, model):
+        return MySQLFullTextIndex(db, model)
+
+
+class SQLiteBackend(StorageBackend):
+    """File-backed SQLite in WAL mode, tuned for many readers and one writer."""
+
+    name = 'sqlite'
+    label = 'SQLite'
+    journal_mode = 'WAL'
+
+    def database_uri(self):
+        # Relative paths resolve inside the Flask instance folder
+        return f"sqlite:///{self.config.SQLITE_PATH}"
+
+    def engine_options(self):
+        return {
+            "connect_args": {
+                "timeout": self.config.SQLITE_BUSY_TIMEOUT / 1000,
+                "check_same_thread": False
+            }
+        }
+
+    def configure_engine(self, engine):
+        event.listen(engine, 'connect', self._apply_pragmas)
+
+    def _apply_pragmas(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={self.config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(self.config.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(self.config.SQLITE_BUSY_TIMEOUT)}")
+        cursor.execute(f"PRAGMA cache_size={int(self.config.SQLITE_CACHE_SIZE)}")
+        cursor.close()
+
+    def create_search_index(self, db, model):
+        return SQLiteFullTextIndex(db, model)
+
+
+class MemoryBackend(SQLiteBackend):
+    """Private in-memory SQLite database, for benchmarks and tests without a database server."""
+
+    name = 'memory'
+    label = 'in-memory'
+    journal_mode = 'MEMORY'
+    create_schema_on_startup = True
+
+    def database_uri(self):
+        return 'sqlite://'
+
+    def engine_options(self):
+        # One shared connection, otherwise every pooled connection would see its own empty database
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False}
+        }
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (MySQLBackend, SQLiteBackend, MemoryBackend)
+}
+
+
+def get_backend(name, config):
+    """Instantiate the storage backend registered under name."""
+    try:
+        return BACKENDS[name](config)
+    except KeyError:
+        raise ValueError(f"Unknown storage backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
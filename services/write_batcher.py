@@ -0,0 +1,152 @@
+"""Group commit: coalesces small writes from concurrent requests into one transaction."""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class WriteTimeoutError(Exception):
+    """Raised when a write has not committed within the writer's timeout; routes answer 503."""
+
+
+class GroupCommitWriter:
+    """Applies write operations from many request threads on one writer thread, committing them together.
+
+    A request blocks until the transaction holding its write has committed, so its
+    acknowledgement is as durable as a commit of its own, but concurrent writes share
+    one commit (one fsync and one write lock on SQLite) instead of paying for it each.
+    """
+
+    def __init__(self, db, max_rows=200, max_delay=0.002, timeout=10):
+        self.db = db
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.app = None
+        self.batches = 0
+        self.rows = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def install(self, app):
+        # The writer thread starts with the first write, so forked workers each get their own
+        self.app = app
+
+    def submit(self, operation):
+        """Run operation(session) in the next batch and return its result once the batch has committed.
+
+        Operations may be run a second time on their own if their batch fails, so they
+        must build their writes from scratch on every call.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((operation, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: withdraw it so the caller's error is accurate. Otherwise it is committing now.
+            if future.cancel():
+                self._count_timeout()
+                raise WriteTimeoutError(f"Write was not started within {self.timeout}s and was withdrawn") from None
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count_timeout()
+            raise WriteTimeoutError(
+                f"Write did not commit within {2 * self.timeout}s; it may still be applied"
+            ) from None
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "fallbacks": self.fallbacks,
+                "timeouts": self.timeouts,
+                "queued": self.queued
+            }
+
+    def _count_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    logger.error(f"Group commit writer failed: {str(e)}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    self.db.session.remove()
+
+    def _next_batch(self):
+        """Block for one write, then take whatever else arrives within max_delay (up to max_rows)."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                # Writes that queued up during the previous commit are taken even past the deadline
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch):
+        session = self.db.session
+        batch = [(operation, future) for operation, future in batch if future.set_running_or_notify_cancel()]
+        try:
+            results = [operation(session) for operation, _ in batch]
+            session.commit()
+        except Exception as e:
+            # One bad write must not fail its neighbours: redo them one transaction each
+            session.rollback()
+            logger.warning(f"Group commit of {len(batch)} writes failed, retrying individually: {str(e)}")
+            with self._lock:
+                self.fallbacks += 1
+            self._commit_individually(batch)
+            return
+        with self._lock:
+            self.batches += 1
+            self.rows += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_individually(self, batch):
+        session = self.db.session
+        for operation, future in batch:
+            try:
+                result = operation(session)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self.batches += 1
+                    self.rows += 1
+                future.set_result(result)
@@ -4,6 +4,8 @@ Startup script for AI Question Answer Generator
 Checks dependencies and provides helpful setup instructions
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import subprocess
@@ -21,18 +23,19 @@ def check_python_version():
 
 def check_dependencies():
     """Check if required Python packages are installed."""
-    required_packages = [
-        'flask', 'flask_sqlalchemy', 'flask_cors', 
-        'openai', 'pymysql', 'python_dotenv'
-    ]
+    # pip package name -> importable module name
+    required_packages = {
+        'flask': 'flask', 'flask-sqlalchemy': 'flask_sqlalchemy', 'flask-cors': 'flask_cors',
+        'openai': 'openai', 'pymysql': 'pymysql', 'python-dotenv': 'dotenv', 'numpy': 'numpy'
+    }
     
     missing_packages = []
     
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
+    # find_spec locates packages without importing them, so the check stays fast and side-effect free
+    for package, module in required_packages.items():
+        if importlib.util.find_spec(module) is not None:
             print(f"✅ {package} installed")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"❌ {package} not found")
     
@@ -136,8 +139,63 @@ def start_backend():
     except KeyboardInterrupt:
         print("\n👋 Backend stopped")
 
+def serve(args):
+    """Run the backend under gunicorn with several worker processes (see gunicorn.conf.py)."""
+    if importlib.util.find_spec('gunicorn') is None:
+        print("❌ gunicorn not found. Please run: pip install gunicorn")
+        print("   (gunicorn needs Linux or macOS; on Windows use WSL or Docker)")
+        return 1
+
+    # Command-line overrides reach gunicorn.conf.py through the SERVE_* variables it reads
+    overrides = {'SERVE_APP': args.app, 'SERVE_BIND': args.bind, 'SERVE_WORKERS': args.workers,
+                 'SERVE_THREADS': args.threads, 'SERVE_WORKER_CLASS': args.worker_class}
+    env = dict(os.environ, **{name: str(value) for name, value in overrides.items() if value is not None})
+    env.setdefault('DEBUG', 'False')
+    app_module = env.get('SERVE_APP', 'app')
+
+    if args.init_schema:
+        print("🗄️  Creating/verifying database schema...")
+        subprocess.check_call([sys.executable, '-c',
+                               f"from {app_module} import app; from app_factory import init_schema; init_schema(app)"], env=env)
+
+    print(f"\n🚀 Serving {app_module}:app with gunicorn (reload workers: kill -HUP, drain and stop: kill -TERM)")
+    try:
+        return subprocess.call([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', f'{app_module}:app'], env=env)
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+        return 0
+
 def main():
     """Main startup function."""
+    parser = argparse.ArgumentParser(description="Check the setup and start the AI Question Answer Generator")
+    parser.add_argument('command', nargs='?', choices=['serve'],
+                        help="serve: run the backend with multiple production workers instead of the setup check")
+    parser.add_argument('--app', choices=['app', 'app_sqlite'],
+                        help="Module to serve (default: SERVE_APP, i.e. app with STORAGE_BACKEND)")
+    parser.add_argument('--bind', help="Address to listen on (default: SERVE_BIND)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: SERVE_WORKERS, 0 = one per CPU core)")
+    parser.add_argument('--threads', type=int, help="Threads per gthread worker (default: SERVE_THREADS)")
+    parser.add_argument('--worker-class', help="gunicorn worker class, e.g. gthread or gevent (default: SERVE_WORKER_CLASS)")
+    parser.add_argument('--init-schema', action='store_true',
+                        help="With serve: create missing tables and apply migrations once before the workers start")
+    parser.add_argument('--skip-checks', action='store_true',
+                        help="Start the backend right away without dependency, Node.js and MySQL checks")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Report import times and time to first /health of a fresh worker, then exit")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        sys.exit(serve(args))
+
+    if args.startup_profile:
+        from config import Config
+        from services.startup import print_startup_report
+        sys.exit(0 if print_startup_report('app', Config.STARTUP_BUDGET_SECONDS) else 1)
+
+    if args.skip_checks:
+        start_backend()
+        return
+
     print("🤖 AI Question Answer Generator - Startup Check")
     print("=" * 50)
     
@@ -171,7 +229,7 @@ def main():
     print("\n✅ All checks passed!")
     print("\n🎯 Next steps:")
     print("1. Update your OpenAI API key in .env file")
-    print("2. Start the backend: python app.py")
+    print("2. Start the backend: python app.py --init-schema (later runs: python start.py --skip-checks)")
     print("3. Start the frontend: cd frontend && npm run dev")
     print("4. Open http://localhost:5173 in your browser")
     
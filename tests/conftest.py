@@ -0,0 +1,19 @@
+"""Shared fixtures: an app on the in-memory backend with a zero-latency stub generator."""
+import pytest
+
+from tests.support import StubGenerator, make_app
+
+
+@pytest.fixture
+def stub():
+    return StubGenerator(latency_ms=0)
+
+
+@pytest.fixture
+def app(stub):
+    return make_app(stub)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,24 @@
+"""Helpers shared by the test modules: apps on the in-memory backend driven by the benchmark's stub generator."""
+from app_factory import create_app
+from benchmark import StubGenerator
+from config import Config
+
+
+class MemoryConfig(Config):
+    DEBUG = False
+    TESTING = True
+    NEAR_DUPLICATE_SNAPSHOT_PATH = ''
+    QUESTION_CACHE_SYNC_INTERVAL = 0
+    ANSWER_CACHE_SYNC_INTERVAL = 0
+    GENERATOR_RETRY_BACKOFF = 0
+
+
+def make_app(generator=None, **overrides):
+    config = type('OverriddenConfig', (MemoryConfig,), overrides)
+    return create_app(config, backend='memory', generator=generator or StubGenerator(latency_ms=0))
+
+
+def upload(client, question, choices):
+    response = client.post('/upload', json={"question": question, "choices": choices})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
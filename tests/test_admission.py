@@ -0,0 +1,45 @@
+import threading
+
+from tests.support import StubGenerator, make_app, upload
+
+QUESTION = {"question": "What is 2 + 2?", "choices": ["3", "4", "5"]}
+
+
+def test_disabled_by_default(client):
+    for _ in range(5):
+        assert client.post('/upload', json=QUESTION).status_code == 201
+
+
+def test_rate_limit_answers_429_with_retry_after():
+    client = make_app(ADMISSION_ENABLED=True, RATE_LIMITS='upload_question=2/60',
+                      ADMISSION_CLIENT_HEADER='X-API-Key').test_client()
+    for _ in range(2):
+        assert client.post('/upload', json=QUESTION, headers={'X-API-Key': 'a'}).status_code == 201
+
+    response = client.post('/upload', json=QUESTION, headers={'X-API-Key': 'a'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Buckets are per client, and reads are never throttled
+    assert client.post('/upload', json=QUESTION, headers={'X-API-Key': 'b'}).status_code == 201
+    assert client.get('/questions', headers={'X-API-Key': 'a'}).status_code == 200
+    assert client.get('/admission/stats').get_json()
+
+
+def test_saturation_sheds_with_503():
+    app = make_app(StubGenerator(latency_ms=300), ADMISSION_ENABLED=True, RATE_LIMITS='',
+                   ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_MAX_QUEUE=0)
+    statuses = []
+
+    def post(n):
+        response = app.test_client().post('/upload', json={"question": f"Question {n}?", "choices": ["A", "B"]})
+        statuses.append((response.status_code, response.headers.get('Retry-After')))
+
+    threads = [threading.Thread(target=post, args=(n,)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(status for status, _ in statuses) == [201, 503]
+    assert all(retry_after for status, retry_after in statuses if status == 503)
@@ -0,0 +1,43 @@
+from question_model import db, Question
+from tests.support import upload
+
+QUESTION = "Which planet is known as the Red Planet?"
+CHOICES = ["Venus", "Mars", "Jupiter"]
+
+
+def test_duplicate_upload_is_answered_from_cache(client, stub):
+    first = upload(client, QUESTION, CHOICES)
+    second = upload(client, QUESTION, CHOICES)
+
+    assert second["result"]["answer"] == first["result"]["answer"]
+    assert stub.questions == [QUESTION]
+
+
+def test_correction_on_older_duplicate_wins(client, stub, app):
+    stub.answers[QUESTION] = 'A'
+    first = upload(client, QUESTION, CHOICES)
+    upload(client, QUESTION, CHOICES)
+
+    response = client.post(f"/questions/{first['question_id']}/report", json={"correction": "B"})
+    assert response.status_code == 200
+    third = upload(client, QUESTION, list(reversed(CHOICES)))
+
+    # "Mars" is B in the original order and B in the reversed one too
+    assert third["result"]["answer"] == "B"
+    assert third["result"]["explanation"] != stub.explanation_for(QUESTION)
+    assert stub.questions == [QUESTION]
+
+
+def test_correction_committed_elsewhere_evicts_memory_tier(client, stub, app):
+    stub.answers[QUESTION] = 'A'
+    first = upload(client, QUESTION, CHOICES)
+    upload(client, QUESTION, CHOICES)
+
+    # Another worker's correction reaches this process only through the change log
+    with app.app_context():
+        db.session.get(Question, first['question_id']).user_correction = 'B'
+        db.session.commit()
+    third = upload(client, QUESTION, CHOICES)
+
+    assert third["result"]["answer"] == "B"
+    assert stub.questions == [QUESTION]
@@ -0,0 +1,31 @@
+from tests.support import upload
+
+
+def test_upload_then_get(client, stub):
+    body = upload(client, "What is 2 + 2?", ["3", "4", "5"])
+    assert body["result"]["answer"] == stub.letter_for("What is 2 + 2?", ["3", "4", "5"])
+    assert stub.questions == ["What is 2 + 2?"]
+
+    question = client.get(f"/questions/{body['question_id']}").get_json()
+    assert question["question"] == "What is 2 + 2?"
+    assert question["choices"] == ["3", "4", "5"]
+
+
+def test_get_missing_question_is_404(client):
+    assert client.get('/questions/999').status_code == 404
+
+
+def test_delete_missing_question_is_404(client):
+    assert client.delete('/questions/999').status_code == 404
+
+
+def test_report_missing_question_is_404(client):
+    assert client.post('/questions/999/report', json={"correction": "A"}).status_code == 404
+
+
+def test_deleted_question_is_not_served_from_cache(client):
+    body = upload(client, "What is 2 + 2?", ["3", "4", "5"])
+    assert client.get(f"/questions/{body['question_id']}").status_code == 200
+
+    assert client.delete(f"/questions/{body['question_id']}").status_code == 200
+    assert client.get(f"/questions/{body['question_id']}").status_code == 404
@@ -0,0 +1,45 @@
+from tests.support import StubGenerator, make_app
+
+QUESTIONS = [{"question": f"What is {n} + {n}?", "choices": [str(n), str(2 * n), str(3 * n)]} for n in range(1, 5)]
+
+
+def test_batch_saves_valid_items_and_reports_invalid_ones(client, stub):
+    response = client.post('/upload/batch', json={"questions": QUESTIONS[:2] + [{"question": "No choices?"}]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["saved"], body["failed"]) == (2, 1)
+    assert [item["status"] for item in body["results"]] == ["saved", "saved", "error"]
+    for item, payload in zip(body["results"][:2], QUESTIONS):
+        assert item["degraded"] is False
+        question = client.get(f"/questions/{item['question_id']}").get_json()
+        assert question["question"] == payload["question"]
+        assert question["answer"] == stub.letter_for(payload["question"], payload["choices"])
+    assert sorted(stub.questions) == sorted(q["question"] for q in QUESTIONS[:2])
+
+
+def test_batch_rejects_empty_and_oversized_lists():
+    client = make_app(BATCH_MAX_ITEMS=2).test_client()
+
+    assert client.post('/upload/batch', json={"questions": []}).status_code == 400
+    assert client.post('/upload/batch', json=QUESTIONS[:3]).status_code == 400
+
+
+def test_concurrent_questions_share_packed_calls():
+    stub = StubGenerator(latency_ms=100)
+    client = make_app(stub, MICRO_BATCH_ENABLED=True, MICRO_BATCH_MAX_WAIT_MS=50, MICRO_BATCH_MAX_SIZE=8).test_client()
+
+    # Batch items are generated concurrently, so they reach the micro-batcher together
+    body = client.post('/upload/batch', json=QUESTIONS).get_json()
+
+    assert body["saved"] == len(QUESTIONS)
+    for item, payload in zip(body["results"], QUESTIONS):
+        assert item["result"]["answer"] == stub.letter_for(payload["question"], payload["choices"])
+        assert item["result"]["explanation"] == stub.explanation_for(payload["question"])
+    stats = client.get('/generator/batches/stats').get_json()
+    assert stats["packed_questions"] >= 2
+    assert stub.calls < len(QUESTIONS)
+
+
+def test_micro_batching_is_off_by_default(client):
+    assert client.get('/generator/batches/stats').status_code == 404
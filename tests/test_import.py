@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+import import_questions
+from import_questions import default_checkpoint_name, import_file, load_checkpoint
+from question_model import db, Question, change_feed, question_stats
+from services.migrations import import_checkpoint
+
+
+@pytest.fixture
+def questions_file(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    records = [{"question": f"What is {n} + {n}?", "choices": [str(n), str(2 * n)], "answer": "B"} for n in range(1, 6)]
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records), encoding='utf-8')
+    return str(path)
+
+
+def logged_inserts():
+    rows = db.session.execute(select(change_feed.table.c.question_id, change_feed.table.c.op)).all()
+    return sorted(question_id for question_id, op in rows if op == 'insert')
+
+
+def assert_imported_once(count):
+    ids = sorted(db.session.execute(select(Question.id)).scalars())
+    assert len(ids) == count
+    assert logged_inserts() == ids
+    assert question_stats.summary()["overall"]["questions"] == count
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_import_logs_every_new_id(app, questions_file, monkeypatch, returning):
+    with app.app_context():
+        # Without executemany RETURNING (MySQL) rows go through the ORM
+        monkeypatch.setattr(import_questions, 'returns_ids_from_executemany', lambda: returning)
+        checkpoint = import_file(questions_file, 'jsonl', 2, 'questions')
+
+        assert checkpoint == load_checkpoint('questions')
+        assert checkpoint['completed'] and checkpoint['inserted'] == 5
+        assert_imported_once(5)
+
+
+def test_failed_batch_rolls_back_with_its_checkpoint(app, questions_file, monkeypatch):
+    with app.app_context():
+        record_bulk_insert = question_stats.record_bulk_insert
+        calls = []
+
+        def failing_second_batch(mappings):
+            calls.append(mappings)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            record_bulk_insert(mappings)
+
+        monkeypatch.setattr(question_stats, 'record_bulk_insert', failing_second_batch)
+        with pytest.raises(RuntimeError):
+            import_file(questions_file, 'jsonl', 2, 'questions')
+        db.session.rollback()
+        assert load_checkpoint('questions')['records'] == 2
+
+        import_file(questions_file, 'jsonl', 2, 'questions')
+        assert_imported_once(5)
+
+
+def test_checkpoints_are_per_name(app, questions_file):
+    with app.app_context():
+        import_file(questions_file, 'jsonl', 2, 'first')
+        import_file(questions_file, 'jsonl', 2, 'first')
+        assert db.session.execute(select(import_checkpoint.c.name)).scalars().all() == ['first']
+        assert_imported_once(5)
+
+
+def test_default_checkpoint_name_fits_any_path(tmp_path):
+    long_path = str(tmp_path / ("d" * 200) / ("q" * 200 + ".jsonl"))
+
+    name = default_checkpoint_name(long_path)
+
+    assert len(name) <= import_checkpoint.c.name.type.length
+    assert name != default_checkpoint_name(long_path[:-7] + "x.jsonl")
+
+
+def test_overlong_checkpoint_name_is_rejected(app, questions_file):
+    with app.app_context():
+        with pytest.raises(SystemExit):
+            import_file(questions_file, 'jsonl', 2, 'x' * 256)
+        assert db.session.execute(select(Question.id)).first() is None
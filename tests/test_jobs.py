@@ -0,0 +1,50 @@
+import threading
+import time
+
+from question_model import Question
+from services.job_queue import JobQueue
+from tests.support import StubGenerator, make_app
+
+
+def wait_for(job_queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_queue.get(job_id)
+        if job.finished_at is not None:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_only_the_worker_reports_a_timeout():
+    release = threading.Event()
+
+    def overrunning(job):
+        release.wait(5)
+        job.check_deadline()
+        return "saved"
+
+    jobs = JobQueue(max_workers=1, job_timeout=0.05)
+    job = jobs.submit(overrunning)
+    time.sleep(0.1)
+
+    # Past its deadline but still working: polling must not claim it stopped
+    assert jobs.get(job.id).to_dict()["status"] == 'running'
+    release.set()
+    assert wait_for(jobs, job.id).status == 'timeout'
+    jobs.shutdown()
+
+
+def test_job_deadline_bounds_the_generator_call():
+    app = make_app(StubGenerator(latency_ms=1000), UPLOAD_JOB_TIMEOUT=0.2, GENERATOR_RETRIES=0)
+    client = app.test_client()
+
+    started = time.monotonic()
+    response = client.post('/upload?async=1', json={"question": "What is 2 + 2?", "choices": ["3", "4"]})
+    assert response.status_code == 202
+    job = wait_for(app.extensions['question_api'].upload_jobs, response.get_json()["job_id"])
+
+    assert job.status == 'timeout'
+    assert time.monotonic() - started < 0.9
+    with app.app_context():
+        assert Question.query.count() == 0
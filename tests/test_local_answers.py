@@ -0,0 +1,51 @@
+from tests.support import StubGenerator, make_app, upload
+from tests.test_near_duplicates import CAPITALS, LOOKALIKE_PAIRS
+
+
+def local_answer_app(stub):
+    return make_app(stub, LOCAL_ANSWER_ENABLED=True, NEAR_DUPLICATE_ENABLED=False)
+
+
+def corrected(client, question, choices, correction):
+    body = upload(client, question, choices)
+    response = client.post(f"/questions/{body['question_id']}/report", json={"correction": correction})
+    assert response.status_code == 200
+    return body
+
+
+def test_disabled_by_default(client, stub):
+    corrected(client, "What is the capital of France?", CAPITALS, "A")
+    body = upload(client, "What is the capital of France", CAPITALS)
+    assert body["result"]["source"] == StubGenerator.SOURCE
+
+
+def test_lookalike_questions_are_generated():
+    # Corrected answers must not leak to negated or antonym questions, even with reordered choices
+    for first, second, choices in LOOKALIKE_PAIRS:
+        stub = StubGenerator(latency_ms=0)
+        client = local_answer_app(stub).test_client()
+        corrected(client, first, choices, "A")
+        for variant in (choices, list(reversed(choices))):
+            body = upload(client, second, variant)
+            assert body["result"]["source"] == StubGenerator.SOURCE, (first, second, variant)
+
+
+def test_corrected_answer_is_reused_for_the_same_question():
+    stub = StubGenerator(latency_ms=0)
+    client = local_answer_app(stub).test_client()
+    original = corrected(client, "What is the capital of France?", CAPITALS, "A")
+
+    body = upload(client, "what is the capital of france", ["Rome", "Madrid", "Berlin", "Paris"])
+    result = body["result"]
+    assert result["source"] == "local"
+    assert result["answer"] == "D"
+    assert result["local_match"]["question_id"] == original["question_id"]
+    assert result["explanation"] != original["result"]["explanation"]
+
+
+def test_different_choices_are_not_reused():
+    stub = StubGenerator(latency_ms=0)
+    client = local_answer_app(stub).test_client()
+    corrected(client, "What is the capital of France?", CAPITALS, "A")
+    body = upload(client, "What is the capital of France", ["Paris", "Lyon", "Nice", "Lille"])
+    assert body["result"]["source"] == StubGenerator.SOURCE
@@ -0,0 +1,20 @@
+from tests.support import make_app, upload
+
+
+def test_metrics_expose_request_and_stage_latency(client):
+    upload(client, "What is 2 + 2?", ["3", "4", "5"])
+    client.get('/questions/1')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert '# TYPE qa_http_request_duration_seconds histogram' in text
+    assert 'route="/questions/<int:question_id>"' in text
+    assert 'qa_http_request_duration_seconds_count{method="POST",route="/upload",status="201"} 1' in text
+    assert 'qa_stage_duration_seconds_count{stage="db_commit"}' in text
+
+
+def test_metrics_can_be_disabled():
+    assert make_app(METRICS_ENABLED=False).test_client().get('/metrics').status_code == 404
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+from app_factory import create_app, init_schema
+from services.answer_cache import content_hash
+from services.migrations import MIGRATIONS
+from tests.support import MemoryConfig, StubGenerator, upload
+
+BASELINE_SCHEMA = """
+CREATE TABLE question (
+    id INTEGER PRIMARY KEY,
+    question_text TEXT NOT NULL,
+    choice_a VARCHAR(255),
+    choice_b VARCHAR(255),
+    choice_c VARCHAR(255),
+    choice_d VARCHAR(255),
+    predicted_answer VARCHAR(1),
+    explanation TEXT
+)
+"""
+
+
+def baseline_app(tmp_path):
+    path = tmp_path / 'baseline.db'
+    connection = sqlite3.connect(path)
+    connection.execute(BASELINE_SCHEMA)
+    connection.execute(
+        "INSERT INTO question (question_text, choice_a, choice_b, choice_c, choice_d, predicted_answer, explanation) "
+        "VALUES ('Which planet is largest?', 'Mars', 'Jupiter', 'Venus', 'Earth', 'B', 'Jupiter is largest.')"
+    )
+    connection.commit()
+    connection.close()
+    config = type('BaselineConfig', (MemoryConfig,), {'SQLITE_PATH': str(path)})
+    stub = StubGenerator(latency_ms=0)
+    return create_app(config, backend='sqlite', generator=stub), stub, path
+
+
+def test_baseline_schema_is_upgraded(tmp_path):
+    app, stub, path = baseline_app(tmp_path)
+    init_schema(app)
+
+    connection = sqlite3.connect(path)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(question)")}
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list(question)")}
+    versions = [row[0] for row in connection.execute("SELECT version FROM schema_version ORDER BY version")]
+    stored_hash, choices = connection.execute("SELECT content_hash, choices FROM question WHERE id = 1").fetchone()
+    connection.close()
+
+    assert {'choices', 'created_at', 'content_hash', 'user_correction'} <= columns
+    assert {'ix_question_content_hash', 'ix_question_created_at_id', 'ix_question_user_correction_id'} <= indexes
+    assert versions == sorted(version for version, _, _ in MIGRATIONS)
+    assert stored_hash == content_hash('Which planet is largest?', ['Mars', 'Jupiter', 'Venus', 'Earth'])
+    assert json.loads(choices) == ['Mars', 'Jupiter', 'Venus', 'Earth']
+
+
+def test_upgraded_database_serves_uploads(tmp_path):
+    app, stub, _ = baseline_app(tmp_path)
+    init_schema(app)
+    client = app.test_client()
+
+    # The legacy row is found through its backfilled hash instead of calling the generator
+    body = upload(client, 'Which planet is largest?', ['Mars', 'Jupiter', 'Venus', 'Earth'])
+    assert body['result']['source'] == 'database'
+    assert stub.questions == []
+
+    body = upload(client, 'Which planet is smallest?', ['Mars', 'Mercury'])
+    assert body['result']['source'] == StubGenerator.SOURCE
+    report = client.post(f"/questions/{body['question_id']}/report", json={"correction": "B"})
+    assert report.status_code == 200
+
+
+def test_migrations_are_idempotent(tmp_path):
+    app, _, _ = baseline_app(tmp_path)
+    init_schema(app)
+    init_schema(app)
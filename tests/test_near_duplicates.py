@@ -0,0 +1,102 @@
+from config import Config
+from question_model import Question, change_feed, db
+from services.local_answers import LocalAnswerEngine
+from services.near_duplicates import NearDuplicateIndex
+from tests.support import StubGenerator, make_app, upload
+
+CAPITALS = ["Paris", "Berlin", "Madrid", "Rome"]
+PLANETS = ["Jupiter", "Mercury", "Mars", "Earth"]
+WARS = ["1918", "1945", "1939", "1914"]
+YES_NO = ["Yes", "No"]
+
+# Pairs that differ in one word and need different answers. They are why both indexes
+# require equal choices and set their thresholds this high: the longer variants score up to
+# 0.89 MinHash similarity and 0.93 cosine (see test_lookalike_scores_stay_below_thresholds).
+LOOKALIKE_PAIRS = [
+    ("What is the capital of France?", "What is the capital of Germany?", CAPITALS),
+    ("Is 7 NOT a prime number?", "Is 7 a prime number?", YES_NO),
+    ("Which is the largest planet in the solar system?", "Which is the smallest planet in the solar system?", PLANETS),
+    ("In which year did the Second World War end?", "In which year did the First World War end?", WARS),
+    ("Which one of the following cities is the capital city of France, a country in Western Europe?",
+     "Which one of the following cities is the capital city of Germany, a country in Western Europe?", CAPITALS),
+    ("Which of the following numbers is NOT a prime number greater than two?",
+     "Which of the following numbers is a prime number greater than two?", ["4", "7", "9", "15"]),
+    ("According to the standard astronomical classification, which is the largest planet in our solar system?",
+     "According to the standard astronomical classification, which is the smallest planet in our solar system?", PLANETS),
+]
+
+
+def near_duplicate_app(stub=None, **overrides):
+    return make_app(stub or StubGenerator(latency_ms=0), NEAR_DUPLICATE_ENABLED=True, LOCAL_ANSWER_ENABLED=False, **overrides)
+
+
+def test_disabled_by_default(client, stub):
+    upload(client, "What is the capital of France?", CAPITALS)
+    body = upload(client, "What is the capital of France", CAPITALS)
+    assert body["result"]["source"] == StubGenerator.SOURCE
+    assert stub.calls == 2
+
+
+def test_lookalike_questions_are_generated():
+    for first, second, choices in LOOKALIKE_PAIRS:
+        stub = StubGenerator(latency_ms=0)
+        client = near_duplicate_app(stub).test_client()
+        upload(client, first, choices)
+        body = upload(client, second, choices)
+        assert body["result"]["source"] == StubGenerator.SOURCE, (first, second)
+        assert stub.questions == [first, second]
+
+
+def test_same_question_reordered_is_reused_without_explanation():
+    stub = StubGenerator(latency_ms=0, answers={"What is the capital of France?": "A"})
+    client = near_duplicate_app(stub).test_client()
+    original = upload(client, "What is the capital of France?", CAPITALS)
+
+    body = upload(client, "what is the capital of France", ["Rome", "Madrid", "Berlin", "Paris"])
+    result = body["result"]
+    assert result["source"] == "near_duplicate"
+    assert result["answer"] == "D"
+    assert result["near_duplicate"]["question_id"] == original["question_id"]
+    assert result["explanation"] != original["result"]["explanation"]
+    assert stub.calls == 1
+
+
+def test_different_choices_are_not_reused():
+    stub = StubGenerator(latency_ms=0)
+    client = near_duplicate_app(stub).test_client()
+    upload(client, "What is the capital of France?", CAPITALS)
+    body = upload(client, "What is the capital of France", ["Paris", "Lyon", "Nice", "Lille"])
+    assert body["result"]["source"] == StubGenerator.SOURCE
+
+
+def test_snapshot_from_another_database_is_ignored(tmp_path):
+    snapshot = str(tmp_path / "near_duplicates.idx")
+    first = near_duplicate_app(NEAR_DUPLICATE_SNAPSHOT_PATH=snapshot)
+    upload(first.test_client(), "What is the capital of France?", CAPITALS)
+    index = first.extensions['question_api'].near_duplicate_index
+    with first.app_context():
+        index.sync()
+    index.save_snapshot()
+
+    # A second database, further along its change log, whose question 1 is something else
+    stub = StubGenerator(latency_ms=0)
+    second = near_duplicate_app(stub, NEAR_DUPLICATE_SNAPSHOT_PATH=snapshot)
+    with second.app_context():
+        db.session.add_all([Question(f"Unrelated question {i}?", CAPITALS, "C", "Because.") for i in range(3)])
+        db.session.commit()
+
+    body = upload(second.test_client(), "What is the capital of France", CAPITALS)
+    assert body["result"]["source"] == StubGenerator.SOURCE
+    assert second.extensions['question_api'].near_duplicate_index.stats()["indexed_questions"] == 3
+
+
+def test_lookalike_scores_stay_below_thresholds():
+    index = NearDuplicateIndex(db, Question, change_feed)
+    engine = LocalAnswerEngine(db, Question, change_feed)
+    minhash, cosine = [], []
+    for first, second, choices in LOOKALIKE_PAIRS:
+        minhash.append(index._similarity(index.signature(first, choices), index.signature(second, choices)))
+        cosine.append(float(engine.embed(first, choices) @ engine.embed(second, choices)))
+
+    assert max(minhash) < 0.9 < Config.NEAR_DUPLICATE_THRESHOLD
+    assert max(cosine) < 0.93 < Config.LOCAL_ANSWER_THRESHOLD
@@ -0,0 +1,36 @@
+import sys
+
+import pytest
+
+from tests.support import make_app
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    app = make_app(PROFILING_ENABLED=True, PROFILING_OUTPUT_DIR=str(tmp_path))
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+@pytest.mark.parametrize("mode", ['cprofile', 'sample'])
+def test_failed_request_stops_the_profiler(profiled_app, mode):
+    profiler = profiled_app.extensions['question_api'].profiler
+    client = profiled_app.test_client()
+
+    with pytest.raises(RuntimeError):
+        client.get(f'/boom?profile=1&profile_mode={mode}')
+
+    assert profiler._active.state is None
+    assert sys.getprofile() is None
+
+
+def test_profiled_request_gets_a_report(profiled_app):
+    response = profiled_app.test_client().get('/health', headers={'X-Profile': '1'})
+
+    assert response.headers['X-Profile-Id']
+    assert profiled_app.extensions['question_api'].profiler._active.state is None
+    assert sys.getprofile() is None
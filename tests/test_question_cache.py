@@ -0,0 +1,58 @@
+import pytest
+
+from question_model import db, Question, change_feed
+from services.question_cache import LocalSharedCache, QuestionCache
+from tests.support import upload
+
+
+@pytest.fixture
+def question_id(client):
+    return upload(client, "What is 2 + 2?", ["3", "4", "5"])["question_id"]
+
+
+def worker(shared):
+    return QuestionCache(change_feed, sync_interval=0, shared=shared)
+
+
+def correct(question_id, letter):
+    question = db.session.get(Question, question_id)
+    question.user_correction = letter
+    db.session.commit()
+
+
+def test_put_after_local_invalidation_is_dropped(app, question_id):
+    cache = worker(LocalSharedCache())
+    with app.app_context():
+        stamp = cache.stamp()
+        cache.invalidate(question_id)
+        cache.put(question_id, b'stale', stamp)
+
+        assert cache.get(question_id) is None
+
+
+def test_stale_put_from_another_worker_is_not_served(app, question_id):
+    shared = LocalSharedCache()
+    first, second = worker(shared), worker(shared)
+    with app.app_context():
+        # The first worker reads the question, then the second one corrects and invalidates it
+        stamp = first.stamp()
+        correct(question_id, 'A')
+        second.invalidate(question_id)
+        first.put(question_id, b'stale', stamp)
+
+        assert shared.get(question_id) is not None
+        assert second.get(question_id) is None
+
+
+def test_fresh_put_is_shared_between_workers(app, question_id):
+    shared = LocalSharedCache()
+    first, second = worker(shared), worker(shared)
+    with app.app_context():
+        first.put(question_id, b'fresh', first.stamp())
+
+        assert second.get(question_id) == b'fresh'
+        assert second.stats()["shared_hits"] == 1
+
+        correct(question_id, 'A')
+        third = worker(shared)
+        assert third.get(question_id) is None
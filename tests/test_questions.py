@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+import json
+
+from tests.support import upload
+
+
+def upload_many(client, count):
+    return [upload(client, f"What is {n} + {n}?", [str(n), str(2 * n), str(3 * n)])["question_id"]
+            for n in range(1, count + 1)]
+
+
+def test_keyset_pagination_walks_newest_first(client):
+    ids = upload_many(client, 5)
+
+    first = client.get('/questions?limit=2')
+    assert [item["id"] for item in first.get_json()] == ids[:-3:-1]
+    assert first.headers['X-Next-Before-Id'] == str(ids[-2])
+    assert 'rel="next"' in first.headers['Link']
+
+    seen = [item["id"] for item in first.get_json()]
+    next_url = first.headers['Link'].split('>')[0].lstrip('<')
+    while next_url:
+        page = client.get(next_url)
+        seen += [item["id"] for item in page.get_json()]
+        next_url = page.headers.get('Link', '').split('>')[0].lstrip('<')
+
+    assert seen == list(reversed(ids))
+
+
+def test_fields_projects_the_listing(client):
+    upload_many(client, 2)
+
+    items = client.get('/questions?fields=id,choices').get_json()
+
+    assert all(set(item) == {"id", "choices"} for item in items)
+    assert items[0]["choices"] == ["2", "4", "6"]
+    assert client.get('/questions?fields=id,secret').status_code == 400
+
+
+def test_unchanged_listing_is_304_until_a_write(client):
+    upload_many(client, 2)
+    first = client.get('/questions')
+    etag = first.headers['ETag']
+
+    repeat = client.get('/questions', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.get_data() == b''
+
+    upload_many(client, 1)
+    changed = client.get('/questions', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_change_feed_reports_upserts_and_deletes(client):
+    ids = upload_many(client, 3)
+    version = int(client.get('/questions').headers['X-Questions-Version'])
+
+    client.post(f"/questions/{ids[0]}/report", json={"correction": "C"})
+    client.delete(f"/questions/{ids[1]}")
+    changes = client.get(f'/questions/changes?since={version}&fields=id,user_correction').get_json()
+
+    assert changes["upserted"] == [{"id": ids[0], "user_correction": "C"}]
+    assert changes["deleted"] == [ids[1]]
+    assert changes["version"] > version and changes["has_more"] is False
+    assert client.get(f'/questions/changes?since={changes["version"]}').get_json()["upserted"] == []
+
+
+def test_export_ndjson_streams_every_row(client):
+    ids = upload_many(client, 3)
+
+    response = client.get('/questions/export?fields=id,question')
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows == [{"id": qid, "question": f"What is {n} + {n}?"} for n, qid in enumerate(ids, start=1)]
+
+
+def test_export_csv_spreads_choices_over_columns(client):
+    upload_many(client, 1)
+
+    response = client.get('/questions/export?format=csv&fields=id,choices&gzip=1')
+
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.get_data()).decode('utf-8'))))
+    assert rows[0][:4] == ["id", "choice_a", "choice_b", "choice_c"]
+    assert rows[1][1:4] == ["1", "2", "3"]
+    assert client.get('/questions/export?format=xml').status_code == 400
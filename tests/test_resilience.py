@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+from services.resilience import FALLBACK_SOURCE, GeneratorTimeoutError, ResilientGenerator
+from tests.support import make_app, upload
+
+
+class FlakyGenerator:
+    """Fails its first `failures` calls, then answers A."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, question_text, choices):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream error")
+        return {"answer": "A", "explanation": "Because.", "source": "stub"}
+
+    def stream(self, question_text, choices):
+        result = self(question_text, choices)
+        yield {"answer": result["answer"], "source": result["source"]}
+        yield {"explanation": result["explanation"]}
+
+
+def resilient(generator, **kwargs):
+    return ResilientGenerator(generator, retries=2, retry_backoff=0, failure_threshold=3, **kwargs)
+
+
+def test_retried_call_counts_one_failure():
+    generator = FlakyGenerator(failures=100)
+    wrapped = resilient(generator)
+
+    result = wrapped("Q?", ["A", "B"])
+
+    assert result["source"] == FALLBACK_SOURCE
+    assert generator.calls == 3
+    assert wrapped.failures == 1
+    assert wrapped.breaker.consecutive_failures == 1
+    assert not wrapped.is_open
+
+
+def test_breaker_opens_after_threshold_logical_calls():
+    wrapped = resilient(FlakyGenerator(failures=100))
+    for _ in range(2):
+        wrapped("Q?", ["A", "B"])
+    assert not wrapped.is_open
+
+    wrapped("Q?", ["A", "B"])
+    assert wrapped.is_open
+
+
+def test_retry_success_records_no_failure():
+    wrapped = resilient(FlakyGenerator(failures=1))
+
+    assert wrapped("Q?", ["A", "B"])["answer"] == "A"
+    assert wrapped.failures == 0
+    assert wrapped.breaker.consecutive_failures == 0
+
+
+def test_stream_failures_are_retried_and_counted_once():
+    generator = FlakyGenerator(failures=100)
+    wrapped = resilient(generator)
+
+    chunks = list(wrapped.stream(generator.stream, "Q?", ["A", "B"]))
+
+    assert chunks[0]["source"] == FALLBACK_SOURCE
+    assert generator.calls == 3
+    assert wrapped.failures == 1
+
+
+def test_stream_is_short_circuited_while_open():
+    generator = FlakyGenerator(failures=100)
+    wrapped = resilient(generator)
+    for _ in range(3):
+        list(wrapped.stream(generator.stream, "Q?", ["A", "B"]))
+    assert wrapped.is_open
+
+    calls = generator.calls
+    chunks = list(wrapped.stream(generator.stream, "Q?", ["A", "B"]))
+    assert chunks[0]["source"] == FALLBACK_SOURCE
+    assert generator.calls == calls
+
+
+def test_stream_success_closes_the_count():
+    generator = FlakyGenerator(failures=1)
+    wrapped = resilient(generator)
+
+    chunks = list(wrapped.stream(generator.stream, "Q?", ["A", "B"]))
+
+    assert chunks == [{"answer": "A", "source": "stub"}, {"explanation": "Because."}]
+    assert wrapped.failures == 0
+    assert wrapped.breaker.consecutive_failures == 0
+
+
+def test_stream_past_deadline_times_out():
+    release = threading.Event()
+
+    def stalled(question_text, choices):
+        yield {"answer": "A", "source": "stub"}
+        release.wait(5)
+        yield {"explanation": "Too late."}
+
+    wrapped = resilient(stalled, timeout=0.2)
+    chunks = wrapped.stream(stalled, "Q?", ["A", "B"])
+    assert next(chunks)["answer"] == "A"
+    with pytest.raises(GeneratorTimeoutError):
+        next(chunks)
+    release.set()
+    assert wrapped.timeouts == 1
+
+
+def test_failed_upload_counts_once_in_generator_stats():
+    generator = FlakyGenerator(failures=100)
+    client = make_app(generator, GENERATOR_RETRIES=2, GENERATOR_BREAKER_FAILURES=3).test_client()
+
+    body = upload(client, "What is 2 + 2?", ["3", "4", "5"])
+    stats = client.get('/generator/stats').get_json()
+
+    assert body["result"]["source"] == FALLBACK_SOURCE
+    assert generator.calls == 3
+    assert stats["failures"] == 1
+    assert stats["retries"] == 2
+    assert stats["circuit"] == {"state": "closed", "consecutive_failures": 1, "times_opened": 0}
+
+
+def test_caller_deadline_timeout_is_not_an_upstream_failure():
+    def slow(question_text, choices):
+        time.sleep(0.3)
+        return {"answer": "A", "explanation": "Slow.", "source": "stub"}
+
+    wrapped = resilient(slow, timeout=5)
+    result = wrapped("Q?", ["A", "B"], deadline=time.monotonic() + 0.05)
+
+    assert result["source"] == FALLBACK_SOURCE
+    assert wrapped.failures == 0 and wrapped.timeouts == 0
+    assert wrapped.breaker.consecutive_failures == 0
+
+
+def test_own_timeout_is_an_upstream_failure():
+    def slow(question_text, choices):
+        time.sleep(0.3)
+        return {"answer": "A", "explanation": "Slow.", "source": "stub"}
+
+    wrapped = resilient(slow, timeout=0.05)
+    wrapped("Q?", ["A", "B"], deadline=time.monotonic() + 5)
+
+    assert wrapped.failures == 1 and wrapped.timeouts == 1
+
+
+def test_caller_deadline_frees_the_half_open_probe():
+    def slow(question_text, choices):
+        time.sleep(0.3)
+        return {"answer": "A", "explanation": "Slow.", "source": "stub"}
+
+    wrapped = resilient(slow, timeout=5)
+    wrapped.breaker.state, wrapped.breaker.opened_at = wrapped.breaker.OPEN, time.monotonic() - 60
+    wrapped("Q?", ["A", "B"], deadline=time.monotonic() + 0.05)
+
+    assert wrapped.breaker.allow()
+
+
+def test_abandoned_stream_records_nothing():
+    generator = FlakyGenerator(failures=0)
+    wrapped = resilient(generator)
+    wrapped.breaker.consecutive_failures = 2
+
+    chunks = wrapped.stream(generator.stream, "Q?", ["A", "B"])
+    next(chunks)
+    chunks.close()
+
+    assert wrapped.breaker.consecutive_failures == 2
+    assert wrapped.failures == 0
+
+
+def test_fallback_upload_is_flagged_and_saved_unanswered():
+    client = make_app(FlakyGenerator(failures=100), GENERATOR_RETRIES=0).test_client()
+
+    body = upload(client, "What is 2 + 2?", ["3", "4", "5"])
+    question = client.get(f"/questions/{body['question_id']}").get_json()
+
+    assert body["degraded"] is True
+    assert "without an answer" in body["message"]
+    assert question["answer"] is None and question["explanation"] is None
+
+
+def test_answered_upload_is_not_flagged():
+    body = upload(make_app(FlakyGenerator(failures=0)).test_client(), "What is 2 + 2?", ["3", "4", "5"])
+
+    assert body["degraded"] is False
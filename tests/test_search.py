@@ -0,0 +1,25 @@
+from tests.support import upload
+
+
+def search(client, query):
+    response = client.get('/questions/search', query_string={"q": query})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_search_ranks_with_distinct_scores(client):
+    upload(client, "Which star is closest?", ["Sun", "Vega"])
+    upload(client, "Which star is the brightest star of all stars?", ["Sirius", "Vega"])
+    upload(client, "What is the capital of France?", ["Paris", "Rome"])
+
+    body = search(client, "star")
+    scores = [item["score"] for item in body["results"]]
+
+    assert len(scores) == 2
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] != scores[1]
+    assert all(score > 1e-6 for score in scores)
+
+
+def test_search_without_query_is_400(client):
+    assert client.get('/questions/search').status_code == 400
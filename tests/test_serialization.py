@@ -0,0 +1,51 @@
+import gzip
+import json
+
+import pytest
+
+from services import serialization
+from tests.support import upload
+
+
+@pytest.fixture
+def filled_client(client):
+    # Enough explanation text to cross COMPRESSION_MIN_SIZE
+    for n in range(1, 6):
+        upload(client, f"What is {n} + {n}?", [str(n), str(2 * n), str(3 * n)])
+    return client
+
+
+def test_large_listing_is_gzipped_when_accepted(filled_client):
+    plain = filled_client.get('/questions')
+    packed = filled_client.get('/questions', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in packed.headers['Vary']
+    assert json.loads(gzip.decompress(packed.get_data())) == plain.get_json()
+    # Each coding is its own representation, so a cached plain body is never revalidated as gzip
+    assert packed.headers['ETag'] != plain.headers['ETag']
+
+
+def test_small_responses_stay_uncompressed(client):
+    response = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_msgpack_falls_back_to_json_when_not_installed(filled_client, monkeypatch):
+    monkeypatch.setattr(serialization, 'msgpack', None)
+
+    response = filled_client.get('/questions', headers={'Accept': 'application/msgpack'})
+
+    assert response.mimetype == 'application/json'
+    assert len(response.get_json()) == 5
+
+
+def test_msgpack_is_served_when_preferred(filled_client):
+    msgpack = pytest.importorskip('msgpack')
+
+    response = filled_client.get('/questions', headers={'Accept': 'application/msgpack'})
+
+    assert response.mimetype == 'application/msgpack'
+    assert msgpack.unpackb(response.get_data(), raw=False) == filled_client.get('/questions').get_json()
@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+from argparse import Namespace
+
+import start
+from services.startup import parse_importtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_PROBE = """
+import json, sys
+from app_factory import create_app
+from tests.support import MemoryConfig
+app = create_app(MemoryConfig, backend='memory')
+status = app.test_client().get('/health').status_code
+print(json.dumps({"status": status, "loaded": [m for m in ('services.ai_answer_generator', 'openai', 'numpy') if m in sys.modules]}))
+"""
+
+GUNICORN_PROBE = """
+import json, runpy
+settings = runpy.run_path('gunicorn.conf.py')
+print(json.dumps({k: settings[k] for k in ('bind', 'workers', 'threads', 'worker_class', 'graceful_timeout', 'preload_app')}))
+"""
+
+
+def run_probe(probe, **env):
+    process = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, cwd=ROOT,
+                             env=dict(os.environ, **env), check=True)
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def test_app_starts_without_importing_the_generator_or_numpy():
+    assert run_probe(LAZY_PROBE) == {"status": 200, "loaded": []}
+
+
+def test_parse_importtime_reads_self_and_cumulative_times():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   json.decoder\n"
+              "import time:        80 |        200 | json\n")
+
+    assert parse_importtime(stderr) == {"json.decoder": (120, 120), "json": (80, 200)}
+
+
+def test_gunicorn_settings_follow_serve_variables():
+    settings = run_probe(GUNICORN_PROBE, SERVE_BIND='127.0.0.1:9000', SERVE_WORKERS='3', SERVE_THREADS='4',
+                         SERVE_DRAIN_TIMEOUT='7', SERVE_WORKER_CLASS='gthread')
+
+    assert settings == {"bind": "127.0.0.1:9000", "workers": 3, "threads": 4, "worker_class": "gthread",
+                        "graceful_timeout": 7, "preload_app": True}
+    # Gevent patches the standard library per worker, so the app can't be preloaded in the master
+    assert run_probe(GUNICORN_PROBE, SERVE_WORKER_CLASS='gevent')["preload_app"] is False
+
+
+def test_serve_passes_flag_overrides_to_gunicorn(monkeypatch):
+    calls = []
+    monkeypatch.setattr(start.subprocess, 'call', lambda command, env: calls.append((command, env)) or 0)
+    args = Namespace(app='app_sqlite', bind=None, workers=2, threads=None, worker_class=None, init_schema=False)
+
+    assert start.serve(args) == 0
+
+    command, env = calls[0]
+    assert command[-3:] == ['-c', 'gunicorn.conf.py', 'app_sqlite:app']
+    assert env['SERVE_WORKERS'] == '2' and env['SERVE_APP'] == 'app_sqlite'
+    assert env.get('SERVE_THREADS') == os.environ.get('SERVE_THREADS')
+    assert env['DEBUG'] == os.environ.get('DEBUG', 'False')
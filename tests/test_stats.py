@@ -0,0 +1,25 @@
+from tests.support import upload
+
+
+def test_stats_count_uploads_reviews_and_deletes(client, stub):
+    stub.answers.update({"Q1?": "A", "Q2?": "A", "Q3?": "B"})
+    first = upload(client, "Q1?", ["x", "y"])
+    second = upload(client, "Q2?", ["x", "y"])
+    third = upload(client, "Q3?", ["x", "y"])
+
+    client.post(f"/questions/{first['question_id']}/report", json={"correction": "A"})
+    client.post(f"/questions/{second['question_id']}/report", json={"correction": "B"})
+    client.delete(f"/questions/{third['question_id']}")
+    stats = client.get('/stats').get_json()
+
+    assert stats["by_answer"]["A"]["questions"] == 2
+    assert stats["by_answer"]["A"]["confirmed"] == 1
+    assert stats["by_answer"]["A"]["corrected"] == 1
+    assert stats["by_answer"]["A"]["disagreement_rate"] == 0.5
+    assert stats["by_answer"]["B"]["questions"] == 0
+    assert stats["overall"]["questions"] == 2 and stats["overall"]["reviewed"] == 2
+    assert len(stats["daily"]) == 1 and stats["daily"][0]["deleted"] == 1
+
+
+def test_stats_rejects_bad_days(client):
+    assert client.get('/stats?days=0').status_code == 400
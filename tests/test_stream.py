@@ -0,0 +1,84 @@
+import json
+
+from services.resilience import FALLBACK_SOURCE
+from tests.support import StubGenerator, make_app
+
+
+def stream_events(client, question, choices):
+    response = client.post('/upload/stream', json={"question": question, "choices": choices})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class StreamingStub(StubGenerator):
+    """Offers a stream method, which the API prefers over replaying the complete result."""
+
+    def __init__(self):
+        super().__init__(latency_ms=0)
+        self.streamed = []
+
+    def stream(self, question_text, choices):
+        self.streamed.append(question_text)
+        yield {"answer": "A", "source": "stub-stream"}
+        for word in ("Streamed ", "for ", "real."):
+            yield {"explanation": word}
+
+
+class FailingStub(StubGenerator):
+    def __init__(self):
+        super().__init__(latency_ms=0)
+
+    def __call__(self, question_text, choices):
+        raise RuntimeError("upstream down")
+
+
+def test_blocking_generator_is_replayed(client, stub):
+    events = stream_events(client, "What is 2 + 2?", ["3", "4", "5"])
+
+    names = [name for name, _ in events]
+    assert names[0] == 'answer' and names[-1] == 'saved'
+    assert set(names[1:-1]) == {'token'}
+    assert events[0][1]["answer"] == stub.letter_for("What is 2 + 2?", ["3", "4", "5"])
+    text = ''.join(data["text"] for name, data in events if name == 'token')
+    assert text == stub.explanation_for("What is 2 + 2?")
+    assert events[-1][1]["result"]["explanation"] == text
+    assert stub.questions == ["What is 2 + 2?"]
+
+
+def test_stream_method_is_used_when_offered():
+    stub = StreamingStub()
+    client = make_app(stub).test_client()
+
+    events = stream_events(client, "What is 2 + 2?", ["3", "4", "5"])
+
+    assert events[0] == ('answer', {"answer": "A", "source": "stub-stream"})
+    assert [data["text"] for name, data in events if name == 'token'] == ["Streamed ", "for ", "real."]
+    assert events[-1][1]["result"]["explanation"] == "Streamed for real."
+    assert stub.streamed == ["What is 2 + 2?"] and stub.questions == []
+
+
+def test_fallback_still_sends_an_answer_event():
+    client = make_app(FailingStub(), GENERATOR_RETRIES=0).test_client()
+
+    events = stream_events(client, "What is 2 + 2?", ["3", "4", "5"])
+
+    name, data = events[0]
+    assert name == 'answer'
+    assert data["answer"] is None and data["source"] == FALLBACK_SOURCE
+    assert events[-1][0] == 'saved'
+
+
+def test_repeat_question_streams_from_cache(client, stub):
+    stream_events(client, "What is 2 + 2?", ["3", "4", "5"])
+    events = stream_events(client, "What is 2 + 2?", ["5", "4", "3"])
+
+    # The cached answer is remapped to the reversed choices
+    answer = stub.letter_for("What is 2 + 2?", ["3", "4", "5"])
+    assert events[0][1]["answer"] == "CBA"["ABC".index(answer)] and events[0][1]["cached"] is True
+    assert stub.questions == ["What is 2 + 2?"]
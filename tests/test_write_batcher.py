@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from question_model import db
+from services.write_batcher import GroupCommitWriter, WriteTimeoutError
+from tests.support import make_app, upload
+
+
+def slow_operation(seconds, started=None):
+    def operation(session):
+        if started is not None:
+            started.set()
+        time.sleep(seconds)
+        return 'done'
+    return operation
+
+
+@pytest.fixture
+def writer(app):
+    writer = GroupCommitWriter(db, max_delay=0, timeout=0.1)
+    writer.install(app)
+    return writer
+
+
+def test_running_write_gets_a_bounded_second_wait(writer):
+    with pytest.raises(WriteTimeoutError):
+        writer.submit(slow_operation(0.5))
+    assert writer.stats()["timeouts"] == 1
+
+
+def test_slow_commit_within_second_wait_succeeds(writer):
+    assert writer.submit(slow_operation(0.15)) == 'done'
+    assert writer.stats()["timeouts"] == 0
+
+
+def test_queued_write_is_withdrawn(writer):
+    started = threading.Event()
+    errors = []
+
+    def blocking_write():
+        try:
+            writer.submit(slow_operation(0.5, started))
+        except WriteTimeoutError as e:
+            errors.append(e)
+
+    blocker = threading.Thread(target=blocking_write)
+    blocker.start()
+    started.wait(1)
+
+    with pytest.raises(WriteTimeoutError, match="withdrawn"):
+        writer.submit(slow_operation(0))
+    blocker.join()
+    assert len(errors) == 1
+    assert writer.stats()["timeouts"] == 2
+
+
+def test_write_timeout_is_503():
+    app = make_app(WRITE_BATCHING_ENABLED=True)
+    client = app.test_client()
+    body = upload(client, "What is 2 + 2?", ["3", "4", "5"])
+
+    def timed_out(operation):
+        raise WriteTimeoutError("Write did not commit")
+
+    app.extensions['question_api'].write_batcher.submit = timed_out
+    response = client.post(f"/questions/{body['question_id']}/report", json={"correction": "A"})
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+    assert client.post('/upload', json={"question": "What is 3 + 3?", "choices": ["5", "6"]}).status_code == 503